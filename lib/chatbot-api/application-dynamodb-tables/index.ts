@@ -11,6 +11,7 @@ export interface ApplicationDynamoDBTablesProps {
 
 export class ApplicationDynamoDBTables extends Construct {
   public readonly applicationTable: dynamodb.Table;
+  public readonly applicationRolesTable: dynamodb.Table;
 
   constructor(
     scope: Construct,
@@ -37,6 +38,35 @@ export class ApplicationDynamoDBTables extends Construct {
       deletionProtection: props.deletionProtection,
     });
 
+    // Applications visible to each role, the roles of an application are
+    // a list attribute which can not be indexed by a GSI
+    const applicationRolesTable = new dynamodb.Table(
+      this,
+      "ApplicationRolesTable",
+      {
+        partitionKey: {
+          name: "Role",
+          type: dynamodb.AttributeType.STRING,
+        },
+        sortKey: {
+          name: "ApplicationId",
+          type: dynamodb.AttributeType.STRING,
+        },
+        billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+        encryption: props.kmsKey
+          ? dynamodb.TableEncryption.CUSTOMER_MANAGED
+          : dynamodb.TableEncryption.AWS_MANAGED,
+        encryptionKey: props.kmsKey,
+        removalPolicy:
+          props.retainOnDelete === true
+            ? cdk.RemovalPolicy.RETAIN_ON_UPDATE_OR_DELETE
+            : cdk.RemovalPolicy.DESTROY,
+        pointInTimeRecovery: true,
+        deletionProtection: props.deletionProtection,
+      }
+    );
+
     this.applicationTable = applicationTable;
+    this.applicationRolesTable = applicationRolesTable;
   }
 }
@@ -12,6 +12,7 @@ export interface ChatBotDynamoDBTablesProps {
 export class ChatBotDynamoDBTables extends Construct {
   public readonly sessionsTable: dynamodb.Table;
   public readonly byUserIdIndex: string = "byUserId";
+  public readonly byUserIdSummaryIndex: string = "byUserIdSummary";
 
   constructor(scope: Construct, id: string, props: ChatBotDynamoDBTablesProps) {
     super(scope, id);
@@ -43,6 +44,15 @@ export class ChatBotDynamoDBTables extends Construct {
       partitionKey: { name: "UserId", type: dynamodb.AttributeType.STRING },
     });
 
+    // Used to list the sessions without reading their history
+    sessionsTable.addGlobalSecondaryIndex({
+      indexName: this.byUserIdSummaryIndex,
+      partitionKey: { name: "UserId", type: dynamodb.AttributeType.STRING },
+      sortKey: { name: "StartTime", type: dynamodb.AttributeType.STRING },
+      projectionType: dynamodb.ProjectionType.INCLUDE,
+      nonKeyAttributes: ["Title"],
+    });
+
     this.sessionsTable = sessionsTable;
   }
 }
@@ -83,14 +83,8 @@ def list_applications():
     ):
         applications_result = genai_core.applications.list_applications()
     else:
-        applications_result = []
-        for role in user_roles:
-            role_applications = genai_core.applications.list_applications_by_role(role)
-            applications_result.extend(role_applications)
-
-        # Remove duplicates if an application is returned for multiple roles
-        applications_result = list(
-            {app["Id"]: app for app in applications_result}.values()
+        applications_result = genai_core.applications.list_applications_by_roles(
+            user_roles
         )
 
     if UserRole.ADMIN.value in user_roles:
@@ -86,8 +86,9 @@ class RssFeedCrawlerUpdateRequest(BaseModel):
 class ListDocumentsRequest(BaseModel):
     workspaceId: str = ID_FIELD_VALIDATION
     documentType: str = SAFE_SHORT_STR_VALIDATION
+    # Pagination cursor returned with the previous page
     lastDocumentId: Optional[str] = Field(
-        default=None, min_length=1, max_length=100, pattern=SAFE_STR_REGEX
+        default=None, min_length=1, max_length=2048, pattern=SAFE_STR_REGEX
     )
 
 
@@ -104,8 +105,9 @@ class DeleteDocumentRequest(BaseModel):
 class GetRssPostsRequest(BaseModel):
     workspaceId: str = ID_FIELD_VALIDATION
     documentId: str = ID_FIELD_VALIDATION
+    # Pagination cursor returned with the previous page
     lastDocumentId: Optional[str] = Field(
-        default=None, min_length=1, max_length=100, pattern=SAFE_STR_REGEX
+        default=None, min_length=1, max_length=2048, pattern=SAFE_STR_REGEX
     )
 
 
@@ -1,5 +1,12 @@
-from common.constant import ID_FIELD_VALIDATION, SAFE_PROMPT_STR_REGEX
+import json
+from typing import Annotated, List, Optional
+from common.constant import (
+    ID_FIELD_VALIDATION,
+    SAFE_PROMPT_STR_REGEX,
+    SAFE_SHORT_STR_VALIDATION,
+)
 import genai_core.semantic_search
+import genai_core.types
 from pydantic import BaseModel, Field
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.event_handler.appsync import Router
@@ -11,9 +18,22 @@ logger = Logger()
 permissions = UserPermissions(router)
 
 
+class SemanticSearchFilters(BaseModel):
+    documentIds: Optional[List[Annotated[str, ID_FIELD_VALIDATION]]] = Field(
+        default=None, max_length=100
+    )
+    documentTypes: Optional[List[Annotated[str, SAFE_SHORT_STR_VALIDATION]]] = Field(
+        default=None, max_length=100
+    )
+    pathPrefix: Optional[str] = Field(default=None, max_length=2048)
+    # AWSJSON object of metadata key/values
+    metadata: Optional[str] = Field(default=None, max_length=2000)
+
+
 class SemanticSearchRequest(BaseModel):
     workspaceId: str = ID_FIELD_VALIDATION
     query: str = Field(max_length=256, pattern=SAFE_PROMPT_STR_REGEX)
+    filters: Optional[SemanticSearchFilters] = None
 
 
 @router.resolver(field_name="performSemanticSearch")
@@ -29,12 +49,32 @@ def semantic_search(input: dict):
         query=request.query,
         limit=25,
         full_response=True,
+        filters=_convert_filters(request.filters),
     )
     result = _convert_semantic_search_result(request.workspaceId, result)
 
     return result
 
 
+def _convert_filters(filters: Optional[SemanticSearchFilters]):
+    if filters is None:
+        return None
+
+    metadata = None
+    if filters.metadata:
+        try:
+            metadata = json.loads(filters.metadata)
+        except ValueError:
+            raise genai_core.types.CommonError("Invalid metadata filter")
+
+    return {
+        "document_ids": filters.documentIds,
+        "document_types": filters.documentTypes,
+        "path_prefix": filters.pathPrefix,
+        "metadata": metadata,
+    }
+
+
 def _convert_semantic_search_result(workspace_id: str, result: dict):
     vector_search_items = result.get("vector_search_items")
     keyword_search_items = result.get("keyword_search_items")
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, Field
 from common.constant import SAFE_FILE_NAME_REGEX, UserRole
 from common.validation import WorkspaceIdValidation
@@ -62,6 +63,19 @@ def get_file(fileName: str):
     return result
 
 
+class ListSessionsRequest(BaseModel):
+    limit: int = Field(default=50, ge=1, le=100)
+    nextToken: Optional[str] = Field(default=None, max_length=2000)
+
+
+def get_session_summary(session):
+    return {
+        "id": session.get("SessionId"),
+        "title": session.get("Title", "<no title>"),
+        "startTime": f'{session.get("StartTime")}Z',
+    }
+
+
 @router.resolver(field_name="listSessions")
 @tracer.capture_method
 def get_sessions():
@@ -71,16 +85,27 @@ def get_sessions():
 
     sessions = genai_core.sessions.list_sessions_by_user_id(user_id)
 
-    return [
-        {
-            "id": session.get("SessionId"),
-            "title": session.get("History", [{}])[0]
-            .get("data", {})
-            .get("content", "<no title>"),
-            "startTime": f'{session.get("StartTime")}Z',
-        }
-        for session in sessions
-    ]
+    return [get_session_summary(session) for session in sessions]
+
+
+@router.resolver(field_name="listSessionsPage")
+@tracer.capture_method
+def get_sessions_page(limit: Optional[int] = None, nextToken: Optional[str] = None):
+    request = ListSessionsRequest(
+        **{k: v for k, v in {"limit": limit, "nextToken": nextToken}.items() if v}
+    )
+    user_id = genai_core.auth.get_user_id(router)
+    if user_id is None:
+        raise genai_core.types.CommonError("User not found")
+
+    page = genai_core.sessions.list_sessions_page(
+        user_id, limit=request.limit, next_token=request.nextToken
+    )
+
+    return {
+        "items": [get_session_summary(session) for session in page["items"]],
+        "nextToken": page["next_token"],
+    }
 
 
 @router.resolver(field_name="getSession")
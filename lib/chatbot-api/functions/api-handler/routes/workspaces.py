@@ -5,6 +5,7 @@ from common.constant import (
 )
 from common.validation import WorkspaceIdValidation
 import genai_core.types
+import genai_core.chunking
 import genai_core.kendra
 import genai_core.bedrock_kb
 import genai_core.parameters
@@ -20,6 +21,8 @@ logger = Logger()
 permissions = UserPermissions(router)
 
 name_regex = r"^[\w+_-]+$"
+# Dimensions supported by the pgvector indexes for each storage precision
+MAX_INDEX_DIMENSIONS = {"float32": 2000, "float16": 4000, "quantized": 64000}
 
 
 class GenericCreateWorkspaceRequest(BaseModel):
@@ -44,6 +47,14 @@ class CreateWorkspaceAuroraRequest(BaseModel):
     chunkingStrategy: str = SAFE_SHORT_STR_VALIDATION
     chunkSize: int = Field(gt=100)
     chunkOverlap: int = Field(gt=0)
+    indexType: Optional[str] = Field(default="ivfflat", pattern=r"^(ivfflat|hnsw)$")
+    hnswM: Optional[int] = Field(default=None, ge=2, le=100)
+    hnswEfConstruction: Optional[int] = Field(default=None, ge=4, le=1000)
+    hnswEfSearch: Optional[int] = Field(default=None, ge=1, le=1000)
+    ivfflatProbes: Optional[int] = Field(default=None, ge=1, le=1000)
+    vectorPrecision: Optional[str] = Field(
+        default="float32", pattern=r"^(float32|float16|quantized)$"
+    )
 
 
 class CreateWorkspaceOpenSearchRequest(BaseModel):
@@ -62,6 +73,9 @@ class CreateWorkspaceOpenSearchRequest(BaseModel):
     chunkingStrategy: str = SAFE_SHORT_STR_VALIDATION
     chunkSize: int = Field(gt=0)
     chunkOverlap: int = Field(gt=0)
+    vectorPrecision: Optional[str] = Field(
+        default="float32", pattern=r"^(float32|float16|quantized)$"
+    )
 
 
 class CreateWorkspaceKendraRequest(BaseModel):
@@ -210,7 +224,7 @@ def _create_workspace_aurora(request: CreateWorkspaceAuroraRequest, config: dict
     if request.metric not in ["inner", "cosine", "l2"]:
         raise genai_core.types.CommonError("Invalid metric")
 
-    if request.chunkingStrategy not in ["recursive"]:
+    if request.chunkingStrategy not in genai_core.chunking.CHUNKING_STRATEGIES:
         raise genai_core.types.CommonError("Invalid chunking strategy")
 
     if request.chunkSize < 100 or request.chunkSize > 10000:
@@ -219,6 +233,19 @@ def _create_workspace_aurora(request: CreateWorkspaceAuroraRequest, config: dict
     if request.chunkOverlap < 0 or request.chunkOverlap >= request.chunkSize:
         raise genai_core.types.CommonError("Invalid chunk overlap")
 
+    if (
+        request.hnswM is not None
+        and request.hnswEfConstruction is not None
+        and request.hnswEfConstruction < 2 * request.hnswM
+    ):
+        raise genai_core.types.CommonError("ef_construction must be at least twice m")
+
+    max_dimensions = MAX_INDEX_DIMENSIONS[request.vectorPrecision or "float32"]
+    if request.index and embeddings_model_dimensions > max_dimensions:
+        raise genai_core.types.CommonError(
+            "Too many dimensions to index the embeddings with this precision"
+        )
+
     return _convert_workspace(
         genai_core.workspaces.create_workspace_aurora(
             workspace_name=workspace_name,
@@ -234,6 +261,14 @@ def _create_workspace_aurora(request: CreateWorkspaceAuroraRequest, config: dict
             chunking_strategy=request.chunkingStrategy,
             chunk_size=request.chunkSize,
             chunk_overlap=request.chunkOverlap,
+            index_type=request.indexType or "ivfflat",
+            index_options={
+                "hnsw_m": request.hnswM,
+                "hnsw_ef_construction": request.hnswEfConstruction,
+                "hnsw_ef_search": request.hnswEfSearch,
+                "ivfflat_probes": request.ivfflatProbes,
+            },
+            vector_precision=request.vectorPrecision or "float32",
         )
     )
 
@@ -274,7 +309,7 @@ def _create_workspace_open_search(
     if len(request.languages) == 0 or len(request.languages) > 3:
         raise genai_core.types.CommonError("Invalid languages")
 
-    if request.chunkingStrategy not in ["recursive"]:
+    if request.chunkingStrategy not in genai_core.chunking.CHUNKING_STRATEGIES:
         raise genai_core.types.CommonError("Invalid chunking strategy")
 
     if request.chunkSize < 100 or request.chunkSize > 10000:
@@ -296,6 +331,7 @@ def _create_workspace_open_search(
             chunking_strategy=request.chunkingStrategy,
             chunk_size=request.chunkSize,
             chunk_overlap=request.chunkOverlap,
+            vector_precision=request.vectorPrecision or "float32",
         )
     )
 
@@ -362,6 +398,8 @@ def _convert_workspace(workspace: dict):
         "crossEncoderModelName": workspace.get("cross_encoder_model_name"),
         "metric": workspace.get("metric"),
         "index": workspace.get("has_index"),
+        "indexType": workspace.get("index_type"),
+        "vectorPrecision": workspace.get("vector_precision"),
         "hybridSearch": workspace.get("hybrid_search"),
         "chunkingStrategy": workspace.get("chunking_strategy"),
         "chunkSize": workspace.get("chunk_size"),
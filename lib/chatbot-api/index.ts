@@ -137,7 +137,9 @@ export class ChatBotApi extends Construct {
       ...props,
       sessionsTable: chatTables.sessionsTable,
       byUserIdIndex: chatTables.byUserIdIndex,
+      byUserIdSummaryIndex: chatTables.byUserIdSummaryIndex,
       applicationTable: applicationTables.applicationTable,
+      applicationRolesTable: applicationTables.applicationRolesTable,
       api,
       userFeedbackBucket: chatBuckets.userFeedbackBucket,
       filesBucket: chatBuckets.filesBucket,
@@ -24,7 +24,9 @@ export interface ApiResolversProps {
   readonly userPool: cognito.UserPool;
   readonly sessionsTable: dynamodb.Table;
   readonly byUserIdIndex: string;
+  readonly byUserIdSummaryIndex: string;
   readonly applicationTable: dynamodb.Table;
+  readonly applicationRolesTable: dynamodb.Table;
   readonly filesBucket: s3.Bucket;
   readonly userFeedbackBucket: s3.Bucket;
   readonly modelsParameter: ssm.StringParameter;
@@ -72,13 +74,17 @@ export class ApiResolvers extends Construct {
           API_KEYS_SECRETS_ARN: props.shared.apiKeysSecret.secretArn,
           SESSIONS_TABLE_NAME: props.sessionsTable.tableName,
           SESSIONS_BY_USER_ID_INDEX_NAME: props.byUserIdIndex,
+          SESSIONS_BY_USER_ID_SUMMARY_INDEX_NAME: props.byUserIdSummaryIndex,
           APPLICATIONS_TABLE_NAME: props.applicationTable.tableName,
+          APPLICATION_ROLES_TABLE_NAME: props.applicationRolesTable.tableName,
           USER_FEEDBACK_BUCKET_NAME: props.userFeedbackBucket?.bucketName ?? "",
           UPLOAD_BUCKET_NAME: props.ragEngines?.uploadBucket?.bucketName ?? "",
           CHATBOT_FILES_BUCKET_NAME: props.filesBucket.bucketName,
           PROCESSING_BUCKET_NAME:
             props.ragEngines?.processingBucket?.bucketName ?? "",
           AURORA_DB_USER: AURORA_DB_USERS.WRITE,
+          QUERY_LANGUAGE_DETECTION:
+            props.config.rag.engines.aurora.languageDetection ?? "comprehend",
           AURORA_DB_HOST:
             props.ragEngines?.auroraPgVector?.database?.clusterEndpoint
               ?.hostname ?? "",
@@ -320,6 +326,7 @@ export class ApiResolvers extends Construct {
       props.modelsParameter.grantRead(apiHandler);
       props.sessionsTable.grantReadWriteData(apiHandler);
       props.applicationTable.grantReadWriteData(apiHandler);
+      props.applicationRolesTable.grantReadWriteData(apiHandler);
       props.userFeedbackBucket.grantReadWrite(apiHandler);
       props.filesBucket.grantReadWrite(apiHandler);
       props.ragEngines?.uploadBucket.grantReadWrite(apiHandler);
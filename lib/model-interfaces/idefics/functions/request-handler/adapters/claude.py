@@ -13,5 +13,5 @@ class Claude3(MultiModalModelBase):
         return self.converse(input, model_kwargs)
 
 
-registry.register(r"^bedrock.anthropic.claude-3.*", Claude3)
+registry.register_prefix("bedrock.anthropic.claude-3", Claude3)
 registry.register(r"^bedrock.*.anthropic.claude-3.*", Claude3)
@@ -39,4 +39,4 @@ class AzureGptAdapter(ModelAdapter):
 
 
 # Register the adapter
-registry.register(r"^azure.openai*", AzureGptAdapter)
+registry.register_prefix("azure.openai", AzureGptAdapter)
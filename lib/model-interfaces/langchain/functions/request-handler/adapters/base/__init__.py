@@ -1,2 +1,2 @@
 # flake8: noqa
-from .base import ModelAdapter, Mode
+from .base import ModelAdapter, Mode, is_admin_role, serialize_documents
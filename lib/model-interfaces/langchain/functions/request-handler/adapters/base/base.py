@@ -1,12 +1,14 @@
 import os
 import re
+import json
+import time
 from enum import Enum
 from aws_lambda_powertools import Logger
 from langchain.callbacks.base import BaseCallbackHandler
 from langchain.chains.conversation.base import ConversationChain
 from langchain.chains import ConversationalRetrievalChain
+from langchain.chains.conversational_retrieval.base import _get_chat_history
 from langchain.chains.retrieval import create_retrieval_chain
-from langchain.chains.history_aware_retriever import create_history_aware_retriever
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.memory import ConversationBufferMemory
 from langchain.prompts.prompt import PromptTemplate
@@ -20,15 +22,27 @@ from genai_core.langchain import WorkspaceRetriever, DynamoDBChatMessageHistory
 from genai_core.types import ChatbotMode
 from genai_core.types import CommonError
 from genai_core.clients import get_bedrock_client
+import genai_core.utils.telemetry as telemetry
 
+from langchain_core.runnables import RunnableLambda
 from langchain_core.runnables.history import RunnableWithMessageHistory
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.outputs import LLMResult, ChatGeneration
 from langchain_core.messages.ai import AIMessage, AIMessageChunk
 from langchain_core.messages.human import HumanMessage
 from langchain_aws import ChatBedrockConverse
+from adapters.shared.prompts.system_prompts import Language, locale, prompts
+from .query_rewriter import (
+    is_standalone_question,
+    record_condense_latency,
+    estimated_condense_latency,
+)
 
 logger = Logger()
 
+# Default token budget of the chat history added to the prompts
+DEFAULT_HISTORY_MAX_TOKENS = 8000
+
 
 class Mode(Enum):
     CHAIN = "chain"
@@ -169,15 +183,61 @@ class ModelAdapter:
     def get_llm(self, model_kwargs={}):
         raise ValueError("llm must be implemented")
 
+    def get_condense_llm(self):
+        """LLM used to rewrite the question. Can be a smaller/faster model."""
+        return self.get_llm({"streaming": False})
+
     def get_embeddings_model(self, embeddings):
         raise ValueError("embeddings must be implemented")
 
     def get_chat_history(self):
+        summarize = os.environ.get("CHAT_HISTORY_SUMMARY_ENABLED", "false") == "true"
         return DynamoDBChatMessageHistory(
             table_name=os.environ["SESSIONS_TABLE_NAME"],
             session_id=self.session_id,
             user_id=self.user_id,
+            max_tokens=self.get_history_max_tokens(),
+            summarizer=self.summarize_history if summarize else None,
+            defer_writes=True,
+        )
+
+    def persist_history(self):
+        """Store the messages of the turn (Called once the response is sent)"""
+        self.chat_history.flush()
+
+    def get_history_max_tokens(self):
+        """Token budget of the chat history sent to the model (None is unlimited)"""
+        budgets = json.loads(os.environ.get("CHAT_HISTORY_MAX_TOKENS_BY_MODEL", "{}"))
+        max_tokens = budgets.get(
+            getattr(self, "model_id", None),
+            os.environ.get("CHAT_HISTORY_MAX_TOKENS", DEFAULT_HISTORY_MAX_TOKENS),
+        )
+        if max_tokens is None or int(max_tokens) <= 0:
+            return None
+        return int(max_tokens)
+
+    def summarize_history(self, summary, messages):
+        """Folds messages out of the history window into the rolling summary"""
+        lines = [
+            f"{message.type}: {message.content}"
+            for message in messages
+            if isinstance(message.content, str)
+        ]
+        prompt = "\n\n".join(
+            [
+                prompts[locale]["summary_prompt"],
+                summary or "",
+                "\n".join(lines),
+            ]
+        )
+        start = time.perf_counter()
+        new_summary = (self.get_condense_llm() | StrOutputParser()).invoke(prompt)
+        logger.info(
+            "Chat history summarized",
+            messages=len(messages),
+            latency_ms=elapsed_ms(start),
         )
+        return new_summary
 
     def get_memory(self, output_key=None, return_messages=False):
         return ConversationBufferMemory(
@@ -213,6 +273,63 @@ class ModelAdapter:
         # Needs to be implemented per adapter. (For example Bedrock needs to use base64)
         raise CommonError("Prompt formatting not supported for this adapter")
 
+    def get_condense_skip_reason(self, question, chat_history):
+        """Returns why the condense-question call is not needed (None otherwise)"""
+        if not has_conversation_history(chat_history):
+            return "no_history"
+        # The heuristic only knows english follow-up words
+        if locale == Language.ENGLISH.value and is_standalone_question(question):
+            return "standalone"
+        return None
+
+    def log_condense_question(self, skip_reason, latency_ms=None):
+        if skip_reason is None and latency_ms is not None:
+            record_condense_latency(latency_ms)
+        # Used by Cloudwatch filters to follow the time saved by the skipped calls
+        logger.info(
+            "Condense Question",
+            model=self.model_id,
+            metric_type="condense_question",
+            skipped=skip_reason is not None,
+            reason=skip_reason,
+            latency_ms=latency_ms,
+            saved_ms=(
+                estimated_condense_latency() if skip_reason is not None else 0
+            ),
+        )
+
+    def get_history_aware_retriever(self, retriever, condense_prompt, timings):
+        """Returns a runnable rewriting the question before querying the workspace.
+
+        The condense-question call is skipped when there is no conversation yet
+        or when the question already stands alone.
+        The retriever runs with the adapter callbacks so the sources can be sent
+        to the client (on_retriever_end) before the answer is generated.
+        """
+        # Only stream the last llm call (otherwise the internal
+        # llm response will be visible)
+        condense_chain = condense_prompt | self.get_condense_llm() | StrOutputParser()
+
+        def retrieve(inputs):
+            query = inputs["input"]
+            with telemetry.span("CondenseQuestion") as condense_span:
+                skip_reason = self.get_condense_skip_reason(
+                    query, inputs.get("chat_history", [])
+                )
+                if skip_reason is None:
+                    query = condense_chain.invoke(inputs)
+            timings["condense"] = int(condense_span.elapsed_ms)
+            self.log_condense_question(skip_reason, timings["condense"])
+
+            with telemetry.span("Retrieve") as retrieve_span:
+                documents = retriever.invoke(
+                    query, config={"callbacks": [self.callback_handler]}
+                )
+            timings["retrieve"] = int(retrieve_span.elapsed_ms)
+            return documents
+
+        return RunnableLambda(retrieve).with_config(run_name="retrieve_documents")
+
     def run_with_chain_v2(
         self,
         user_prompt,
@@ -230,18 +347,17 @@ class ModelAdapter:
         self.callback_handler.prompts = []
         workspace_documents = []
         retriever = None
+        start_time = time.perf_counter()
+        timings = {}
 
         if workspace_id:
             retriever = WorkspaceRetriever(workspace_id=workspace_id)
-            # Only stream the last llm call (otherwise the internal
-            # llm response will be visible)
-            llm_without_streaming = self.get_llm({"streaming": False})
-            history_aware_retriever = create_history_aware_retriever(
-                llm_without_streaming,
+            history_aware_retriever = self.get_history_aware_retriever(
                 retriever,
                 self.get_condense_question_prompt(
                     custom_prompt=system_prompts.get("condenseSystemPrompt")
                 ),
+                timings,
             )
             question_answer_chain = create_stuff_documents_chain(
                 self.llm,
@@ -283,6 +399,9 @@ class ModelAdapter:
                         for c in chunk.content:
                             if "text" in c:
                                 answer = answer + c.get("text")
+                    if answer and "first_token" not in timings:
+                        timings["first_token"] = elapsed_ms(start_time)
+                        telemetry.mark("FirstToken")
             else:
                 response = conversation.invoke(
                     input={"input": user_prompt}, config=config
@@ -291,6 +410,7 @@ class ModelAdapter:
                     answer = response.get("answer")  # RAG flow
                 else:
                     answer = response.content
+            telemetry.mark("LastToken")
         except Exception as e:
             logger.exception(e)
             raise e
@@ -300,13 +420,9 @@ class ModelAdapter:
             self.chat_history.add_message(HumanMessage(user_prompt))
             self.chat_history.add_message(AIMessage(answer))
         if retriever is not None:
-            workspace_documents = [
-                {
-                    "page_content": doc.page_content,
-                    "metadata": doc.metadata,
-                }
-                for doc in retriever.get_last_search_documents()
-            ]
+            workspace_documents = serialize_documents(
+                retriever.get_last_search_documents()
+            )
 
         clean_prompts = []
         for prompt in self.callback_handler.prompts:
@@ -348,6 +464,14 @@ class ModelAdapter:
             # Store basic configuration for non-admin users
             self.chat_history.add_metadata(metadata)
 
+        if self.callback_handler.usage is not None:
+            telemetry.add_metric(
+                "InputTokens", self.callback_handler.usage.get("input_tokens", 0)
+            )
+            telemetry.add_metric(
+                "OutputTokens", self.callback_handler.usage.get("output_tokens", 0)
+            )
+
         if (
             self.callback_handler.usage is not None
             and "total_tokens" in self.callback_handler.usage
@@ -362,6 +486,19 @@ class ModelAdapter:
                 value=self.callback_handler.usage.get("total_tokens"),
             )
 
+        if workspace_id:
+            timings["complete"] = elapsed_ms(start_time)
+            # Used by Cloudwatch filters to follow the RAG time to first byte.
+            logger.info(
+                "RAG Latency",
+                model=self.model_id,
+                metric_type="rag_latency",
+                condense_ms=timings.get("condense"),
+                retrieve_ms=timings.get("retrieve"),
+                first_token_ms=timings.get("first_token"),
+                complete_ms=timings.get("complete"),
+            )
+
         response = {
             "sessionId": self.session_id,
             "type": "text",
@@ -391,10 +528,15 @@ class ModelAdapter:
         self.callback_handler.prompts = []
 
         if workspace_id:
+            memory = self.get_memory(output_key="answer", return_messages=True)
+            skip_reason = self.get_condense_skip_reason(
+                user_prompt, self.chat_history.messages
+            )
+            self.log_condense_question(skip_reason)
             conversation = ConversationalRetrievalChain.from_llm(
                 self.llm,
                 WorkspaceRetriever(workspace_id=workspace_id),
-                condense_question_llm=self.get_llm({"streaming": False}),
+                condense_question_llm=self.get_condense_llm(),
                 condense_question_prompt=self.get_condense_question_prompt(
                     custom_prompt=system_prompts.get("condenseSystemPrompt")
                 ),
@@ -404,19 +546,17 @@ class ModelAdapter:
                     )
                 },
                 return_source_documents=True,
-                memory=self.get_memory(output_key="answer", return_messages=True),
+                memory=memory,
+                # An empty history skips the condense-question call
+                get_chat_history=lambda history: (
+                    "" if skip_reason is not None else _get_chat_history(history)
+                ),
                 verbose=True,
                 callbacks=[self.callback_handler],
             )
             result = conversation({"question": user_prompt})
             logger.debug(result["source_documents"])
-            documents = [
-                {
-                    "page_content": doc.page_content,
-                    "metadata": doc.metadata,
-                }
-                for doc in result["source_documents"]
-            ]
+            documents = serialize_documents(result["source_documents"])
 
             metadata = {
                 "modelId": self.model_id,
@@ -646,6 +786,26 @@ class ModelAdapter:
         raise ValueError(f"unknown mode {self._mode}")
 
 
+def has_conversation_history(messages):
+    # Files added for the current turn are stored as temporary messages with a
+    # list content. Only text messages are part of the conversation.
+    return any(isinstance(message.content, str) for message in messages)
+
+
+def serialize_documents(documents):
+    return [
+        {
+            "page_content": doc.page_content,
+            "metadata": doc.metadata,
+        }
+        for doc in documents
+    ]
+
+
+def elapsed_ms(start):
+    return int((time.perf_counter() - start) * 1000)
+
+
 def is_admin_role(user_groups):
     if user_groups and ("admin" in user_groups or "workspace_manager" in user_groups or "chatbot_user" in user_groups):
         return True
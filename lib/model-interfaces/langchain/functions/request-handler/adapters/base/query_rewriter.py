@@ -0,0 +1,88 @@
+import re
+import statistics
+from collections import deque
+from typing import Optional
+
+# Words that usually refer to something said earlier in the conversation.
+# If one of them is used, the question needs to be condensed with the history.
+FOLLOW_UP_WORDS = {
+    "it",
+    "its",
+    "they",
+    "them",
+    "their",
+    "theirs",
+    "this",
+    "that",
+    "these",
+    "those",
+    "he",
+    "him",
+    "his",
+    "she",
+    "her",
+    "hers",
+    "there",
+    "above",
+    "previous",
+    "former",
+    "latter",
+    "same",
+    "else",
+    "again",
+    "more",
+    "one",
+    "ones",
+}
+
+FOLLOW_UP_PREFIXES = (
+    "and ",
+    "also ",
+    "but ",
+    "so ",
+    "then ",
+    "what about",
+    "how about",
+    "why not",
+    "why?",
+    "what else",
+    "tell me more",
+    "explain",
+    "continue",
+    "go on",
+    "elaborate",
+)
+
+MIN_STANDALONE_WORDS = 5
+
+# Latencies of the condense-question calls made by this container. Used to
+# estimate the time saved when the call is skipped.
+_condense_latencies = deque(maxlen=100)
+
+
+def is_standalone_question(question: str) -> bool:
+    """Cheap heuristic detecting questions that do not need the history.
+
+    It is conservative: any hint of a reference to the conversation
+    (pronouns, follow-up openers, very short questions) returns False.
+    """
+    text = question.strip().lower()
+    if text.startswith(FOLLOW_UP_PREFIXES):
+        return False
+
+    words = re.findall(r"[a-z']+", text)
+    if len(words) < MIN_STANDALONE_WORDS:
+        return False
+
+    return not any(word in FOLLOW_UP_WORDS for word in words)
+
+
+def record_condense_latency(latency_ms: int) -> None:
+    _condense_latencies.append(latency_ms)
+
+
+def estimated_condense_latency() -> Optional[int]:
+    """Median latency (p50) of the condense-question calls seen so far"""
+    if len(_condense_latencies) == 0:
+        return None
+    return int(statistics.median(_condense_latencies))
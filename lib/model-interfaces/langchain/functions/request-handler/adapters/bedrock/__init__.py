@@ -3,24 +3,32 @@ from adapters.bedrock.base import *
 from adapters.bedrock.media import *
 from genai_core.registry import registry
 
-# Register bedrock adapters
-registry.register(r"^bedrock.ai21.jamba*", BedrockChatAdapter)
-registry.register(r"^bedrock.ai21.j2*", BedrockChatNoStreamingNoSystemPromptAdapter)
-registry.register(
-    r"^bedrock\.cohere\.command-(text|light-text).*", BedrockChatNoSystemPromptAdapter
+# Register bedrock adapters, the longest matching prefix wins
+registry.register_prefix("bedrock.ai21.jamba", BedrockChatAdapter)
+registry.register_prefix("bedrock.ai21.j2", BedrockChatNoStreamingNoSystemPromptAdapter)
+registry.register_prefix(
+    "bedrock.cohere.command-text", BedrockChatNoSystemPromptAdapter
 )
-registry.register(r"^bedrock\.cohere\.command-r.*", BedrockChatAdapter)
-registry.register(r"^bedrock.anthropic.claude*", BedrockChatAdapter)
-registry.register(r"^bedrock.meta.llama*", BedrockChatAdapter)
-registry.register(r"^bedrock.mistral.mistral-large*", BedrockChatAdapter)
-registry.register(r"^bedrock.mistral.mistral-small*", BedrockChatAdapter)
-registry.register(r"^bedrock.mistral.mistral-7b-*", BedrockChatNoSystemPromptAdapter)
-registry.register(r"^bedrock.mistral.mixtral-*", BedrockChatNoSystemPromptAdapter)
-registry.register(r"^bedrock.amazon.titan-image-generator*", BedrockChatMediaGeneration)
-registry.register(r"^bedrock.amazon.titan-t*", BedrockChatNoSystemPromptAdapter)
-registry.register(r"^bedrock.amazon.nova-reel*", BedrockChatMediaGeneration)
-registry.register(r"^bedrock.amazon.nova-canvas*", BedrockChatMediaGeneration)
-registry.register(r"^bedrock.amazon.nova*", BedrockChatAdapter)
+registry.register_prefix(
+    "bedrock.cohere.command-light-text", BedrockChatNoSystemPromptAdapter
+)
+registry.register_prefix("bedrock.cohere.command-r", BedrockChatAdapter)
+registry.register_prefix("bedrock.anthropic.claude", BedrockChatAdapter)
+registry.register_prefix("bedrock.meta.llama", BedrockChatAdapter)
+registry.register_prefix("bedrock.mistral.mistral-large", BedrockChatAdapter)
+registry.register_prefix("bedrock.mistral.mistral-small", BedrockChatAdapter)
+registry.register_prefix(
+    "bedrock.mistral.mistral-7b-", BedrockChatNoSystemPromptAdapter
+)
+registry.register_prefix("bedrock.mistral.mixtral-", BedrockChatNoSystemPromptAdapter)
+registry.register_prefix(
+    "bedrock.amazon.titan-image-generator", BedrockChatMediaGeneration
+)
+registry.register_prefix("bedrock.amazon.titan-t", BedrockChatNoSystemPromptAdapter)
+registry.register_prefix("bedrock.amazon.nova-reel", BedrockChatMediaGeneration)
+registry.register_prefix("bedrock.amazon.nova-canvas", BedrockChatMediaGeneration)
+registry.register_prefix("bedrock.amazon.nova", BedrockChatAdapter)
+# Cross region inference profiles (bedrock.<region>.<model>)
 registry.register(r"^bedrock.*.amazon.nova*", BedrockChatAdapter)
 registry.register(r"^bedrock.*.anthropic.claude*", BedrockChatAdapter)
 registry.register(r"^bedrock.*.meta.llama*", BedrockChatAdapter)
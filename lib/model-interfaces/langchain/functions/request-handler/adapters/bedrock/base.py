@@ -2,9 +2,9 @@ import os
 import re
 import mimetypes
 import genai_core.clients
+import genai_core.utils.file_cache
 from aws_lambda_powertools import Logger
 from typing import Any, List, Optional
-import boto3
 from adapters.base import ModelAdapter
 from langchain_core.messages import BaseMessage
 from langchain_core.messages.ai import AIMessage
@@ -18,12 +18,13 @@ from adapters.shared.prompts.system_prompts import (
 )  # Import prompts and language
 
 logger = Logger()
-s3 = boto3.resource("s3")
 
 
 class BedrockChatAdapter(ModelAdapter):
     def __init__(self, model_id, *args, **kwargs):
         self.model_id = model_id
+        # Bytes of the files downloaded by prefetch_files, by S3 key
+        self.prefetched_files = {}
         logger.info(f"Initializing BedrockChatAdapter with model_id: {model_id}")
         super().__init__(*args, **kwargs)
 
@@ -40,6 +41,9 @@ class BedrockChatAdapter(ModelAdapter):
             return False
 
     def add_files_to_message_history(self, images=[], documents=[], videos=[]):
+        # Download all the files of the turn in parallel
+        self.prefetch_files(images + documents + videos)
+
         for image in images:
             filename, file_extension = os.path.splitext(image["key"])
             file_extension = file_extension.lower().replace(".", "")
@@ -132,6 +136,19 @@ class BedrockChatAdapter(ModelAdapter):
             )
         return
 
+    def get_file_key(self, file: dict) -> str:
+        return "private/" + self.user_id + "/" + file["key"]
+
+    def prefetch_files(self, files: list):
+        keys = [self.get_file_key(file) for file in files if file.get("key")]
+        if len(keys) == 0:
+            return
+        # Kept for the request, the files larger than the cache limit are
+        # not cached and would be downloaded again
+        self.prefetched_files = genai_core.utils.file_cache.prefetch_files(
+            os.environ["CHATBOT_FILES_BUCKET_NAME"], keys
+        )
+
     def get_file_from_s3(
         self,
         file: dict,
@@ -140,7 +157,7 @@ class BedrockChatAdapter(ModelAdapter):
         if file["key"] is None:
             raise Exception("Invalid S3 Key " + file["key"])
 
-        key = "private/" + self.user_id + "/" + file["key"]
+        key = self.get_file_key(file)
         logger.info(
             "Fetching file", bucket=os.environ["CHATBOT_FILES_BUCKET_NAME"], key=key
         )
@@ -152,17 +169,18 @@ class BedrockChatAdapter(ModelAdapter):
         logger.info("File mime type", mime_type=mime_type)
         format = mime_type.split("/")[-1] or extension
 
-        response = s3.Object(os.environ["CHATBOT_FILES_BUCKET_NAME"], key)  # noqa
-        logger.info("File response", response=response)
-        media_bytes = response.get()["Body"].read()
-
         source = {}
         if use_s3_path:
+            # The model reads the file from S3, no need to download it
             source["s3Location"] = {
                 "uri": f"s3://{os.environ['CHATBOT_FILES_BUCKET_NAME']}/{key}",
             }
+        elif key in self.prefetched_files:
+            source["bytes"] = self.prefetched_files[key]
         else:
-            source["bytes"] = media_bytes
+            source["bytes"] = genai_core.utils.file_cache.get_file_bytes(
+                os.environ["CHATBOT_FILES_BUCKET_NAME"], key
+            )
 
         return {
             "format": format,
@@ -299,6 +317,21 @@ class BedrockChatAdapter(ModelAdapter):
             **extra,
         )
 
+    def get_condense_llm(self):
+        # A smaller model can be configured to rewrite the questions
+        condense_model_id = os.environ.get("CONDENSE_QUESTION_MODEL_ID")
+        if not condense_model_id:
+            return super().get_condense_llm()
+
+        logger.info(f"Using {condense_model_id} to condense the question")
+        return ChatBedrockConverse(
+            client=genai_core.clients.get_bedrock_client(),
+            model=condense_model_id,
+            disable_streaming=True,
+            callbacks=[self.callback_handler],
+            temperature=0,
+        )
+
 
 class BedrockChatNoStreamingAdapter(BedrockChatAdapter):
     """Some models do not support system streaming using the converse API"""
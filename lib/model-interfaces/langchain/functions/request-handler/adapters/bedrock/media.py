@@ -50,6 +50,18 @@ class BedrockChatMediaGeneration(BedrockChatAdapter):
     ) -> Dict[str, Union[List[str], str]]:
         prompts = []
 
+        # Download the files of the conversation in parallel (Videos are
+        # read from S3 by the model)
+        files_to_fetch = files + [
+            file
+            for message in messages
+            if message.type.lower() == ChatbotMessageType.Human.value.lower()
+            for file in message.additional_kwargs.get("files", [])
+        ]
+        self.prefetch_files(
+            [file for file in files_to_fetch if file["type"] != Modality.VIDEO.value]
+        )
+
         # Chat history
         for message in messages:
             # Human Messages
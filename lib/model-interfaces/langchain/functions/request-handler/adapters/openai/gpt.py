@@ -28,4 +28,4 @@ class GPTAdapter(ModelAdapter):
 
 
 # Register the adapter
-registry.register(r"^openai*", GPTAdapter)
+registry.register_prefix("openai", GPTAdapter)
@@ -39,6 +39,11 @@ prompts = {
             "Given the following conversation and a follow up"
             " question, rephrase the follow up question to be a standalone question."
         ),
+        # Prompt for summarizing the oldest messages of a long conversation
+        "summary_prompt": (
+            "Progressively summarize the lines of conversation provided, adding "
+            "onto the previous summary. Return only the new summary."
+        ),
         "current_conversation_word": "Current conversation",
         "question_word": "Question",
         "assistant_word": "Assistant",
@@ -78,6 +83,12 @@ prompts = {
             "reformulez la question de suivi de manière à ce qu'elle soit "
             "une question autonome."
         ),
+        # Prompt for summarizing the oldest messages of a long
+        # conversation (French-Canadian)
+        "summary_prompt": (
+            "Résumez progressivement les lignes de conversation fournies en "
+            "complétant le résumé précédent. Retournez uniquement le nouveau résumé."
+        ),
         "current_conversation_word": "Conversation en cours",
         "question_word": "Question",
         "assistant_word": "Assistant",
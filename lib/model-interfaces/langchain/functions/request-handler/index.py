@@ -1,9 +1,11 @@
 import os
 import json
+import time
 import uuid
 from datetime import datetime
 from genai_core.registry import registry
 from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools.metrics import MetricUnit
 from aws_lambda_powertools.utilities import parameters
 from aws_lambda_powertools.utilities.batch import BatchProcessor, EventType
 from aws_lambda_powertools.utilities.batch.exceptions import BatchProcessingError
@@ -11,7 +13,9 @@ from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
 import adapters  # noqa: F401 Needed to register the adapters
+from adapters.base import is_admin_role, serialize_documents
 from genai_core.utils.websocket import send_to_client
+import genai_core.utils.telemetry as telemetry
 from genai_core.types import ChatbotAction
 
 processor = BatchProcessor(event_type=EventType.SQS)
@@ -63,6 +67,32 @@ def on_llm_new_token(
     )
 
 
+def on_retriever_end(
+    user_id, user_groups, session_id, self, documents, *args, **kwargs
+):
+    # Send the sources as soon as the retrieval is done (before the answer)
+    if self.disable_streaming or not self.model_kwargs.get("streaming", False):
+        return
+    if not is_admin_role(user_groups):
+        return
+
+    send_to_client(
+        {
+            "type": "text",
+            "action": ChatbotAction.LLM_SOURCES.value,
+            "userId": user_id,
+            "timestamp": str(int(round(datetime.now().timestamp()))),
+            "data": {
+                "sessionId": session_id,
+                "metadata": {
+                    "sessionId": session_id,
+                    "documents": serialize_documents(documents),
+                },
+            },
+        }
+    )
+
+
 def handle_heartbeat(record):
     user_id = record["userId"]
     session_id = record["data"]["sessionId"]
@@ -109,15 +139,19 @@ def handle_run(record):
     adapter.on_llm_new_token = lambda *args, **kwargs: on_llm_new_token(
         user_id, session_id, *args, **kwargs
     )
-
-    model = adapter(
-        model_id=model_id,
-        mode=mode,
-        session_id=session_id,
-        user_id=user_id,
-        model_kwargs=data.get("modelKwargs", {}),
+    adapter.on_retriever_end = lambda *args, **kwargs: on_retriever_end(
+        user_id, user_groups, session_id, *args, **kwargs
     )
 
+    with telemetry.span("AdapterConstruction"):
+        model = adapter(
+            model_id=model_id,
+            mode=mode,
+            session_id=session_id,
+            user_id=user_id,
+            model_kwargs=data.get("modelKwargs", {}),
+        )
+
     response = model.run(
         prompt=prompt,
         workspace_id=workspace_id,
@@ -131,16 +165,20 @@ def handle_run(record):
 
     logger.debug(response)
 
-    send_to_client(
-        {
-            "type": "text",
-            "action": ChatbotAction.FINAL_RESPONSE.value,
-            "timestamp": str(int(round(datetime.now().timestamp()))),
-            "userId": user_id,
-            "userGroups": user_groups,
-            "data": response,
-        }
-    )
+    with telemetry.span("FinalPublish"):
+        send_to_client(
+            {
+                "type": "text",
+                "action": ChatbotAction.FINAL_RESPONSE.value,
+                "timestamp": str(int(round(datetime.now().timestamp()))),
+                "userId": user_id,
+                "userGroups": user_groups,
+                "data": response,
+            }
+        )
+
+    # The history is stored after the response to not delay it
+    model.persist_history()
 
 
 @tracer.capture_method
@@ -152,7 +190,18 @@ def record_handler(record: SQSRecord):
     logger.info("details", detail=detail)
 
     if detail["action"] == ChatbotAction.RUN.value:
-        handle_run(detail)
+        data = detail["data"]
+        with telemetry.Telemetry(
+            dimensions={"Model": f"{data['provider']}.{data['modelName']}"}
+        ) as request_telemetry:
+            sent_timestamp = record.attributes.sent_timestamp
+            if sent_timestamp:
+                request_telemetry.add_metric(
+                    "SqsDequeueDelay",
+                    max(0, time.time() * 1000 - int(sent_timestamp)),
+                    MetricUnit.Milliseconds,
+                )
+            handle_run(detail)
     elif detail["action"] == ChatbotAction.HEARTBEAT.value:
         handle_heartbeat(detail)
 
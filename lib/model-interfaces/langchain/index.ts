@@ -64,6 +64,9 @@ export class LangChainInterface extends Construct {
         WORKSPACES_BY_OBJECT_TYPE_INDEX_NAME:
           props.ragEngines?.workspacesByObjectTypeIndexName ?? "",
         AURORA_DB_USER: AURORA_DB_USERS.READ_ONLY,
+        QUERY_LANGUAGE_DETECTION:
+          props.config.rag.engines.aurora.languageDetection ?? "comprehend",
+        TELEMETRY_ENABLED: props.config.advancedMonitoring ? "true" : "false",
         AURORA_DB_HOST:
           props.ragEngines?.auroraPgVector?.database?.clusterEndpoint
             ?.hostname ?? "",
@@ -123,6 +126,31 @@ export class LangChainInterface extends Construct {
       );
     }
 
+    if (props.config.bedrock?.condenseQuestionModelId) {
+      // Smaller model used to rewrite the follow-up questions in RAG workflows
+      requestHandler.addEnvironment(
+        "CONDENSE_QUESTION_MODEL_ID",
+        props.config.bedrock.condenseQuestionModelId
+      );
+    }
+
+    const chatHistory = props.config.llms?.chatHistory;
+    if (chatHistory?.maxTokens !== undefined) {
+      requestHandler.addEnvironment(
+        "CHAT_HISTORY_MAX_TOKENS",
+        chatHistory.maxTokens + ""
+      );
+    }
+    if (chatHistory?.maxTokensByModel) {
+      requestHandler.addEnvironment(
+        "CHAT_HISTORY_MAX_TOKENS_BY_MODEL",
+        JSON.stringify(chatHistory.maxTokensByModel)
+      );
+    }
+    if (chatHistory?.summarize) {
+      requestHandler.addEnvironment("CHAT_HISTORY_SUMMARY_ENABLED", "true");
+    }
+
     if (props.ragEngines?.auroraPgVector) {
       props.ragEngines.auroraPgVector.database.grantConnect(
         requestHandler,
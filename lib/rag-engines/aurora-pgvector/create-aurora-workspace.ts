@@ -20,6 +20,7 @@ export interface CreateAuroraWorkspaceProps {
 
 export class CreateAuroraWorkspace extends Construct {
   public readonly stateMachine: sfn.StateMachine;
+  public readonly createFunction: lambda.Function;
 
   constructor(scope: Construct, id: string, props: CreateAuroraWorkspaceProps) {
     super(scope, id);
@@ -37,7 +38,8 @@ export class CreateAuroraWorkspace extends Construct {
         architecture: props.shared.lambdaArchitecture,
         handler: "index.lambda_handler",
         layers: [props.shared.powerToolsLayer, props.shared.commonLayer],
-        timeout: cdk.Duration.minutes(5),
+        // Also runs the migrations of the existing workspace tables
+        timeout: cdk.Duration.minutes(15),
         logRetention: props.config.logRetention ?? logs.RetentionDays.ONE_WEEK,
         loggingFormat: lambda.LoggingFormat.JSON,
         environment: {
@@ -159,5 +161,6 @@ export class CreateAuroraWorkspace extends Construct {
     }
 
     this.stateMachine = stateMachine;
+    this.createFunction = createFunction;
   }
 }
@@ -1,13 +1,22 @@
 import genai_core.workspaces
 import genai_core.aurora.create
+import genai_core.aurora.index
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
 logger = Logger()
 
+MIGRATE_WORKSPACE_TABLES = "migrate_workspace_tables"
+BUILD_IVFFLAT_INDEX = genai_core.aurora.index.BUILD_IVFFLAT_INDEX
+
 
 @logger.inject_lambda_context(log_event=True)
 def lambda_handler(event, context: LambdaContext):
+    if event.get("action") == MIGRATE_WORKSPACE_TABLES:
+        return migrate_workspace_tables(event.get("workspace_id"))
+    if event.get("action") == BUILD_IVFFLAT_INDEX:
+        return build_ivfflat_index(event["workspace_id"])
+
     workspace_id = event["workspace_id"]
     logger.info(f"Creating workspace {workspace_id}")
 
@@ -18,3 +27,35 @@ def lambda_handler(event, context: LambdaContext):
     genai_core.aurora.create.create_workspace_table(workspace)
 
     return {"ok": True}
+
+
+def migrate_workspace_tables(workspace_id: str = None):
+    """Invoked manually, for one workspace or all the Aurora workspaces"""
+    if workspace_id:
+        workspaces = [genai_core.workspaces.get_workspace(workspace_id)]
+    else:
+        workspaces = genai_core.workspaces.list_workspaces()
+
+    migrated = []
+    for workspace in workspaces:
+        if workspace is None or workspace["engine"] != "aurora":
+            continue
+        keyword_search = genai_core.aurora.create.migrate_keyword_search_columns(
+            workspace
+        )
+        filters = genai_core.aurora.create.migrate_filter_indexes(workspace)
+        if keyword_search or filters:
+            migrated.append(workspace["workspace_id"])
+
+    return {"ok": True, "migrated": migrated}
+
+
+def build_ivfflat_index(workspace_id: str):
+    """Invoked asynchronously by the import jobs once their chunks are loaded"""
+    workspace = genai_core.workspaces.get_workspace(workspace_id)
+    if not workspace:
+        logger.warning(f"Workspace {workspace_id} does not exist")
+        return {"ok": False}
+
+    built = genai_core.aurora.index.maybe_rebuild_ivfflat_index(workspace)
+    return {"ok": True, "built": built}
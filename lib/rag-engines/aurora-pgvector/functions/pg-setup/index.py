@@ -81,6 +81,11 @@ def lambda_handler(event, context: LambdaContext):
             # Quering the RAG only requires read operations
             cur.execute("GRANT pg_read_all_data TO aurora_db_iam_read; ")
 
+        # The vector indexes are built by the create workspace function which
+        # connects as the admin. Removes the membership granted to the
+        # loaders by the previous setup version.
+        cur.execute("REVOKE aurora_db_iam_admin FROM aurora_db_iam_write; ")
+
         cur.close()
         dbconn.close()
 
@@ -28,6 +28,8 @@ export enum AURORA_DB_USERS {
 export class AuroraPgVector extends Construct {
   readonly database: rds.DatabaseCluster;
   public readonly createAuroraWorkspaceWorkflow: sfn.StateMachine;
+  // Runs as the tables owner, also builds the IVFFlat indexes for the loaders
+  public readonly createAuroraWorkspaceFunction: lambda.Function;
 
   constructor(scope: Construct, id: string, props: AuroraPgVectorProps) {
     super(scope, id);
@@ -99,6 +101,8 @@ export class AuroraPgVector extends Construct {
         serviceToken: databaseSetupProvider.serviceToken,
         properties: {
           AURORA_DB_SECRET_ID: dbCluster.secret?.secretArn as string,
+          // Increment to run the setup again on existing clusters
+          SETUP_VERSION: "3",
         },
       }
     );
@@ -118,6 +122,7 @@ export class AuroraPgVector extends Construct {
 
     this.database = dbCluster;
     this.createAuroraWorkspaceWorkflow = createWorkflow.stateMachine;
+    this.createAuroraWorkspaceFunction = createWorkflow.createFunction;
 
     /**
      * CDK NAG suppression
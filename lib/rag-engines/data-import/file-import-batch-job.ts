@@ -9,6 +9,7 @@ import * as ecs from "aws-cdk-lib/aws-ecs";
 import * as s3 from "aws-cdk-lib/aws-s3";
 import * as aws_ecr_assets from "aws-cdk-lib/aws-ecr-assets";
 import * as iam from "aws-cdk-lib/aws-iam";
+import * as lambda from "aws-cdk-lib/aws-lambda";
 import * as rds from "aws-cdk-lib/aws-rds";
 import * as sagemaker from "aws-cdk-lib/aws-sagemaker";
 import { NagSuppressions } from "cdk-nag";
@@ -21,6 +22,7 @@ export interface FileImportBatchJobProps {
   readonly processingBucket: s3.Bucket;
   readonly ragDynamoDBTables: RagDynamoDBTables;
   readonly auroraDatabase?: rds.DatabaseCluster;
+  readonly auroraWorkspaceFunction?: lambda.IFunction;
   readonly sageMakerRagModelsEndpoint?: sagemaker.CfnEndpoint;
   readonly openSearchVector?: OpenSearchVector;
 }
@@ -83,6 +85,10 @@ export class FileImportBatchJob extends Construct {
           AURORA_DB_USER: AURORA_DB_USERS.WRITE,
           AURORA_DB_HOST: props.auroraDatabase?.clusterEndpoint?.hostname ?? "",
           AURORA_DB_PORT: props.auroraDatabase?.clusterEndpoint?.port + "",
+          // Builds the IVFFlat indexes as the tables owner once the chunks
+          // of the job are loaded
+          CREATE_AURORA_WORKSPACE_FUNCTION_NAME:
+            props.auroraWorkspaceFunction?.functionName ?? "",
           PROCESSING_BUCKET_NAME: props.processingBucket.bucketName,
           WORKSPACES_TABLE_NAME:
             props.ragDynamoDBTables.workspacesTable.tableName,
@@ -96,6 +102,10 @@ export class FileImportBatchJob extends Construct {
             props.sageMakerRagModelsEndpoint?.attrEndpointName ?? "",
           OPEN_SEARCH_COLLECTION_ENDPOINT:
             props.openSearchVector?.openSearchCollectionEndpoint ?? "",
+          // Ingestion throughput exported as EMF metrics in the job logs
+          TELEMETRY_ENABLED: "true",
+          // A chunks archive per document instead of an object per chunk
+          CHUNKS_STORAGE_FORMAT: "archive",
         },
       }
     );
@@ -137,6 +147,10 @@ export class FileImportBatchJob extends Construct {
       props.auroraDatabase.connections.allowDefaultPortFrom(computeEnvironment);
     }
 
+    if (props.auroraWorkspaceFunction) {
+      props.auroraWorkspaceFunction.grantInvoke(fileImportJobRole);
+    }
+
     if (props.openSearchVector) {
       fileImportJobRole.addToPolicy(
         new iam.PolicyStatement({
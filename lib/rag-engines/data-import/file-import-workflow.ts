@@ -105,6 +105,38 @@ export class FileImportWorkflow extends Construct {
       },
     });
 
+    // Small files uploaded together are imported by a single job, the
+    // job sets the status of each document of the batch manifest
+    const batchImportJob = new sfn.CustomState(this, "BatchImportJob", {
+      stateJson: {
+        Type: "Task",
+        Resource: `arn:${cdk.Aws.PARTITION}:states:::batch:submitJob.sync`,
+        Parameters: {
+          JobDefinition:
+            props.fileImportBatchJob.fileImportJob.jobDefinitionArn,
+          "JobName.$": "States.Format('BatchImport-{}', $.workspace_id)",
+          JobQueue: props.fileImportBatchJob.jobQueue.jobQueueArn,
+          ContainerOverrides: {
+            Environment: [
+              {
+                Name: "WORKSPACE_ID",
+                "Value.$": "$.workspace_id",
+              },
+              {
+                Name: "BATCH_BUCKET_NAME",
+                "Value.$": "$.batch_bucket_name",
+              },
+              {
+                Name: "BATCH_OBJECT_KEY",
+                "Value.$": "$.batch_object_key",
+              },
+            ],
+          },
+        },
+        ResultPath: "$.job",
+      },
+    }).next(new sfn.Succeed(this, "BatchSuccess"));
+
     const logGroup = new logs.LogGroup(this, "FileImportSMLogGroup", {
       removalPolicy:
         props.config.retainOnDelete === true
@@ -117,7 +149,9 @@ export class FileImportWorkflow extends Construct {
       logGroupName: `/aws/vendedlogs/states/FileImportStateMachine-${this.node.addr}`,
     });
 
-    const workflow = setProcessing.next(fileImportJob).next(setProcessed);
+    const workflow = new sfn.Choice(this, "IsBatchImport")
+      .when(sfn.Condition.isPresent("$.batch_object_key"), batchImportJob)
+      .otherwise(setProcessing.next(fileImportJob).next(setProcessed));
     const stateMachine = new sfn.StateMachine(this, "FileImportStateMachine", {
       definitionBody: sfn.DefinitionBody.fromChainable(workflow),
       timeout: cdk.Duration.hours(12),
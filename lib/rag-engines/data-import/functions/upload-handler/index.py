@@ -1,9 +1,12 @@
 import os
 import json
+import uuid
 import boto3
 import urllib.parse
+import genai_core.types
 import genai_core.documents
 import genai_core.workspaces
+from concurrent.futures import ThreadPoolExecutor
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.data_classes import SQSEvent, event_source
 from aws_lambda_powertools.utilities.typing import LambdaContext
@@ -20,19 +23,95 @@ DEFAULT_KENDRA_S3_DATA_SOURCE_BUCKET_NAME = os.environ.get(
     "DEFAULT_KENDRA_S3_DATA_SOURCE_BUCKET_NAME"
 )
 
+MAX_RECORDS_IN_PARALLEL = 8
+# Files up to this size are imported together by a single workflow execution
+BATCH_IMPORT_MAX_FILE_SIZE = int(
+    os.environ.get("BATCH_IMPORT_MAX_FILE_SIZE", str(1024 * 1024))
+)
+BATCH_IMPORT_MAX_FILES = int(os.environ.get("BATCH_IMPORT_MAX_FILES", "50"))
+
 
 @tracer.capture_lambda_handler
 @logger.inject_lambda_context(log_event=True)
 @event_source(data_class=SQSEvent)
 def lambda_handler(event: SQSEvent, context: LambdaContext):
+    records = []
+    failed_message_ids = set()
     for sqs_record in event.records:
-        records = get_records_from_sqs_record(sqs_record)
+        try:
+            for record in get_records_from_sqs_record(sqs_record):
+                records.append((sqs_record.message_id, record))
+        except Exception as e:
+            logger.exception(e)
+            failed_message_ids.add(sqs_record.message_id)
+
+    failed_message_ids.update(process_records(records))
+
+    # Only the messages with a failed record are retried by SQS
+    return {
+        "batchItemFailures": [
+            {"itemIdentifier": message_id} for message_id in failed_message_ids
+        ]
+    }
+
+
+def process_records(records: list) -> set:
+    """Imports the S3 records, returns the ids of the messages that failed"""
+    failed_message_ids = set()
+    uploads_by_workspace = {}
+    for message_id, record in records:
+        try:
+            upload = get_upload(record)
+        except Exception as e:
+            logger.exception(e)
+            failed_message_ids.add(message_id)
+            continue
+        upload["message_id"] = message_id
+        uploads_by_workspace.setdefault(upload["workspace_id"], []).append(upload)
+
+    # A failure only retries the messages of its workspace, the documents of
+    # the other workspaces are not created again
+    for workspace_id, uploads in uploads_by_workspace.items():
+        try:
+            workspace = genai_core.workspaces.get_workspace(workspace_id=workspace_id)
+        except Exception as e:
+            logger.exception(e)
+            failed_message_ids.update(upload["message_id"] for upload in uploads)
+            continue
+
+        if not workspace:
+            logger.error("Workspace not found", workspace_id=workspace_id)
+            failed_message_ids.update(upload["message_id"] for upload in uploads)
+            continue
+
+        # genai_core.documents uses a boto3 session and resource per thread
+        with ThreadPoolExecutor(max_workers=MAX_RECORDS_IN_PARALLEL) as executor:
+            futures = [
+                (upload, executor.submit(create_document, workspace, upload))
+                for upload in uploads
+            ]
 
-        for record in records:
-            process_record(record)
+        imports = []
+        for upload, future in futures:
+            try:
+                upload["document_id"] = future.result()
+                if workspace["engine"] != "kendra":
+                    imports.append(upload)
+            except Exception as e:
+                logger.exception(e)
+                failed_message_ids.add(upload["message_id"])
 
+        for batch in get_import_batches(imports):
+            try:
+                start_import(workspace_id, batch)
+            except Exception as e:
+                logger.exception(e)
+                failed_message_ids.update(upload["message_id"] for upload in batch)
 
-def process_record(record):
+    return failed_message_ids
+
+
+def get_upload(record) -> dict:
     bucket_name = record["s3"]["bucket"]["name"]
     object_key = urllib.parse.unquote_plus(record["s3"]["object"]["key"])
     object_size = record["s3"]["object"]["size"]
@@ -48,16 +127,27 @@ def process_record(record):
     logger.debug(f"workspace_id: {workspace_id}")
     logger.debug(f"file_name: {file_name}")
 
-    workspace = genai_core.workspaces.get_workspace(workspace_id=workspace_id)
-    if not workspace:
-        raise genai_core.types.CommonError("Workspace not found")
+    return {
+        "workspace_id": workspace_id,
+        "bucket_name": bucket_name,
+        "object_key": object_key,
+        "object_size": object_size,
+        "file_name": file_name,
+    }
+
+
+def create_document(workspace: dict, upload: dict) -> str:
+    workspace_id = upload["workspace_id"]
+    bucket_name = upload["bucket_name"]
+    object_key = upload["object_key"]
+    file_name = upload["file_name"]
 
     result = genai_core.documents.create_document(
         workspace_id=workspace_id,
         document_type="file",
         path=file_name,
         title=file_name,
-        size_in_bytes=object_size,
+        size_in_bytes=upload["object_size"],
     )
 
     document_id = result["document_id"]
@@ -93,23 +183,65 @@ def process_record(record):
         genai_core.documents.set_status(
             workspace_id=workspace_id, document_id=document_id, status="processed"
         )
+
+    return document_id
+
+
+def get_import_batches(uploads: list) -> list:
+    """Large files are imported alone, small files by batches"""
+    batches = []
+    small_files = []
+    for upload in uploads:
+        if upload["object_size"] > BATCH_IMPORT_MAX_FILE_SIZE:
+            batches.append([upload])
+        else:
+            small_files.append(upload)
+
+    for i in range(0, len(small_files), BATCH_IMPORT_MAX_FILES):
+        batches.append(small_files[i : i + BATCH_IMPORT_MAX_FILES])
+
+    return batches
+
+
+def get_import_input(upload: dict) -> dict:
+    workspace_id = upload["workspace_id"]
+    document_id = upload["document_id"]
+
+    return {
+        "workspace_id": workspace_id,
+        "document_id": document_id,
+        "input_bucket_name": upload["bucket_name"],
+        "input_object_key": upload["object_key"],
+        "processing_bucket_name": PROCESSING_BUCKET_NAME,
+        "processing_object_key": f"{workspace_id}/{document_id}/content.txt",
+    }
+
+
+def start_import(workspace_id: str, uploads: list):
+    if len(uploads) == 1:
+        execution_input = get_import_input(uploads[0])
     else:
-        processing_object_key = f"{workspace_id}/{document_id}/content.txt"
-        response = sfn_client.start_execution(
-            stateMachineArn=FILE_IMPORT_WORKFLOW_ARN,
-            input=json.dumps(
-                {
-                    "workspace_id": workspace_id,
-                    "document_id": document_id,
-                    "input_bucket_name": bucket_name,
-                    "input_object_key": object_key,
-                    "processing_bucket_name": PROCESSING_BUCKET_NAME,
-                    "processing_object_key": processing_object_key,
-                }
-            ),
+        # The documents of the batch are listed in a manifest read by the
+        # import job, the execution input is limited to 256KB
+        batch_object_key = f"batches/{workspace_id}/{uuid.uuid4()}.json"
+        s3.put_object(
+            Body=json.dumps([get_import_input(upload) for upload in uploads]),
+            Bucket=PROCESSING_BUCKET_NAME,
+            Key=batch_object_key,
+            ContentType="application/json",
         )
+        execution_input = {
+            "workspace_id": workspace_id,
+            "batch_bucket_name": PROCESSING_BUCKET_NAME,
+            "batch_object_key": batch_object_key,
+        }
+
+    response = sfn_client.start_execution(
+        stateMachineArn=FILE_IMPORT_WORKFLOW_ARN,
+        input=json.dumps(execution_input),
+    )
 
-        logger.info(response)
+    logger.info(response, documents=len(uploads))
 
 
 def get_records_from_sqs_record(record):
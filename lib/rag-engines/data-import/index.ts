@@ -29,6 +29,7 @@ export interface DataImportProps {
   readonly config: SystemConfig;
   readonly shared: Shared;
   readonly auroraDatabase?: rds.DatabaseCluster;
+  readonly auroraWorkspaceFunction?: lambda.IFunction;
   readonly ragDynamoDBTables: RagDynamoDBTables;
   readonly openSearchVector?: OpenSearchVector;
   readonly kendraRetrieval?: KendraRetrieval;
@@ -166,6 +167,7 @@ export class DataImport extends Construct {
         uploadBucket,
         processingBucket,
         auroraDatabase: props.auroraDatabase,
+        auroraWorkspaceFunction: props.auroraWorkspaceFunction,
         ragDynamoDBTables: props.ragDynamoDBTables,
         sageMakerRagModelsEndpoint: props.sageMakerRagModels?.model?.endpoint,
         openSearchVector: props.openSearchVector,
@@ -192,6 +194,7 @@ export class DataImport extends Construct {
         uploadBucket,
         processingBucket,
         auroraDatabase: props.auroraDatabase,
+        auroraWorkspaceFunction: props.auroraWorkspaceFunction,
         ragDynamoDBTables: props.ragDynamoDBTables,
         sageMakerRagModelsEndpoint: props.sageMakerRagModels?.model?.endpoint,
         openSearchVector: props.openSearchVector,
@@ -279,7 +282,11 @@ export class DataImport extends Construct {
     }
 
     uploadHandler.addEventSource(
-      new lambdaEventSources.SqsEventSource(ingestionQueue)
+      new lambdaEventSources.SqsEventSource(ingestionQueue, {
+        batchSize: 100,
+        maxBatchingWindow: cdk.Duration.seconds(5),
+        reportBatchItemFailures: true,
+      })
     );
 
     this.uploadBucket = uploadBucket;
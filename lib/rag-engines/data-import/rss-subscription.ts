@@ -122,7 +122,7 @@ export class RssSubscription extends Construct {
       {
         vpc: props.shared.vpc,
         description:
-          "Functions polls the RSS items for pending urls and invokes Website crawler inference. Max of 10 URLs per invoke.",
+          "Functions polls the RSS items for pending urls and invokes Website crawler inference. Max of RSS_POSTS_CRAWL_BATCH_SIZE URLs per invoke.",
         code: props.shared.sharedCode.bundleWithLambdaAsset(
           path.join(__dirname, "./functions/batch-crawl-rss-posts")
         ),
@@ -153,6 +153,9 @@ export class RssSubscription extends Construct {
           WEBSITE_CRAWLING_WORKFLOW_ARN:
             props.websiteCrawlerStateMachine.stateMachineArn,
           PROCESSING_BUCKET_NAME: props.processingBucket.bucketName,
+          RSS_POSTS_CRAWL_BATCH_SIZE: `${
+            props.config.rag.rssCrawlBatchSize ?? 10
+          }`,
         },
       }
     );
@@ -81,6 +81,7 @@ export class RagEngines extends Construct {
       shared: props.shared,
       config: props.config,
       auroraDatabase: auroraPgVector?.database,
+      auroraWorkspaceFunction: auroraPgVector?.createAuroraWorkspaceFunction,
       sageMakerRagModels: sageMakerRagModels ?? undefined,
       workspacesTable: tables.workspacesTable,
       documentsTable: tables.documentsTable,
@@ -155,17 +155,33 @@ export class DeleteWorkspace extends Construct {
       resultPath: sfn.JsonPath.DISCARD,
     });
 
+    // The function checkpoints its progress on the workspace item and returns
+    // done=false before its timeout. It is invoked again until it is done and
+    // a retried invocation resumes from the last completed step.
     const deleteTask = new tasks.LambdaInvoke(this, "Delete", {
       lambdaFunction: deleteFunction,
+      payloadResponseOnly: true,
       resultPath: "$.deleteResult",
-    }).addCatch(handleError, {
-      errors: ["States.ALL"],
-      resultPath: "$.deleteResult",
-    });
+    })
+      .addRetry({
+        errors: ["States.ALL"],
+        interval: cdk.Duration.seconds(10),
+        maxAttempts: 3,
+        backoffRate: 2,
+      })
+      .addCatch(handleError, {
+        errors: ["States.ALL"],
+        resultPath: "$.deleteResult",
+      });
 
-    const workflow = setDeleting
-      .next(deleteTask)
-      .next(new sfn.Succeed(this, "Success"));
+    const workflow = setDeleting.next(deleteTask).next(
+      new sfn.Choice(this, "IsDeleted")
+        .when(
+          sfn.Condition.booleanEquals("$.deleteResult.done", false),
+          deleteTask
+        )
+        .otherwise(new sfn.Succeed(this, "Success"))
+    );
 
     const logGroup = new logs.LogGroup(this, "DeleteWorkspaceSMLogGroup", {
       removalPolicy:
@@ -181,7 +197,7 @@ export class DeleteWorkspace extends Construct {
 
     const stateMachine = new sfn.StateMachine(this, "DeleteWorkspace", {
       definitionBody: sfn.DefinitionBody.fromChainable(workflow),
-      timeout: cdk.Duration.minutes(5),
+      timeout: cdk.Duration.hours(6),
       comment: "Delete Workspace Workflow",
       tracingEnabled: true,
       logs: {
@@ -0,0 +1,19 @@
+from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools.utilities.typing import LambdaContext
+import genai_core.workspace_stats
+
+logger = Logger()
+tracer = Tracer()
+
+
+@tracer.capture_lambda_handler()
+@logger.inject_lambda_context(log_event=True)
+def lambda_handler(event, context: LambdaContext):
+    workspace_id = event.get("workspace_id")
+    if workspace_id:
+        return genai_core.workspace_stats.aggregate_workspace_stats(workspace_id)
+
+    workspaces = genai_core.workspace_stats.aggregate_all_workspace_stats()
+    logger.info("Aggregated the stats of the workspaces", workspaces=workspaces)
+
+    return {"workspaces": workspaces}
@@ -9,21 +9,32 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 
 logger = Logger()
 
+# Time kept to checkpoint and return before the Lambda timeout. The state
+# machine invokes the function again until the deletion is done.
+STOP_MARGIN_MS = 60 * 1000
+
 
 @logger.inject_lambda_context(log_event=True)
 def lambda_handler(event, context: LambdaContext):
     workspace_id = event["workspace_id"]
     workspace = genai_core.workspaces.get_workspace(workspace_id)
     if workspace is None:
-        raise genai_core.types.CommonError("Workspace not found")
+        # Deleted by an earlier invocation of a retried execution
+        logger.info("Workspace already deleted", workspace_id=workspace_id)
+        return {"done": True}
+
+    def should_stop():
+        return context.get_remaining_time_in_millis() < STOP_MARGIN_MS
 
     if workspace["engine"] == "aurora":
-        genai_core.aurora.delete.delete_workspace(workspace)
+        done = genai_core.aurora.delete.delete_workspace(workspace, should_stop)
     elif workspace["engine"] == "opensearch":
-        genai_core.opensearch.delete.delete_workspace(workspace)
+        done = genai_core.opensearch.delete.delete_workspace(workspace, should_stop)
     elif workspace["engine"] == "kendra":
-        genai_core.kendra.delete.delete_workspace(workspace)
+        done = genai_core.kendra.delete.delete_workspace(workspace, should_stop)
     elif workspace["engine"] == "bedrock_kb":
-        genai_core.bedrock_kb.delete.delete_workspace(workspace)
+        done = genai_core.bedrock_kb.delete.delete_workspace(workspace, should_stop)
     else:
         raise genai_core.types.CommonError("Workspace engine not supported")
+
+    return {"done": done}
@@ -9,6 +9,7 @@ import { OpenSearchVector } from "../opensearch-vector";
 import { RagDynamoDBTables } from "../rag-dynamodb-tables";
 import { DeleteWorkspace } from "./delete-workspace";
 import { DeleteDocument } from "./delete-document";
+import { WorkspaceStats } from "./workspace-stats";
 
 export interface WorkkspacesProps {
   readonly config: SystemConfig;
@@ -51,6 +52,12 @@ export class Workspaces extends Construct {
       kendraRetrieval: props.kendraRetrieval,
     });
 
+    new WorkspaceStats(this, "WorkspaceStats", {
+      config: props.config,
+      shared: props.shared,
+      ragDynamoDBTables: props.ragDynamoDBTables,
+    });
+
     this.deleteWorkspaceWorkflow = deleteWorkspaceWorkflow.stateMachine;
     this.deleteDocumentWorkflow = deleteDocumentWorkflow.stateMachine;
   }
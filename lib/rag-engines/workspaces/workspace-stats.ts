@@ -0,0 +1,68 @@
+import * as cdk from "aws-cdk-lib";
+import * as events from "aws-cdk-lib/aws-events";
+import * as targets from "aws-cdk-lib/aws-events-targets";
+import * as lambda from "aws-cdk-lib/aws-lambda";
+import * as logs from "aws-cdk-lib/aws-logs";
+import { Construct } from "constructs";
+import * as path from "path";
+import { Shared } from "../../shared";
+import { SystemConfig } from "../../shared/types";
+import { RagDynamoDBTables } from "../rag-dynamodb-tables";
+
+export interface WorkspaceStatsProps {
+  readonly config: SystemConfig;
+  readonly shared: Shared;
+  readonly ragDynamoDBTables: RagDynamoDBTables;
+}
+
+export class WorkspaceStats extends Construct {
+  public readonly aggregateFunction: lambda.Function;
+
+  constructor(scope: Construct, id: string, props: WorkspaceStatsProps) {
+    super(scope, id);
+
+    const aggregateFunction = new lambda.Function(
+      this,
+      "AggregateWorkspaceStatsFunction",
+      {
+        code: props.shared.sharedCode.bundleWithLambdaAsset(
+          path.join(__dirname, "./functions/aggregate-workspace-stats")
+        ),
+        description:
+          "Recomputes the documents, vectors and size counters of the workspaces",
+        runtime: props.shared.pythonRuntime,
+        architecture: props.shared.lambdaArchitecture,
+        tracing: props.config.advancedMonitoring
+          ? lambda.Tracing.ACTIVE
+          : lambda.Tracing.DISABLED,
+        handler: "index.lambda_handler",
+        layers: [props.shared.powerToolsLayer, props.shared.commonLayer],
+        memorySize: 512,
+        timeout: cdk.Duration.minutes(15),
+        logRetention: props.config.logRetention ?? logs.RetentionDays.ONE_WEEK,
+        loggingFormat: lambda.LoggingFormat.JSON,
+        environment: {
+          ...props.shared.defaultEnvironmentVariables,
+          WORKSPACES_TABLE_NAME:
+            props.ragDynamoDBTables.workspacesTable.tableName,
+          WORKSPACES_BY_OBJECT_TYPE_INDEX_NAME:
+            props.ragDynamoDBTables.workspacesByObjectTypeIndexName,
+          DOCUMENTS_TABLE_NAME:
+            props.ragDynamoDBTables.documentsTable.tableName,
+        },
+      }
+    );
+
+    props.ragDynamoDBTables.workspacesTable.grantReadWriteData(
+      aggregateFunction
+    );
+    props.ragDynamoDBTables.documentsTable.grantReadData(aggregateFunction);
+
+    new events.Rule(this, "AggregateWorkspaceStatsSchedule", {
+      schedule: events.Schedule.rate(cdk.Duration.days(1)),
+      targets: [new targets.LambdaFunction(aggregateFunction)],
+    });
+
+    this.aggregateFunction = aggregateFunction;
+  }
+}
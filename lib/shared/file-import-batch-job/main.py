@@ -1,10 +1,13 @@
 import os
+import json
 import boto3
 import genai_core.types
 import genai_core.chunks
 import genai_core.documents
 import genai_core.workspaces
 import genai_core.aurora.create
+import genai_core.aurora.index
+import genai_core.utils.telemetry as telemetry
 from langchain_community.document_loaders import S3FileLoader
 
 WORKSPACE_ID = os.environ.get("WORKSPACE_ID")
@@ -14,10 +17,17 @@ INPUT_OBJECT_KEY = os.environ.get("INPUT_OBJECT_KEY")
 PROCESSING_BUCKET_NAME = os.environ.get("PROCESSING_BUCKET_NAME")
 PROCESSING_OBJECT_KEY = os.environ.get("PROCESSING_OBJECT_KEY")
 
+BATCH_BUCKET_NAME = os.environ.get("BATCH_BUCKET_NAME")
+BATCH_OBJECT_KEY = os.environ.get("BATCH_OBJECT_KEY")
+
 s3_client = boto3.client("s3")
 
 
 def main():
+    if BATCH_OBJECT_KEY:
+        import_batch()
+        return
+
     print("Starting file converter batch job")
     print("Workspace ID: {}".format(WORKSPACE_ID))
     print("Document ID: {}".format(DOCUMENT_ID))
@@ -26,44 +36,124 @@ def main():
     print("Output bucket name: {}".format(PROCESSING_BUCKET_NAME))
     print("Output object key: {}".format(PROCESSING_OBJECT_KEY))
 
-    workspace = genai_core.workspaces.get_workspace(WORKSPACE_ID)
+    workspace = get_workspace(WORKSPACE_ID)
+    # The progress of a single file is its status, only the metrics are exported
+    with genai_core.chunks.IngestionMetrics(
+        workspace, None, 1, job="FileImport"
+    ) as metrics:
+        import_file(
+            workspace,
+            DOCUMENT_ID,
+            INPUT_BUCKET_NAME,
+            INPUT_OBJECT_KEY,
+            PROCESSING_BUCKET_NAME,
+            PROCESSING_OBJECT_KEY,
+        )
+        metrics.update(1)
+
+    genai_core.aurora.index.request_ivfflat_index_build(workspace)
+
+
+def import_batch():
+    """Imports the files listed in the batch manifest of the upload handler.
+    A failing file is set in error without stopping the others."""
+    print("Starting file converter batch job")
+    print("Workspace ID: {}".format(WORKSPACE_ID))
+    print("Batch object: {}/{}".format(BATCH_BUCKET_NAME, BATCH_OBJECT_KEY))
+
+    object = s3_client.get_object(Bucket=BATCH_BUCKET_NAME, Key=BATCH_OBJECT_KEY)
+    files = json.loads(object["Body"].read().decode("utf-8"))
+    workspace = get_workspace(WORKSPACE_ID)
+
+    errors = 0
+    metrics = genai_core.chunks.IngestionMetrics(
+        workspace, None, len(files), job="BatchImport"
+    )
+    with metrics:
+        for idx, file in enumerate(files):
+            print("Document ID: {}".format(file["document_id"]))
+            genai_core.documents.set_status(
+                WORKSPACE_ID, file["document_id"], "processing"
+            )
+            try:
+                import_file(
+                    workspace,
+                    file["document_id"],
+                    file["input_bucket_name"],
+                    file["input_object_key"],
+                    file["processing_bucket_name"],
+                    file["processing_object_key"],
+                )
+                genai_core.documents.set_status(
+                    WORKSPACE_ID, file["document_id"], "processed"
+                )
+            except Exception:
+                errors += 1
+                telemetry.add_metric("ImportErrors", 1)
+
+            metrics.update(idx + 1)
+
+    print("Imported {} files, {} errors".format(len(files) - errors, errors))
+    genai_core.aurora.index.request_ivfflat_index_build(workspace)
+    s3_client.delete_object(Bucket=BATCH_BUCKET_NAME, Key=BATCH_OBJECT_KEY)
+
+
+def get_workspace(workspace_id: str) -> dict:
+    workspace = genai_core.workspaces.get_workspace(workspace_id)
     if not workspace:
-        raise genai_core.types.CommonError(f"Workspace {WORKSPACE_ID} does not exist")
+        raise genai_core.types.CommonError(f"Workspace {workspace_id} does not exist")
+
+    return workspace
 
-    document = genai_core.documents.get_document(WORKSPACE_ID, DOCUMENT_ID)
+
+def import_file(
+    workspace: dict,
+    document_id: str,
+    input_bucket_name: str,
+    input_object_key: str,
+    processing_bucket_name: str,
+    processing_object_key: str,
+):
+    workspace_id = workspace["workspace_id"]
+    document = genai_core.documents.get_document(workspace_id, document_id)
     if not document:
         raise genai_core.types.CommonError(
-            f"Document {WORKSPACE_ID}/{DOCUMENT_ID} does not exist"
+            f"Document {workspace_id}/{document_id} does not exist"
         )
 
     try:
-        extension = os.path.splitext(INPUT_OBJECT_KEY)[-1].lower()
-        if extension == ".txt":
-            object = s3_client.get_object(
-                Bucket=INPUT_BUCKET_NAME, Key=INPUT_OBJECT_KEY
-            )
-            content = object["Body"].read().decode("utf-8")
-        else:
-            loader = S3FileLoader(INPUT_BUCKET_NAME, INPUT_OBJECT_KEY)
-            print(f"loader: {loader}")
-            docs = loader.load()
-            content = docs[0].page_content
+        with telemetry.span("Load"):
+            content = load_content(input_bucket_name, input_object_key)
 
         if (
-            INPUT_BUCKET_NAME != PROCESSING_BUCKET_NAME
-            and INPUT_OBJECT_KEY != PROCESSING_OBJECT_KEY
+            input_bucket_name != processing_bucket_name
+            and input_object_key != processing_object_key
         ):
             s3_client.put_object(
-                Bucket=PROCESSING_BUCKET_NAME, Key=PROCESSING_OBJECT_KEY, Body=content
+                Bucket=processing_bucket_name,
+                Key=processing_object_key,
+                Body=content,
             )
 
         add_chunks(workspace, document, content)
     except Exception as error:
-        genai_core.documents.set_status(WORKSPACE_ID, DOCUMENT_ID, "error")
+        genai_core.documents.set_status(workspace_id, document_id, "error")
         print(error)
         raise error
 
 
+def load_content(input_bucket_name: str, input_object_key: str) -> str:
+    extension = os.path.splitext(input_object_key)[-1].lower()
+    if extension == ".txt":
+        object = s3_client.get_object(Bucket=input_bucket_name, Key=input_object_key)
+        return object["Body"].read().decode("utf-8")
+
+    loader = S3FileLoader(input_bucket_name, input_object_key)
+    print(f"loader: {loader}")
+    docs = loader.load()
+    return docs[0].page_content
+
+
 def add_chunks(workspace: dict, document: dict, content: str):
     chunks = genai_core.chunks.split_content(workspace, content)
 
@@ -1,11 +1,13 @@
 from decimal import Decimal
 import os
+import time
 import uuid
 from aws_lambda_powertools import Logger
 import boto3
 from datetime import datetime
+from typing import Optional
 from botocore.exceptions import ClientError
-from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.conditions import Key
 import genai_core.roles
 import genai_core.workspaces
 import genai_core.models
@@ -18,61 +20,217 @@ APPLICATIONS_TABLE_NAME = os.environ.get("APPLICATIONS_TABLE_NAME")
 if APPLICATIONS_TABLE_NAME:
     table = dynamodb.Table(APPLICATIONS_TABLE_NAME)
 
+# (Role, ApplicationId) items listing the applications visible to a role
+APPLICATION_ROLES_TABLE_NAME = os.environ.get("APPLICATION_ROLES_TABLE_NAME")
+if APPLICATION_ROLES_TABLE_NAME:
+    roles_table = dynamodb.Table(APPLICATION_ROLES_TABLE_NAME)
 
-def list_applications():
-    items = []
-    try:
-        last_evaluated_key = None
-        while True:
-            if last_evaluated_key:
-                response = table.scan(
-                    ExclusiveStartKey=last_evaluated_key,
-                )
-            else:
-                response = table.scan()
+# Written once the applications created before the roles table are indexed
+ROLES_INDEX_MARKER = {"Role": "#index", "ApplicationId": "#complete"}
+# Passes of the backfill until no application changed while it ran
+ROLES_INDEX_ATTEMPTS = 3
+BATCH_GET_MAX_KEYS = 100
+# Unprocessed keys of the batch reads are retried with an exponential backoff
+BATCH_GET_ATTEMPTS = 5
+BATCH_GET_BACKOFF = 0.05
 
-            items.extend(response.get("Items", []))
+# The lists are cached per Lambda instance. The writes clear the cache of
+# the instance serving them, the other instances see them after the TTL.
+APPLICATIONS_CACHE_TTL = int(os.environ.get("APPLICATIONS_CACHE_TTL", "30"))
+_applications_cache = {}
+_roles_index_complete = False
 
-            last_evaluated_key = response.get("LastEvaluatedKey")
-            if not last_evaluated_key:
-                break
 
+def list_applications():
+    cached = _get_cached("*")
+    if cached is not None:
+        return cached
+
+    try:
+        items = _scan(table)
     except ClientError as error:
         logger.exception(error)
+        return []
+
+    _set_cached("*", items)
+
+    return items
+
+
+def _scan(scanned_table, **kwargs):
+    items = []
+    while True:
+        response = scanned_table.scan(**kwargs)
+        items.extend(response.get("Items", []))
+
+        last_evaluated_key = response.get("LastEvaluatedKey")
+        if not last_evaluated_key:
+            break
+        kwargs["ExclusiveStartKey"] = last_evaluated_key
 
     return items
 
 
 def list_applications_by_role(role):
+    return list_applications_by_roles([role])
+
+
+def list_applications_by_roles(roles: list[str]):
+    """Applications visible to any of the roles, each listed once"""
+    cache_key = tuple(sorted(set(roles)))
+    cached = _get_cached(cache_key)
+    if cached is not None:
+        return cached
+
     items = []
     try:
-        last_evaluated_key = None
-        while True:
-            if last_evaluated_key:
-                response = table.scan(
-                    FilterExpression=Attr("Roles").contains(role),
-                    ExclusiveStartKey=last_evaluated_key,
-                )
-            else:
-                response = table.scan(
-                    FilterExpression=Attr("Roles").contains(role),
-                )
-
-            items.extend(response.get("Items", []))
-
-            last_evaluated_key = response.get("LastEvaluatedKey")
-            if not last_evaluated_key:
-                break
+        _ensure_roles_index()
+
+        application_ids = set()
+        for role in cache_key:
+            application_ids.update(_list_role_application_ids(role))
 
+        application_ids = sorted(application_ids)
+        for i in range(0, len(application_ids), BATCH_GET_MAX_KEYS):
+            items.extend(
+                _batch_get_applications(application_ids[i : i + BATCH_GET_MAX_KEYS])
+            )
     except ClientError as error:
-        if error.response["Error"]["Code"] == "ResourceNotFoundException":
-            logger.warning("No record found for role: %s", role)
-        else:
-            logger.exception(error)
+        logger.exception(error)
+        return items
+
+    items = sorted(items, key=lambda item: item["Id"])
+    _set_cached(cache_key, items)
 
     return items
 
 
+def _list_role_application_ids(role: str):
+    application_ids = []
+    query_args = {
+        "KeyConditionExpression": Key("Role").eq(role),
+        "ProjectionExpression": "ApplicationId",
+    }
+    while True:
+        response = roles_table.query(**query_args)
+        application_ids.extend(item["ApplicationId"] for item in response["Items"])
+
+        if "LastEvaluatedKey" not in response:
+            break
+        query_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    return application_ids
+
+
+def _batch_get_applications(application_ids: list[str]):
+    items = []
+    request_items = {
+        APPLICATIONS_TABLE_NAME: {
+            "Keys": [{"Id": application_id} for application_id in application_ids]
+        }
+    }
+    for attempt in range(BATCH_GET_ATTEMPTS):
+        if attempt > 0:
+            time.sleep(BATCH_GET_BACKOFF * 2**attempt)
+        response = dynamodb.batch_get_item(RequestItems=request_items)
+        items.extend(response["Responses"].get(APPLICATIONS_TABLE_NAME, []))
+        request_items = response.get("UnprocessedKeys")
+        if not request_items:
+            break
+    else:
+        # Not cached, the next request reads them again
+        raise genai_core.types.CommonError("Applications could not be read")
+
+    return items
+
+
+def _set_application_roles(
+    application_id: str, roles: list[str], previous_roles: Optional[list[str]] = None
+):
+    previous_roles = previous_roles or []
+    with roles_table.batch_writer() as batch:
+        for role in set(previous_roles) - set(roles):
+            batch.delete_item(Key={"Role": role, "ApplicationId": application_id})
+        for role in set(roles) - set(previous_roles):
+            batch.put_item(Item={"Role": role, "ApplicationId": application_id})
+
+
+def _ensure_roles_index():
+    """Indexes the roles of the applications created before the roles table"""
+    global _roles_index_complete
+    if _roles_index_complete:
+        return
+
+    if "Item" not in roles_table.get_item(Key=ROLES_INDEX_MARKER):
+        logger.info("Indexing the roles of the applications")
+        if not _reconcile_roles_index():
+            # Served from the rows indexed so far, the next request retries
+            logger.warning("Applications changed while indexing their roles")
+            return
+
+        try:
+            roles_table.put_item(
+                Item=ROLES_INDEX_MARKER,
+                ConditionExpression="attribute_not_exists(#role)",
+                ExpressionAttributeNames={"#role": "Role"},
+            )
+        except ClientError as error:
+            # Written by another instance
+            if error.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise error
+
+    _roles_index_complete = True
+
+
+def _reconcile_roles_index() -> bool:
+    """Makes the role rows match the applications table. The applications
+    are scanned directly (not from the cache) and again after the rows are
+    written, an update running meanwhile starts a new pass."""
+    applications = _get_applications_roles()
+    for _ in range(ROLES_INDEX_ATTEMPTS):
+        rows = {
+            (item["Role"], item["ApplicationId"])
+            for item in _scan(roles_table, ConsistentRead=True)
+            if item["Role"] != ROLES_INDEX_MARKER["Role"]
+        }
+        expected = {
+            (role, application_id)
+            for application_id, roles in applications.items()
+            for role in roles
+        }
+        with roles_table.batch_writer() as batch:
+            for role, application_id in rows - expected:
+                batch.delete_item(Key={"Role": role, "ApplicationId": application_id})
+            for role, application_id in expected - rows:
+                batch.put_item(Item={"Role": role, "ApplicationId": application_id})
+
+        current = _get_applications_roles()
+        if current == applications:
+            return True
+        applications = current
+
+    return False
+
+
+def _get_applications_roles() -> dict:
+    return {
+        item["Id"]: frozenset(item.get("Roles", []))
+        for item in _scan(table, ConsistentRead=True)
+    }
+
+
+def _get_cached(key):
+    cached = _applications_cache.get(key)
+    if cached is None or cached[0] < time.monotonic():
+        return None
+
+    return cached[1]
+
+
+def _set_cached(key, items):
+    _applications_cache[key] = (time.monotonic() + APPLICATIONS_CACHE_TTL, items)
+
+
 def get_application(id: str):
     response = table.get_item(Key={"Id": id})
     item = response.get("Item")
@@ -128,6 +286,8 @@ def create_application(
     }
 
     ddb_response = table.put_item(Item=item)
+    _set_application_roles(application_id, roles)
+    _applications_cache.clear()
 
     logger.info(
         "Response for create_application",
@@ -187,6 +347,8 @@ def update_application(
     }
 
     ddb_response = table.put_item(Item=item)
+    _set_application_roles(id, roles, response.get("Item").get("Roles", []))
+    _applications_cache.clear()
 
     logger.info(
         "Response for update_application",
@@ -198,7 +360,9 @@ def update_application(
 
 def delete_application(id):
     try:
-        table.delete_item(Key={"Id": id})
+        response = table.delete_item(Key={"Id": id}, ReturnValues="ALL_OLD")
+        _set_application_roles(id, [], response.get("Attributes", {}).get("Roles", []))
+        _applications_cache.clear()
     except ClientError as error:
         if error.response["Error"]["Code"] == "ResourceNotFoundException":
             logger.warning("No record found with id: %s", id)
@@ -1,6 +1,8 @@
 from aws_lambda_powertools import Logger
 from psycopg2 import sql
 from genai_core.aurora.connection import AuroraConnection
+from genai_core.aurora.index import create_hnsw_index, get_vector_type
+import genai_core.workspaces
 
 logger = Logger()
 
@@ -13,7 +15,6 @@ def create_workspace_table(workspace: dict):
     hybrid_search = workspace["hybrid_search"]
     languages = workspace["languages"]
     has_index = workspace["has_index"]
-    metric = workspace["metric"]
 
     with AuroraConnection(autocommit=False) as cursor:
         cursor.execute(
@@ -30,11 +31,11 @@ def create_workspace_table(workspace: dict):
                     title TEXT,
                     content TEXT,
                     content_complement TEXT,
-                    content_embeddings vector(%s),
+                    content_embeddings {vector_type}(%s),
                     metadata JSONB,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );"""
-            ).format(table=table_name),
+            ).format(table=table_name, vector_type=sql.SQL(get_vector_type(workspace))),
             [embeddings_model_dimensions],
         )
 
@@ -48,37 +49,111 @@ def create_workspace_table(workspace: dict):
             )
         )
 
+        add_filter_indexes(cursor, workspace_id)
+
         if hybrid_search:
             for language in languages:
-                cursor.execute(
-                    sql.SQL(
-                        "CREATE INDEX ON {table} USING "
-                        + " GIN (to_tsvector('{language}', content));"
-                    ).format(table=table_name, language=sql.Identifier(language))
-                )
+                add_keyword_search_column(cursor, workspace_id, language)
 
-        if has_index:
-            if metric == "cosine":
-                cursor.execute(
-                    sql.SQL(
-                        "CREATE INDEX ON {table} USING ivfflat "
-                        + "(content_embeddings vector_cosine_ops) WITH (lists = 100);"
-                    ).format(table=table_name)
-                )
-            elif metric == "l2":
-                cursor.execute(
-                    sql.SQL(
-                        "CREATE INDEX ON {table} USING ivfflat "
-                        + "(content_embeddings vector_l2_ops) WITH (lists = 100);"
-                    ).format(table=table_name)
-                )
-            elif metric == "inner":
-                cursor.execute(
-                    sql.SQL(
-                        "CREATE INDEX ON {table} USING ivfflat "
-                        + "(content_embeddings vector_ip_ops) WITH (lists = 100);"
-                    ).format(table=table_name)
-                )
+        # IVFFlat indexes are built once the table has data (see index.py)
+        if has_index and workspace.get("index_type") == "hnsw":
+            create_hnsw_index(cursor, workspace)
 
         cursor.connection.commit()
         logger.info("Created workspace table")
+
+
+def get_keyword_search_column(language: str) -> str:
+    return f"content_tsv_{language}"
+
+
+def add_keyword_search_column(cursor, workspace_id: str, language: str):
+    """Stored tsvector of the content, computed once when the chunk is inserted
+    instead of for every row scanned by the keyword search"""
+    table_name = workspace_id.replace("-", "")
+    column = get_keyword_search_column(language)
+
+    cursor.execute(
+        sql.SQL(
+            "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} tsvector "
+            + "GENERATED ALWAYS AS "
+            + "(to_tsvector(%s::regconfig, coalesce(content, ''))) STORED;"
+        ).format(table=sql.Identifier(table_name), column=sql.Identifier(column)),
+        [language],
+    )
+    cursor.execute(
+        sql.SQL(
+            "CREATE INDEX IF NOT EXISTS {index} ON {table} USING GIN ({column});"
+        ).format(
+            index=sql.Identifier(f"{table_name}_{column}"),
+            table=sql.Identifier(table_name),
+            column=sql.Identifier(column),
+        )
+    )
+
+
+def add_filter_indexes(cursor, workspace_id: str):
+    """Indexes of the search filters (document_id is already indexed)"""
+    table_name = workspace_id.replace("-", "")
+    for name, definition in [
+        ("document_type", "(document_type)"),
+        ("path", "(path text_pattern_ops)"),
+        ("metadata", "USING GIN (metadata jsonb_path_ops)"),
+    ]:
+        cursor.execute(
+            sql.SQL(
+                "CREATE INDEX IF NOT EXISTS {index} ON {table} {definition};"
+            ).format(
+                index=sql.Identifier(f"{table_name}_{name}"),
+                table=sql.Identifier(table_name),
+                definition=sql.SQL(definition),
+            )
+        )
+
+
+def migrate_filter_indexes(workspace: dict):
+    """Adds the search filters indexes to a workspace created before them"""
+    if workspace.get("filter_indexes"):
+        return False
+
+    with AuroraConnection(autocommit=False) as cursor:
+        add_filter_indexes(cursor, workspace["workspace_id"])
+        cursor.connection.commit()
+
+    genai_core.workspaces.set_workspace_flag(
+        workspace["workspace_id"], "filter_indexes"
+    )
+    return True
+
+
+def migrate_keyword_search_columns(workspace: dict):
+    """Replaces the to_tsvector expression indexes of a workspace created
+    before the stored tsvector columns. Adding a stored column rewrites the
+    table so it is done in a single transaction per workspace."""
+    workspace_id = workspace["workspace_id"]
+    table_name = workspace_id.replace("-", "")
+    if not workspace["hybrid_search"] or workspace.get("keyword_search_columns"):
+        return False
+
+    with AuroraConnection(autocommit=False) as cursor:
+        for language in workspace["languages"]:
+            add_keyword_search_column(cursor, workspace_id, language)
+
+        cursor.execute(
+            """SELECT indexname FROM pg_indexes
+                WHERE tablename = %s AND indexdef LIKE '%%to_tsvector%%';""",
+            [table_name],
+        )
+        for row in cursor.fetchall():
+            cursor.execute(
+                sql.SQL("DROP INDEX IF EXISTS {index};").format(
+                    index=sql.Identifier(row[0])
+                )
+            )
+
+        cursor.connection.commit()
+
+    genai_core.workspaces.set_workspace_flag(workspace_id, "keyword_search_columns")
+    logger.info("Migrated keyword search columns", workspace_id=workspace_id)
+
+    return True
@@ -0,0 +1,253 @@
+import os
+import json
+import math
+import boto3
+from typing import Optional, Tuple
+from aws_lambda_powertools import Logger
+from psycopg2 import sql
+from genai_core.aurora.connection import AuroraConnection
+
+logger = Logger()
+
+# Function of the create workspace workflow, it connects as the tables owner
+# and builds the IVFFlat indexes requested by the import jobs
+CREATE_AURORA_WORKSPACE_FUNCTION_NAME = os.environ.get(
+    "CREATE_AURORA_WORKSPACE_FUNCTION_NAME"
+)
+BUILD_IVFFLAT_INDEX = "build_ivfflat_index"
+
+INDEX_TYPES = ["ivfflat", "hnsw"]
+DEFAULT_INDEX_TYPE = "ivfflat"
+
+METRIC_OPERATOR_CLASSES = {
+    "cosine": "cosine_ops",
+    "l2": "l2_ops",
+    "inner": "ip_ops",
+}
+
+# Storage precision of the embeddings:
+# - float32: vector column, the index stores full vectors
+# - float16: halfvec column, half the size of the table and of the index
+# - quantized: vector column with a binary quantized index, the candidates
+#   returned by the index are re-ranked with the full vectors
+VECTOR_PRECISIONS = ["float32", "float16", "quantized"]
+DEFAULT_VECTOR_PRECISION = "float32"
+QUANTIZED_RERANK_FACTOR = 4
+
+# pgvector defaults
+DEFAULT_HNSW_M = 16
+DEFAULT_HNSW_EF_CONSTRUCTION = 64
+DEFAULT_HNSW_EF_SEARCH = 40
+DEFAULT_IVFFLAT_PROBES = 10
+
+# IVFFlat centroids are computed from the rows present when the index is built.
+# Below this size an exact scan is fast, so the index is only built once the
+# table has enough rows and rebuilt when the row count doubles.
+MIN_IVFFLAT_ROWS = 1000
+IVFFLAT_REBUILD_RATIO = 2
+
+
+def get_table_name(workspace_id: str) -> str:
+    return workspace_id.replace("-", "")
+
+
+def ivfflat_lists(rows: int) -> int:
+    """Number of lists recommended by pgvector for the number of rows"""
+    if rows <= 1000000:
+        return max(1, rows // 1000)
+    return int(math.sqrt(rows))
+
+
+def get_vector_precision(workspace: dict) -> str:
+    return workspace.get("vector_precision") or DEFAULT_VECTOR_PRECISION
+
+
+def get_vector_type(workspace: dict) -> str:
+    """Type of the content_embeddings column"""
+    return "halfvec" if get_vector_precision(workspace) == "float16" else "vector"
+
+
+def get_indexed_expression(workspace: dict) -> sql.Composable:
+    """Expression and operator class of the ANN index of the workspace"""
+    if get_vector_precision(workspace) == "quantized":
+        # Hamming distance on the sign bits of the embeddings
+        return sql.SQL(
+            "(binary_quantize(content_embeddings)::bit({dims})) {ops}"
+        ).format(
+            dims=sql.Literal(int(workspace["embeddings_model_dimensions"])),
+            ops=sql.SQL("bit_hamming_ops"),
+        )
+
+    ops = METRIC_OPERATOR_CLASSES[workspace["metric"]]
+    return sql.SQL("content_embeddings {ops}").format(
+        ops=sql.SQL(f"{get_vector_type(workspace)}_{ops}")
+    )
+
+
+def create_hnsw_index(cursor, workspace: dict):
+    table_name = get_table_name(workspace["workspace_id"])
+    cursor.execute(
+        sql.SQL(
+            "CREATE INDEX {index} ON {table} USING hnsw "
+            + "({expression}) WITH (m = %s, ef_construction = %s);"
+        ).format(
+            index=sql.Identifier(f"{table_name}_hnsw"),
+            table=sql.Identifier(table_name),
+            expression=get_indexed_expression(workspace),
+        ),
+        [
+            int(workspace.get("hnsw_m") or DEFAULT_HNSW_M),
+            int(workspace.get("hnsw_ef_construction") or DEFAULT_HNSW_EF_CONSTRUCTION),
+        ],
+    )
+
+
+def set_search_parameters(cursor, workspace: dict, limit: int):
+    """Sets the query-time knobs of the workspace index for the current
+    transaction. The cursor must not be in autocommit mode."""
+    if not workspace.get("has_index"):
+        return
+
+    if get_vector_precision(workspace) == "quantized":
+        limit = limit * QUANTIZED_RERANK_FACTOR
+
+    if workspace.get("index_type", DEFAULT_INDEX_TYPE) == "hnsw":
+        # ef_search bounds the number of results of an HNSW scan
+        ef_search = int(workspace.get("hnsw_ef_search") or DEFAULT_HNSW_EF_SEARCH)
+        cursor.execute("SET LOCAL hnsw.ef_search = %s;", [max(ef_search, limit)])
+    else:
+        probes = int(workspace.get("ivfflat_probes") or DEFAULT_IVFFLAT_PROBES)
+        cursor.execute("SET LOCAL ivfflat.probes = %s;", [probes])
+
+
+def get_ivfflat_index(cursor, table_name: str) -> Optional[Tuple[str, int]]:
+    """Name and number of lists of the IVFFlat index of the table"""
+    cursor.execute(
+        """SELECT c.relname, c.reloptions FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_am a ON a.oid = c.relam
+            WHERE i.indrelid = %s::regclass AND a.amname = 'ivfflat'
+            AND i.indisvalid;""",
+        [table_name],
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+
+    lists = 100
+    for option in row[1] or []:
+        key, _, value = option.partition("=")
+        if key == "lists":
+            lists = int(value)
+
+    return row[0], lists
+
+
+def drop_invalid_indexes(cursor, table_name: str):
+    """Drops the indexes left invalid by an interrupted concurrent build"""
+    cursor.execute(
+        """SELECT c.relname FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = %s::regclass AND NOT i.indisvalid;""",
+        [table_name],
+    )
+    for (index_name,) in cursor.fetchall():
+        logger.warning("Dropping invalid index", table=table_name, index=index_name)
+        cursor.execute(
+            sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {index};").format(
+                index=sql.Identifier(index_name)
+            )
+        )
+
+
+def uses_ivfflat_index(workspace: dict) -> bool:
+    return (
+        bool(workspace.get("has_index"))
+        and workspace.get("index_type", DEFAULT_INDEX_TYPE) == "ivfflat"
+    )
+
+
+def request_ivfflat_index_build(workspace: dict) -> bool:
+    """Asks the create workspace function to check the IVFFlat index of the
+    workspace. Called by the import jobs once their chunks are loaded, the
+    build runs asynchronously with the privileges of the tables owner."""
+    if workspace.get("engine") != "aurora" or not uses_ivfflat_index(workspace):
+        return False
+    if not CREATE_AURORA_WORKSPACE_FUNCTION_NAME:
+        return False
+
+    boto3.client("lambda").invoke(
+        FunctionName=CREATE_AURORA_WORKSPACE_FUNCTION_NAME,
+        InvocationType="Event",
+        Payload=json.dumps(
+            {
+                "action": BUILD_IVFFLAT_INDEX,
+                "workspace_id": workspace["workspace_id"],
+            }
+        ),
+    )
+    return True
+
+
+def maybe_rebuild_ivfflat_index(workspace: dict) -> bool:
+    """Builds the IVFFlat index once the table is large enough and rebuilds it
+    when the number of rows outgrows its lists. Returns True if it was built.
+
+    Requested by the import jobs (see request_ivfflat_index_build). The row
+    count comes from the planner statistics so the check is cheap. The new
+    index is built concurrently and replaces the previous one, so queries
+    are not blocked.
+    """
+    if not uses_ivfflat_index(workspace):
+        return False
+
+    table_name = get_table_name(workspace["workspace_id"])
+    with AuroraConnection(autocommit=True) as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(hashtext(%s));", [table_name])
+        if not cursor.fetchone()[0]:
+            # Another loader is already building the index
+            return False
+
+        try:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass;",
+                [table_name],
+            )
+            rows = int(cursor.fetchone()[0])
+            if rows < MIN_IVFFLAT_ROWS:
+                return False
+
+            lists = ivfflat_lists(rows)
+            drop_invalid_indexes(cursor, table_name)
+            current = get_ivfflat_index(cursor, table_name)
+            if current is not None and lists < current[1] * IVFFLAT_REBUILD_RATIO:
+                return False
+
+            logger.info(
+                "Building IVFFlat index",
+                table=table_name,
+                rows=rows,
+                lists=lists,
+                previous_lists=current[1] if current is not None else None,
+            )
+            cursor.execute(
+                sql.SQL(
+                    "CREATE INDEX CONCURRENTLY {index} ON {table} USING ivfflat "
+                    + "({expression}) WITH (lists = %s);"
+                ).format(
+                    index=sql.Identifier(f"{table_name}_ivfflat_{lists}"),
+                    table=sql.Identifier(table_name),
+                    expression=get_indexed_expression(workspace),
+                ),
+                [lists],
+            )
+            if current is not None:
+                cursor.execute(
+                    sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {index};").format(
+                        index=sql.Identifier(current[0])
+                    )
+                )
+
+            return True
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(hashtext(%s));", [table_name])
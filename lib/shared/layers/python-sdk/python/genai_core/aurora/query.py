@@ -2,15 +2,30 @@ import numpy as np
 import genai_core.embeddings
 import genai_core.cross_encoder
 import genai_core.utils.comprehend
-from typing import List
+import genai_core.utils.telemetry as telemetry
+import json
+from contextlib import nullcontext
+from typing import List, Optional
 from psycopg2 import sql
 from genai_core.aurora.connection import AuroraConnection
+from genai_core.aurora.index import (
+    QUANTIZED_RERANK_FACTOR,
+    get_vector_precision,
+    set_search_parameters,
+)
+from genai_core.aurora.create import get_keyword_search_column
 from genai_core.aurora.utils import convert_types
 from aws_lambda_powertools import Logger
 from genai_core.types import CommonError, Task
 
 logger = Logger()
 
+METRIC_OPERATORS = {
+    "cosine": "<=>",
+    "l2": "<->",
+    "inner": "<#>",
+}
+
 
 def query_workspace_aurora(
     workspace_id: str,
@@ -19,6 +34,7 @@ def query_workspace_aurora(
     limit: int,
     full_response: bool,
     threshold: int = 0,
+    filters: Optional[dict] = None,
 ):
     table_name = sql.Identifier(workspace_id.replace("-", ""))
     embeddings_model_provider = workspace["embeddings_model_provider"]
@@ -49,106 +65,101 @@ def query_workspace_aurora(
     items = []
     vector_search_records = []
     keyword_search_records = []
-    with AuroraConnection() as cursor:
-        if metric == "cosine":
-            cursor.execute(
-                sql.SQL(
-                    """SELECT chunk_id,
-                        workspace_id,
-                        document_id,
-                        document_sub_id,
-                        document_type,
-                        document_sub_type,
-                        path,
-                        language,
-                        title,
-                        content,
-                        content_complement,
-                        metadata,
-                        content_embeddings <=> %s AS vector_search_score
-                FROM {table} ORDER BY vector_search_score LIMIT %s;"""
-                ).format(table=table_name),
-                [np.array(query_embeddings), vector_search_limit],
-            )
-        elif metric == "l2":
-            cursor.execute(
-                sql.SQL(
-                    """SELECT chunk_id,
-                        workspace_id,
-                        document_id,
-                        document_sub_id,
-                        document_type,
-                        document_sub_type,
-                        path,
-                        language,
-                        title,
-                        content,
-                        content_complement,
-                        metadata,
-                        content_embeddings <-> %s AS vector_search_score
-                FROM {table} ORDER BY vector_search_score LIMIT %s;"""
-                ).format(table=table_name),
-                [np.array(query_embeddings), vector_search_limit],
-            )
-        elif metric == "inner":
-            cursor.execute(
-                sql.SQL(
-                    """SELECT chunk_id,
-                        workspace_id,
-                        document_id,
-                        document_sub_id,
-                        document_type,
-                        document_sub_type,
-                        path,
-                        language,
-                        title,
-                        content,
-                        content_complement,
-                        metadata,
-                        content_embeddings <#> %s AS vector_search_score
-                FROM {table} ORDER BY vector_search_score LIMIT %s;"""
-                ).format(table=table_name),
-                [np.array(query_embeddings), vector_search_limit],
-            )
+    # Not in autocommit so the index parameters are scoped to this transaction
+    with AuroraConnection(autocommit=False) as cursor:
+        conditions, where_params = _get_filters_clause(filters)
+        where = and_filters = sql.SQL("")
+        if conditions is None:
+            set_search_parameters(cursor, workspace, vector_search_limit)
         else:
-            raise Exception("Unknown metric")
+            where = sql.SQL("WHERE {}").format(conditions)
+            and_filters = sql.SQL("AND {}").format(conditions)
+            # The ANN index only returns its nearest candidates before the
+            # filters are applied. Without it, the rows are selected with the
+            # filter indexes and sorted by exact distance.
+            cursor.execute("SET LOCAL enable_indexscan = off;")
+
+        with telemetry.span("VectorQuery"):
+            _vector_search(
+                cursor,
+                table_name,
+                workspace,
+                np.array(query_embeddings),
+                vector_search_limit,
+                where,
+                where_params,
+            )
 
-        vector_search_records = cursor.fetchall()
+            vector_search_records = cursor.fetchall()
         vector_search_records = _convert_records("vector_search", vector_search_records)
         items.extend(vector_search_records)
 
-        if hybrid_search:
-            language = sql.Identifier(language_name)
-
-            cursor.execute(
-                sql.SQL(
-                    """SELECT chunk_id,
-                            workspace_id,
-                            document_id,
-                            document_sub_id,
-                            document_type,
-                            document_sub_type,
-                            path,
-                            language,
-                            title,
-                            content,
-                            content_complement,
-                            metadata,
-                            ts_rank_cd(to_tsvector('{language}', content), query) AS keyword_search_score
-                            FROM {table},
-                            plainto_tsquery('{language}', %s) query
-                            WHERE to_tsvector('{language}', content) @@ query
-                            ORDER BY keyword_search_score DESC
-                            LIMIT %s;"""  # noqa:E501
-                ).format(table=table_name, language=language),
-                [query, keyword_search_limit],
-            )
+        with telemetry.span("KeywordQuery") if hybrid_search else nullcontext():
+            if hybrid_search and workspace.get("keyword_search_columns"):
+                column = sql.Identifier(get_keyword_search_column(language_name))
+
+                cursor.execute(
+                    sql.SQL(
+                        """SELECT chunk_id,
+                                workspace_id,
+                                document_id,
+                                document_sub_id,
+                                document_type,
+                                document_sub_type,
+                                path,
+                                language,
+                                title,
+                                content,
+                                content_complement,
+                                metadata,
+                                ts_rank_cd({column}, query) AS keyword_search_score
+                                FROM {table},
+                                plainto_tsquery(%s::regconfig, %s) query
+                                WHERE {column} @@ query {filters}
+                                ORDER BY keyword_search_score DESC
+                                LIMIT %s;"""
+                    ).format(table=table_name, column=column, filters=and_filters),
+                    [language_name, query, *where_params, keyword_search_limit],
+                )
 
-            keyword_search_records = cursor.fetchall()
-            keyword_search_records = _convert_records(
-                "keyword_search", keyword_search_records
-            )
-            items.extend(keyword_search_records)
+                keyword_search_records = cursor.fetchall()
+                keyword_search_records = _convert_records(
+                    "keyword_search", keyword_search_records
+                )
+                items.extend(keyword_search_records)
+            elif hybrid_search:
+                # Workspaces not migrated to the stored tsvector columns
+                language = sql.Identifier(language_name)
+
+                cursor.execute(
+                    sql.SQL(
+                        """SELECT chunk_id,
+                                workspace_id,
+                                document_id,
+                                document_sub_id,
+                                document_type,
+                                document_sub_type,
+                                path,
+                                language,
+                                title,
+                                content,
+                                content_complement,
+                                metadata,
+                                ts_rank_cd(to_tsvector('{language}', content), query) AS keyword_search_score
+                                FROM {table},
+                                plainto_tsquery('{language}', %s) query
+                                WHERE to_tsvector('{language}', content) @@ query {filters}
+                                ORDER BY keyword_search_score DESC
+                                LIMIT %s;"""  # noqa:E501
+                    ).format(table=table_name, language=language, filters=and_filters),
+                    [query, *where_params, keyword_search_limit],
+                )
+
+                keyword_search_records = cursor.fetchall()
+                keyword_search_records = _convert_records(
+                    "keyword_search", keyword_search_records
+                )
+                items.extend(keyword_search_records)
 
     unique_items = dict({})
     for item in items:
@@ -271,6 +282,100 @@ def query_workspace_aurora(
     return ret_value
 
 
+def _vector_search(
+    cursor, table_name, workspace: dict, embeddings, limit: int, where, where_params
+):
+    metric = workspace["metric"]
+    if metric not in METRIC_OPERATORS:
+        raise Exception("Unknown metric")
+
+    operator = sql.SQL(METRIC_OPERATORS[metric])
+    precision = get_vector_precision(workspace)
+    embedding = sql.SQL("%s::halfvec" if precision == "float16" else "%s")
+
+    if precision == "quantized" and len(where_params) == 0:
+        # The binary quantized index returns candidates by hamming distance,
+        # they are re-ranked with the distance of the full vectors
+        cursor.execute(
+            sql.SQL(
+                """SELECT chunk_id,
+                    workspace_id,
+                    document_id,
+                    document_sub_id,
+                    document_type,
+                    document_sub_type,
+                    path,
+                    language,
+                    title,
+                    content,
+                    content_complement,
+                    metadata,
+                    content_embeddings {operator} %s AS vector_search_score
+                FROM (
+                    SELECT * FROM {table}
+                    ORDER BY binary_quantize(content_embeddings)::bit({dims})
+                        <~> binary_quantize(%s)
+                    LIMIT %s
+                ) candidates
+                ORDER BY vector_search_score LIMIT %s;"""
+            ).format(
+                table=table_name,
+                operator=operator,
+                dims=sql.Literal(int(workspace["embeddings_model_dimensions"])),
+            ),
+            [embeddings, embeddings, limit * QUANTIZED_RERANK_FACTOR, limit],
+        )
+        return
+
+    cursor.execute(
+        sql.SQL(
+            """SELECT chunk_id,
+                workspace_id,
+                document_id,
+                document_sub_id,
+                document_type,
+                document_sub_type,
+                path,
+                language,
+                title,
+                content,
+                content_complement,
+                metadata,
+                content_embeddings {operator} {embedding} AS vector_search_score
+            FROM {table} {where} ORDER BY vector_search_score LIMIT %s;"""
+        ).format(table=table_name, operator=operator, embedding=embedding, where=where),
+        [embeddings, *where_params, limit],
+    )
+
+
+def _get_filters_clause(filters: Optional[dict]):
+    """Conditions and parameters of the search filters (see search_filters).
+    Each filter is served by an index of the workspace table."""
+    if not filters:
+        return None, []
+
+    conditions = []
+    params = []
+    if "document_ids" in filters:
+        conditions.append(sql.SQL("document_id = ANY(%s::uuid[])"))
+        params.append(filters["document_ids"])
+    if "document_types" in filters:
+        conditions.append(sql.SQL("document_type = ANY(%s)"))
+        params.append(filters["document_types"])
+    if "path_prefix" in filters:
+        conditions.append(sql.SQL("path LIKE %s"))
+        params.append(_escape_like(filters["path_prefix"]) + "%")
+    if "metadata" in filters:
+        conditions.append(sql.SQL("metadata @> %s::jsonb"))
+        params.append(json.dumps(filters["metadata"]))
+
+    return sql.SQL(" AND ").join(conditions), params
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 def _convert_records(source: str, records: List[dict]):
     converted_records = []
     for record in records:
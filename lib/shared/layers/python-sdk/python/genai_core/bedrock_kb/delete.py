@@ -12,7 +12,7 @@ dynamodb = boto3.resource("dynamodb")
 logger = Logger()
 
 
-def delete_workspace(workspace: dict):
+def delete_workspace(workspace: dict, should_stop=None) -> bool:
     workspace_id = workspace["workspace_id"]
 
     workspaces_table = dynamodb.Table(WORKSPACES_TABLE_NAME)
@@ -22,3 +22,5 @@ def delete_workspace(workspace: dict):
     )
 
     logger.info(f"Delete Item succeeded: {response}")
+
+    return True
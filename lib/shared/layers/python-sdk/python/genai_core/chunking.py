@@ -0,0 +1,163 @@
+import re
+import functools
+from aws_lambda_powertools import Logger
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from genai_core.types import CommonError
+from typing import Callable, Dict, List
+
+# Tokenizer used when the embeddings model has no public tokenizer
+DEFAULT_ENCODING = "cl100k_base"
+# Estimation used when the tokenizer can not be loaded
+CHARS_PER_TOKEN = 4
+# Boundaries by preference. A chunk ends at the last paragraph, line or
+# sentence of its second half and falls back to the last word.
+SENTENCE_SEPARATORS = ["\n\n", "\n", ". ", "? ", "! ", "; "]
+NON_SPACE = re.compile(r"\S")
+logger = Logger()
+
+CHUNKING_STRATEGIES: Dict[str, Callable[[dict, str], List[str]]] = {}
+
+
+def chunking_strategy(name: str):
+    """Registers a function splitting the content for a workspace"""
+
+    def register(split: Callable[[dict, str], List[str]]):
+        CHUNKING_STRATEGIES[name] = split
+        return split
+
+    return register
+
+
+def split_text(workspace: dict, content: str) -> List[str]:
+    split = CHUNKING_STRATEGIES.get(workspace["chunking_strategy"])
+    if split is None:
+        raise CommonError("Chunking strategy not supported")
+
+    return [text.replace("\x00", "\uFFFD") for text in split(workspace, content)]
+
+
+@chunking_strategy("recursive")
+def split_recursive(workspace: dict, content: str) -> List[str]:
+    """Chunk size and overlap in characters"""
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=workspace["chunk_size"],
+        chunk_overlap=workspace["chunk_overlap"],
+        length_function=len,
+    )
+    return text_splitter.split_text(content)
+
+
+@chunking_strategy("sentence")
+def split_sentences(workspace: dict, content: str) -> List[str]:
+    """Chunk size and overlap in characters, cut at the sentence boundaries"""
+    return split_boundaries(
+        content, workspace["chunk_size"], workspace["chunk_overlap"]
+    )
+
+
+@chunking_strategy("token")
+def split_tokens(workspace: dict, content: str) -> List[str]:
+    """Chunk size and overlap in tokens of the embeddings model"""
+    count_tokens = get_token_counter(
+        workspace["embeddings_model_provider"], workspace["embeddings_model_name"]
+    )
+    return _split_tokens(
+        content, workspace["chunk_size"], workspace["chunk_overlap"], count_tokens
+    )
+
+
+def split_boundaries(content: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """Splits in a single pass over the content (linear in its length).
+
+    Each chunk is at most chunk_size characters and ends at the best boundary
+    of its second half. The overlap starts at a word boundary and is limited
+    to half of the previous chunk.
+    """
+    chunks = []
+    length = len(content)
+    match = NON_SPACE.search(content)
+    start = match.start() if match else length
+    while start < length:
+        end = start + chunk_size
+        if end >= length:
+            chunks.append(content[start:].rstrip())
+            break
+
+        cut = _find_cut(content, start, end)
+        chunks.append(content[start:cut].rstrip())
+
+        next_start = max(cut - chunk_overlap, start + (cut - start) // 2)
+        if next_start < cut:
+            space = content.find(" ", next_start, cut)
+            next_start = space + 1 if space != -1 else cut
+        match = NON_SPACE.search(content, next_start)
+        start = match.start() if match else length
+
+    return chunks
+
+
+def _find_cut(content: str, start: int, end: int) -> int:
+    middle = start + (end - start) // 2
+    for separator in SENTENCE_SEPARATORS:
+        position = content.rfind(separator, middle, end)
+        if position != -1:
+            return position + len(separator)
+
+    position = content.rfind(" ", start + 1, end)
+    return position + 1 if position != -1 else end
+
+
+def _split_tokens(
+    content: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    count_tokens: Callable[[str], int],
+) -> List[str]:
+    tokens = count_tokens(content)
+    if tokens <= chunk_size:
+        return [content.strip()] if content.strip() else []
+
+    # Sized in characters with the density of the content, the chunks denser
+    # than the average (tables, code) are split again.
+    chars_per_token = len(content) / tokens
+    chunks = []
+    for chunk in split_boundaries(
+        content,
+        max(1, int(chunk_size * chars_per_token)),
+        int(chunk_overlap * chars_per_token),
+    ):
+        if count_tokens(chunk) > chunk_size:
+            chunks.extend(_split_tokens(chunk, chunk_size, 0, count_tokens))
+        else:
+            chunks.append(chunk)
+
+    return chunks
+
+
+@functools.lru_cache(maxsize=None)
+def get_token_counter(provider: str, model_name: str) -> Callable[[str], int]:
+    """Tokens of a text for an embeddings model (Loaded once per model)"""
+    try:
+        # Imported on first use, the estimate is used without tiktoken
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as error:
+        # The encodings are downloaded on first use unless they are in
+        # TIKTOKEN_CACHE_DIR (bundled in the batch job images)
+        logger.warning(
+            "Tokenizer not available, the tokens are estimated",
+            provider=provider,
+            model_name=model_name,
+            error=str(error),
+        )
+        return estimate_tokens
+
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
@@ -1,16 +1,31 @@
+import io
 import os
+import json
+import time
 import uuid
 import boto3
+import genai_core.chunking
 import genai_core.documents
 import genai_core.embeddings
 import genai_core.aurora.chunks
 import genai_core.opensearch.chunks
+import genai_core.utils.telemetry as telemetry
 from genai_core.types import CommonError, Task
 from typing import List, Optional
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.metrics import MetricUnit
 
 PROCESSING_BUCKET_NAME = os.environ.get("PROCESSING_BUCKET_NAME", "")
+# Seconds between two exports of the ingestion metrics and progress
+INGESTION_REPORT_INTERVAL = int(os.environ.get("INGESTION_REPORT_INTERVAL", "30"))
+# "objects" stores each chunk in its own object. "archive" stores the chunks
+# of a document (or sub-document) in a single JSONL object with an index of
+# the offsets, the chunks of an import are then written with 2 requests.
+CHUNKS_STORAGE_FORMAT = os.environ.get("CHUNKS_STORAGE_FORMAT", "objects")
+CHUNKS_ARCHIVE_NAME = "chunks.jsonl"
+CHUNKS_INDEX_NAME = "chunks.index.json"
 s3 = boto3.resource("s3")
+logger = Logger()
 
 
 def add_chunks(
@@ -43,39 +58,45 @@ def add_chunks(
         embeddings_model, chunks, Task.STORE.value
     )
     chunk_ids = [uuid.uuid4() for _ in chunks]
+    telemetry.add_metric("Chunks", len(chunks))
 
-    store_chunks_on_s3(workspace_id, document_id, document_sub_id, chunk_ids, chunks)
+    with telemetry.span("ChunkStore"):
+        store_chunks_on_s3(
+            workspace_id, document_id, document_sub_id, chunk_ids, chunks
+        )
 
     if engine == "aurora":
-        result = genai_core.aurora.chunks.add_chunks_aurora(
-            workspace_id=workspace_id,
-            document_id=document_id,
-            document_sub_id=document_sub_id,
-            document_type=document_type,
-            document_sub_type=document_sub_type,
-            path=path,
-            title=title,
-            chunk_ids=chunk_ids,
-            chunk_embeddings=chunk_embeddings,
-            chunks=chunks,
-            chunk_complements=chunk_complements,
-            replace=replace,
-        )
+        with telemetry.span("VectorStoreWrite"):
+            result = genai_core.aurora.chunks.add_chunks_aurora(
+                workspace_id=workspace_id,
+                document_id=document_id,
+                document_sub_id=document_sub_id,
+                document_type=document_type,
+                document_sub_type=document_sub_type,
+                path=path,
+                title=title,
+                chunk_ids=chunk_ids,
+                chunk_embeddings=chunk_embeddings,
+                chunks=chunks,
+                chunk_complements=chunk_complements,
+                replace=replace,
+            )
     elif engine == "opensearch":
-        result = genai_core.opensearch.chunks.add_chunks_open_search(
-            workspace_id=workspace_id,
-            document_id=document_id,
-            document_sub_id=document_sub_id,
-            document_type=document_type,
-            document_sub_type=document_sub_type,
-            path=path,
-            title=title,
-            chunk_ids=chunk_ids,
-            chunk_embeddings=chunk_embeddings,
-            chunks=chunks,
-            chunk_complements=chunk_complements,
-            replace=replace,
-        )
+        with telemetry.span("VectorStoreWrite"):
+            result = genai_core.opensearch.chunks.add_chunks_open_search(
+                workspace_id=workspace_id,
+                document_id=document_id,
+                document_sub_id=document_sub_id,
+                document_type=document_type,
+                document_sub_type=document_sub_type,
+                path=path,
+                title=title,
+                chunk_ids=chunk_ids,
+                chunk_embeddings=chunk_embeddings,
+                chunks=chunks,
+                chunk_complements=chunk_complements,
+                replace=replace,
+            )
     else:
         raise CommonError("Engine not supported")
 
@@ -86,21 +107,100 @@ def add_chunks(
 
 
 def split_content(workspace: dict, content: str):
-    chunking_strategy = workspace["chunking_strategy"]
-    chunk_size = workspace["chunk_size"]
-    chunk_overlap = workspace["chunk_overlap"]
-
-    if chunking_strategy == "recursive":
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=len
+    telemetry.add_metric("Bytes", len(content.encode("utf-8")), MetricUnit.Bytes)
+    with telemetry.span("Split"):
+        return genai_core.chunking.split_text(workspace, content)
+
+
+class IngestionMetrics:
+    """Throughput of an import or crawl job. The metrics of the chunks added
+    in the context (bytes, chunks, time per stage, embedding retries) are
+    exported with their rates every interval, the progress of the document
+    is saved at the same time. A resumed job passes the items processed by
+    the earlier runs as initial, they are not counted in its rate."""
+
+    def __init__(
+        self,
+        workspace: dict,
+        document_id: Optional[str],
+        total: int,
+        job: str,
+        interval: int = INGESTION_REPORT_INTERVAL,
+        initial: int = 0,
+    ):
+        self.workspace_id = workspace["workspace_id"]
+        self.document_id = document_id
+        self.total = total
+        self.interval = interval
+        self.initial = initial
+        self.processed = initial
+        self.start = time.perf_counter()
+        self.last_report = self.start
+        self.telemetry = telemetry.Telemetry(
+            dimensions={"Job": job, "Engine": workspace["engine"]}, tracing=False
         )
 
-        text_data = text_splitter.split_text(content)
-        text_data = [text.replace("\x00", "\uFFFD") for text in text_data]
-
-        return text_data
+    def __enter__(self):
+        self.telemetry.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self._add_rates(time.perf_counter())
+        self.telemetry.__exit__(*args)
+
+    def update(self, processed: int):
+        """Reports the progress when the interval elapsed or the job is done"""
+        self.processed = processed
+        now = time.perf_counter()
+        if now - self.last_report < self.interval and processed < self.total:
+            return
+
+        self._add_rates(now)
+        self.telemetry.flush()
+
+        progress = self.get_progress(now)
+        logger.info("Ingestion progress", document_id=self.document_id, **progress)
+        if self.document_id:
+            genai_core.documents.set_progress(
+                self.workspace_id, self.document_id, progress
+            )
 
-    raise CommonError("Chunking strategy not supported")
+    def finish(self):
+        """The job can end before its total, when a crawl runs out of links"""
+        self.total = self.processed
+        self.update(self.processed)
+
+    def get_progress(self, now: float) -> dict:
+        elapsed = now - self.start
+        progress = {
+            "processed": self.processed,
+            "total": self.total,
+            "percent": (
+                min(100, int(100 * self.processed / self.total)) if self.total else 100
+            ),
+        }
+        processed_since_start = self.processed - self.initial
+        if processed_since_start > 0:
+            remaining = max(0, self.total - self.processed)
+            progress["eta_seconds"] = int(elapsed * remaining / processed_since_start)
+
+        return progress
+
+    def _add_rates(self, now: float):
+        elapsed = now - self.last_report
+        self.last_report = now
+        chunks = self.telemetry.get("Chunks")
+        if chunks is None or elapsed <= 0:
+            return
+
+        self.telemetry.add_metric(
+            "ChunksPerSecond", chunks / elapsed, MetricUnit.CountPerSecond
+        )
+        self.telemetry.add_metric(
+            "BytesPerSecond",
+            (self.telemetry.get("Bytes") or 0) / elapsed,
+            MetricUnit.BytesPerSecond,
+        )
 
 
 def store_chunks_on_s3(
@@ -110,11 +210,41 @@ def store_chunks_on_s3(
     chunk_ids: List[str],
     chunks: List[str],
 ):
-    for chunk_id, chunk in zip(chunk_ids, chunks):
-        path = f"{workspace_id}/{document_id}/chunks/{chunk_id}.txt"
-        if document_sub_id:
-            path = (
-                f"{workspace_id}/{document_id}/{document_sub_id}/chunks/{chunk_id}.txt"
-            )
+    prefix = _get_chunks_prefix(workspace_id, document_id, document_sub_id)
+    if CHUNKS_STORAGE_FORMAT == "archive":
+        store_chunks_archive_on_s3(prefix, chunk_ids, chunks)
+        return
 
+    telemetry.add_metric("ChunkStoreRequests", len(chunks))
+    for chunk_id, chunk in zip(chunk_ids, chunks):
+        path = f"{prefix}/chunks/{chunk_id}.txt"
         s3.Object(PROCESSING_BUCKET_NAME, path).put(Body=chunk)
+
+
+def store_chunks_archive_on_s3(prefix: str, chunk_ids: List[str], chunks: List[str]):
+    """Replaces the archive of the prefix. The archive is built in memory,
+    large archives are sent with a multipart upload by the transfer manager."""
+    archive = io.BytesIO()
+    offsets = {}
+    for chunk_id, chunk in zip(chunk_ids, chunks):
+        line = json.dumps({"chunk_id": str(chunk_id), "content": chunk}) + "\n"
+        data = line.encode("utf-8")
+        offsets[str(chunk_id)] = [archive.tell(), len(data)]
+        archive.write(data)
+
+    archive.seek(0)
+    s3.Bucket(PROCESSING_BUCKET_NAME).upload_fileobj(
+        archive, f"{prefix}/{CHUNKS_ARCHIVE_NAME}"
+    )
+    s3.Object(PROCESSING_BUCKET_NAME, f"{prefix}/{CHUNKS_INDEX_NAME}").put(
+        Body=json.dumps({"format": "jsonl", "chunks": offsets})
+    )
+    telemetry.add_metric("ChunkStoreRequests", 2)
+
+
+def _get_chunks_prefix(
+    workspace_id: str, document_id: str, document_sub_id: Optional[str]
+) -> str:
+    if document_sub_id:
+        return f"{workspace_id}/{document_id}/{document_sub_id}"
+    return f"{workspace_id}/{document_id}"
@@ -3,6 +3,7 @@ import json
 import genai_core.types
 import genai_core.clients
 import genai_core.parameters
+import genai_core.utils.telemetry as telemetry
 from typing import List, Optional
 
 
@@ -17,7 +18,8 @@ def rank_passages(
     passages = list(map(lambda x: x[:10000], passages))
 
     if model.provider == "sagemaker":
-        return _rank_passages_sagemaker(model, input, passages)
+        with telemetry.span("Rerank"):
+            return _rank_passages_sagemaker(model, input, passages)
 
     raise genai_core.typesCommonError("Unknown provider")
 
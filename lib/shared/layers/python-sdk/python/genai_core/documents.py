@@ -1,6 +1,8 @@
 import os
 import json
+import time
 import uuid
+import base64
 from aws_lambda_powertools import Logger
 import boto3
 import botocore
@@ -10,13 +12,15 @@ import genai_core.chunks
 import genai_core.websites
 import genai_core.utils.json
 import genai_core.workspaces
+import genai_core.workspace_stats
 import genai_core.utils.files
+import genai_core.utils.thread_local
 from typing import Optional
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
 
 PROCESSING_BUCKET_NAME = os.environ.get("PROCESSING_BUCKET_NAME", "")
-WORKSPACES_TABLE_NAME = os.environ.get("WORKSPACES_TABLE_NAME", "")
 DOCUMENTS_TABLE_NAME = os.environ.get("DOCUMENTS_TABLE_NAME")
 DOCUMENTS_BY_COMPOUND_KEY_INDEX_NAME = os.environ.get(
     "DOCUMENTS_BY_COMPOUND_KEY_INDEX_NAME"
@@ -31,19 +35,49 @@ DELETE_DOCUMENT_WORKFLOW_ARN = os.environ.get("DELETE_DOCUMENT_WORKFLOW_ARN")
 RSS_FEED_INGESTOR_FUNCTION = os.environ.get("RSS_FEED_INGESTOR_FUNCTION", "")
 RSS_FEED_SCHEDULE_ROLE_ARN = os.environ.get("RSS_FEED_SCHEDULE_ROLE_ARN", "")
 DOCUMENTS_BY_STATUS_INDEX = os.environ.get("DOCUMENTS_BY_STATUS_INDEX", "")
+RSS_POSTS_CRAWL_BATCH_SIZE = int(os.environ.get("RSS_POSTS_CRAWL_BATCH_SIZE", "10"))
 
-WORKSPACE_OBJECT_TYPE = "workspace"
+RSS_FEED_INVOKE_WORKERS = 8
+RSS_POSTS_CRAWL_WORKERS = 4
+BATCH_GET_MAX_KEYS = 100
+# Unprocessed keys of the batch reads are retried with an exponential backoff
+BATCH_GET_ATTEMPTS = 5
+BATCH_GET_BACKOFF = 0.05
 
-s3 = boto3.resource("s3")
+# The RSS posts and the upload handler create documents from several threads
+s3 = genai_core.utils.thread_local.resource("s3")
 s3_client = boto3.client("s3")
-dynamodb = boto3.resource("dynamodb")
+dynamodb = genai_core.utils.thread_local.resource("dynamodb")
 dynamodb_client = boto3.client("dynamodb")
 sfn_client = boto3.client("stepfunctions")
 scheduler = boto3.client("scheduler")
 lambda_client = boto3.client("lambda")
 
-documents_table = dynamodb.Table(DOCUMENTS_TABLE_NAME)
-workspaces_table = dynamodb.Table(WORKSPACES_TABLE_NAME)
+documents_table = genai_core.utils.thread_local.ThreadLocalResource(
+    lambda: dynamodb.Table(DOCUMENTS_TABLE_NAME)
+)
+
+# Attributes returned by list_documents
+LIST_DOCUMENTS_ATTRIBUTES = [
+    "workspace_id",
+    "document_id",
+    "document_type",
+    "document_sub_type",
+    "status",
+    "title",
+    "path",
+    "size_in_bytes",
+    "vectors",
+    "sub_documents",
+    "errors",
+    "created_at",
+    "updated_at",
+    "rss_feed_id",
+    "rss_last_checked",
+    "crawler_properties",
+]
+# Key of the documents by compound key index
+CURSOR_KEY_ATTRIBUTES = ["workspace_id", "document_id", "compound_sort_key"]
 logger = Logger()
 
 
@@ -54,6 +88,9 @@ def list_documents(
     page_size: int = 100,
     parent_document_id: str = None,
 ):
+    """Lists a page of documents. last_document_id is the opaque cursor
+    returned with the previous page, it encodes the full LastEvaluatedKey
+    of the index so the next page does not need to read the last document."""
     workspace = genai_core.workspaces.get_workspace(workspace_id)
     if not workspace:
         raise genai_core.types.CommonError("Workspace not found")
@@ -66,63 +103,73 @@ def list_documents(
     if parent_document_id != None:
         sort_key_prefix = sort_key_prefix + f"{parent_document_id}/"
 
+    query_args = {
+        "IndexName": DOCUMENTS_BY_COMPOUND_KEY_INDEX_NAME,
+        "KeyConditionExpression": "workspace_id = :workspace_id AND "
+        + "begins_with(compound_sort_key, :sort_key_prefix)",
+        "ExpressionAttributeValues": {
+            ":workspace_id": workspace_id,
+            ":sort_key_prefix": sort_key_prefix,
+        },
+        "ProjectionExpression": ", ".join(
+            f"#{attribute}" for attribute in LIST_DOCUMENTS_ATTRIBUTES
+        ),
+        "ExpressionAttributeNames": {
+            f"#{attribute}": attribute for attribute in LIST_DOCUMENTS_ATTRIBUTES
+        },
+        "Limit": page_size,
+        "ScanIndexForward": scan_index_forward,
+    }
     if last_document_id:
-        last_document = get_document(workspace_id, last_document_id)
-        if not last_document:
-            raise genai_core.types.CommonError("Last document not found")
-        last_document_compound_sort_key = last_document["compound_sort_key"]
-
-        response = documents_table.query(
-            IndexName=DOCUMENTS_BY_COMPOUND_KEY_INDEX_NAME,
-            KeyConditionExpression="workspace_id = :workspace_id AND "
-            + "begins_with(compound_sort_key, :sort_key_prefix)",
-            ExclusiveStartKey={
-                "workspace_id": workspace_id,
-                "document_id": last_document_id,
-                "compound_sort_key": last_document_compound_sort_key,
-            },
-            ExpressionAttributeValues={
-                ":workspace_id": workspace_id,
-                ":sort_key_prefix": sort_key_prefix,
-            },
-            Limit=page_size,
-            ScanIndexForward=scan_index_forward,
-        )
-    else:
-        response = documents_table.query(
-            IndexName=DOCUMENTS_BY_COMPOUND_KEY_INDEX_NAME,
-            KeyConditionExpression="workspace_id = :workspace_id AND "
-            + "begins_with(compound_sort_key, :sort_key_prefix)",
-            ExpressionAttributeValues={
-                ":workspace_id": workspace_id,
-                ":sort_key_prefix": sort_key_prefix,
-            },
-            Limit=page_size,
-            ScanIndexForward=scan_index_forward,
+        query_args["ExclusiveStartKey"] = _decode_cursor(
+            last_document_id, workspace_id, sort_key_prefix
         )
 
+    response = documents_table.query(**query_args)
+
     items = response["Items"]
-    last_evaluated_key = response.get("LastEvaluatedKey", {})
-    last_document_id = last_evaluated_key.get("document_id", None)
+    last_evaluated_key = response.get("LastEvaluatedKey")
 
     return {
         "items": items,
-        "last_document_id": last_document_id,
+        "last_document_id": (
+            _encode_cursor(last_evaluated_key) if last_evaluated_key else None
+        ),
     }
 
 
+def _encode_cursor(last_evaluated_key: dict) -> str:
+    data = json.dumps(last_evaluated_key, separators=(",", ":"))
+    # Without the padding so the cursor only has URL safe characters
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, workspace_id: str, sort_key_prefix: str) -> dict:
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (ValueError, UnicodeError):
+        raise genai_core.types.CommonError("Invalid pagination cursor")
+
+    if (
+        not isinstance(key, dict)
+        or set(key.keys()) != set(CURSOR_KEY_ATTRIBUTES)
+        or not all(isinstance(value, str) for value in key.values())
+        or key["workspace_id"] != workspace_id
+        or not key["compound_sort_key"].startswith(sort_key_prefix)
+    ):
+        raise genai_core.types.CommonError("Invalid pagination cursor")
+
+    return key
+
+
 def set_document_vectors(
     workspace_id: str, document_id: str, vectors: int, replace: bool
 ):
     timestamp = _get_timestamp()
 
-    response = workspaces_table.update_item(
-        Key={"workspace_id": workspace_id, "object_type": WORKSPACE_OBJECT_TYPE},
-        UpdateExpression="ADD vectors :incrementValue SET updated_at=:timestampValue",
-        ExpressionAttributeValues={
-            ":incrementValue": vectors,
-            ":timestampValue": timestamp,
-        },
+    response = genai_core.workspace_stats.add_workspace_stats(
+        workspace_id, vectors=vectors
     )
 
     if replace:
@@ -169,6 +216,22 @@ def set_sub_documents(workspace_id: str, document_id: str, sub_documents: int):
     return response
 
 
+def set_progress(workspace_id: str, document_id: str, progress: dict):
+    """Saves the progress of the ingestion job of the document"""
+    timestamp = _get_timestamp()
+
+    response = documents_table.update_item(
+        Key={"workspace_id": workspace_id, "document_id": document_id},
+        UpdateExpression="SET progress=:progressValue, updated_at=:timestampValue",
+        ExpressionAttributeValues={
+            ":progressValue": {**progress, "updated_at": timestamp},
+            ":timestampValue": timestamp,
+        },
+    )
+
+    return response
+
+
 def get_document(workspace_id: str, document_id: str):
     response = documents_table.get_item(
         Key={"workspace_id": workspace_id, "document_id": document_id}
@@ -244,14 +307,27 @@ def set_status(workspace_id: str, document_id: str, status: str):
     return response
 
 
-def update_subscription_timestamp(workspace_id: str, document_id: str):
+def update_subscription_timestamp(
+    workspace_id: str,
+    document_id: str,
+    etag: Optional[str] = None,
+    modified: Optional[str] = None,
+):
     timestamp = _get_timestamp()
+    update_expression = "SET rss_last_checked=:timestampValue"
+    expression_values = {":timestampValue": timestamp}
+    # Validators sent with the next request of the feed
+    if etag:
+        update_expression += ", rss_etag=:etagValue"
+        expression_values[":etagValue"] = etag
+    if modified:
+        update_expression += ", rss_modified=:modifiedValue"
+        expression_values[":modifiedValue"] = modified
+
     response = documents_table.update_item(
         Key={"workspace_id": workspace_id, "document_id": document_id},
-        UpdateExpression="SET rss_last_checked=:timestampValue",
-        ExpressionAttributeValues={
-            ":timestampValue": timestamp,
-        },
+        UpdateExpression=update_expression,
+        ExpressionAttributeValues=expression_values,
     )
     logger.info("Response for update_subscription_timestamp", response=response)
 
@@ -349,18 +425,11 @@ def create_document(
         response = documents_table.put_item(Item=document)
 
     size_diff = size_in_bytes - current_size_in_bytes
-    response = workspaces_table.update_item(
-        Key={"workspace_id": workspace_id, "object_type": WORKSPACE_OBJECT_TYPE},
-        UpdateExpression="ADD size_in_bytes :incrementValue, "
-        + "documents :documentsIncrementValue, "
-        + "vectors :vectorsIncrementValue SET updated_at=:timestampValue",
-        ExpressionAttributeValues={
-            ":incrementValue": size_diff,
-            ":documentsIncrementValue": documents_diff,
-            ":vectorsIncrementValue": -current_vectors,
-            ":timestampValue": timestamp,
-        },
-        ReturnValues="UPDATED_NEW",
+    response = genai_core.workspace_stats.add_workspace_stats(
+        workspace_id,
+        documents=documents_diff,
+        vectors=-current_vectors,
+        size_in_bytes=size_diff,
     )
 
     logger.info("Response for create_document", response=response)
@@ -617,15 +686,17 @@ def _upload_document_content(
 
 
 def ingest_rss_feeds():
-    feeds_to_crawl = dynamodb_client.query(
-        TableName=DOCUMENTS_TABLE_NAME,
-        IndexName=DOCUMENTS_BY_STATUS_INDEX,
-        KeyConditionExpression="#status = :status AND #document_type = :document_type",
-        ExpressionAttributeNames={
+    """Invokes the RSS feed ingestor for every enabled feed"""
+    query_args = {
+        "TableName": DOCUMENTS_TABLE_NAME,
+        "IndexName": DOCUMENTS_BY_STATUS_INDEX,
+        "KeyConditionExpression": "#status = :status AND "
+        + "#document_type = :document_type",
+        "ExpressionAttributeNames": {
             "#status": "status",
             "#document_type": "document_type",
         },
-        ExpressionAttributeValues={
+        "ExpressionAttributeValues": {
             ":status": {
                 "S": "enabled",
             },
@@ -633,32 +704,54 @@ def ingest_rss_feeds():
                 "S": "rssfeed",
             },
         },
-    )
-    if feeds_to_crawl["Count"] > 0:
-        for item in feeds_to_crawl["Items"]:
-            workspace_id = item["workspace_id"]["S"]
-            document_id = item["document_id"]["S"]
-            _trigger_rss_feed_ingestor(workspace_id, document_id)
+        "ProjectionExpression": "workspace_id, document_id",
+    }
+
+    # The invocations are asynchronous, the feeds are polled concurrently
+    futures = {}
+    with ThreadPoolExecutor(max_workers=RSS_FEED_INVOKE_WORKERS) as executor:
+        while True:
+            feeds_to_crawl = dynamodb_client.query(**query_args)
+            for item in feeds_to_crawl["Items"]:
+                document_id = item["document_id"]["S"]
+                future = executor.submit(
+                    _trigger_rss_feed_ingestor,
+                    item["workspace_id"]["S"],
+                    document_id,
+                )
+                futures[future] = document_id
+
+            if "LastEvaluatedKey" not in feeds_to_crawl:
+                break
+            query_args["ExclusiveStartKey"] = feeds_to_crawl["LastEvaluatedKey"]
+
+    failed = 0
+    for future, document_id in futures.items():
+        try:
+            future.result()
+        except Exception as e:
+            # The feed is polled again by the next run
+            failed += 1
+            logger.exception(e, feed_id=document_id)
+
+    logger.info("RSS Feeds triggered", feeds=len(futures), failed=failed)
 
 
 def _trigger_rss_feed_ingestor(
     workspace_id: str,
     document_id: str,
 ):
-    try:
-        response = lambda_client.invoke(
-            FunctionName=RSS_FEED_INGESTOR_FUNCTION,
-            InvocationType="Event",
-            Payload=json.dumps(
-                {
-                    "workspace_id": workspace_id,
-                    "document_id": document_id,
-                }
-            ),
-        )
-        logger.info("Response for _trigger_rss_feed_ingestor", response=response)
-    except Exception as e:
-        logger.exception(e)
+    response = lambda_client.invoke(
+        FunctionName=RSS_FEED_INGESTOR_FUNCTION,
+        InvocationType="Event",
+        Payload=json.dumps(
+            {
+                "workspace_id": workspace_id,
+                "document_id": document_id,
+            }
+        ),
+    )
+    logger.info("Response for _trigger_rss_feed_ingestor", response=response)
 
 
 def _toggle_document_subscription(
@@ -696,12 +789,58 @@ def check_rss_feed_for_posts(workspace_id, document_id):
     feed_path = rss_document["path"]
     logger.info(f"Parsing RSS Feed for {feed_path}")
     try:
-        feed_contents = feedparser.parse(feed_path)
-        if feed_contents:
-            for feed_entry in feed_contents.entries:
-                timestamp = _get_timestamp()
-                post_id = str(_get_hash_id_from_path(feed_entry.get("link", "")))
-                document = {
+        # The feed is only downloaded when it changed since the last check
+        feed_contents = feedparser.parse(
+            feed_path,
+            etag=rss_document.get("rss_etag"),
+            modified=rss_document.get("rss_modified"),
+        )
+        if feed_contents.get("status") == 304:
+            logger.info(f"RSS Feed not modified: {feed_path}")
+        elif feed_contents:
+            _add_rss_posts(workspace_id, rss_document, feed_contents.entries)
+        update_subscription_timestamp(
+            workspace_id,
+            document_id,
+            etag=feed_contents.get("etag"),
+            modified=feed_contents.get("modified"),
+        )
+    except Exception as e:
+        raise genai_core.types.CommonError("Error parsing feed", e)
+
+
+def _add_rss_posts(workspace_id: str, rss_document: dict, entries: list):
+    """Adds the entries of the feed that are not posts of the workspace yet"""
+    document_id = rss_document["document_id"]
+    posts = {}
+    for feed_entry in entries:
+        post_id = str(_get_hash_id_from_path(feed_entry.get("link", "")))
+        posts[post_id] = feed_entry
+
+    post_ids = list(posts.keys())
+    existing_post_ids = set()
+    for i in range(0, len(post_ids), BATCH_GET_MAX_KEYS):
+        existing_post_ids.update(
+            _get_existing_document_ids(
+                workspace_id, post_ids[i : i + BATCH_GET_MAX_KEYS]
+            )
+        )
+
+    new_post_ids = [post_id for post_id in post_ids if post_id not in existing_post_ids]
+    logger.info(
+        "RSS Feed posts",
+        feed_id=document_id,
+        posts=len(post_ids),
+        new_posts=len(new_post_ids),
+    )
+
+    for post_id in new_post_ids:
+        feed_entry = posts[post_id]
+        timestamp = _get_timestamp()
+        try:
+            # The post may have been added since it was looked up
+            documents_table.put_item(
+                Item={
                     "format_version": 1,
                     "workspace_id": workspace_id,
                     "document_id": post_id,
@@ -719,21 +858,44 @@ def check_rss_feed_for_posts(workspace_id, document_id):
                     "created_at": timestamp,
                     "updated_at": timestamp,
                     "crawler_properties": rss_document.get("crawler_properties", None),
-                }
-                try:
-                    documents_table.put_item(
-                        Item=document,
-                        ConditionExpression="attribute_not_exists(document_id)",
-                    )
-                except botocore.exceptions.ClientError as e:
-                    if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
-                        logger.info(f"Post already exists: {feed_entry['link']}")
-                        continue
-                    else:
-                        raise e
-        update_subscription_timestamp(workspace_id, document_id)
-    except Exception as e:
-        raise genai_core.types.CommonError("Error parsing feed", e)
+                },
+                ConditionExpression="attribute_not_exists(document_id)",
+            )
+        except botocore.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise e
+            logger.info(f"Post already exists: {feed_entry.get('link', '')}")
+
+
+def _get_existing_document_ids(workspace_id: str, document_ids: list) -> set:
+    request_items = {
+        DOCUMENTS_TABLE_NAME: {
+            "Keys": [
+                {"workspace_id": workspace_id, "document_id": document_id}
+                for document_id in document_ids
+            ],
+            "ProjectionExpression": "document_id",
+        }
+    }
+
+    existing = set()
+    for attempt in range(BATCH_GET_ATTEMPTS):
+        if attempt > 0:
+            time.sleep(BATCH_GET_BACKOFF * 2**attempt)
+        response = dynamodb.batch_get_item(RequestItems=request_items)
+        for item in response["Responses"].get(DOCUMENTS_TABLE_NAME, []):
+            existing.add(item["document_id"])
+        request_items = response.get("UnprocessedKeys")
+        if not request_items:
+            break
+    else:
+        # Treated as new, the conditional put skips the existing ones
+        logger.warning(
+            "Documents not read",
+            count=len(request_items[DOCUMENTS_TABLE_NAME]["Keys"]),
+        )
+
+    return existing
 
 
 def _get_hash_id_from_path(path):
@@ -744,67 +906,78 @@ def _get_hash_id_from_path(path):
 
 
 def batch_crawl_websites():
-    """Gets next 10 pending posts and sends them to be website crawled"""
+    """Gets the next pending posts and sends them to be website crawled"""
     posts = _get_batch_pending_posts()
     if posts["Count"] > 0:
-        for post in posts["Items"]:
-            workspace_id = post["workspace_id"]["S"]
-            feed_id = post["rss_feed_id"]["S"]
-            document_id = post["document_id"]["S"]
-            path = post["path"]["S"]
-
-            properties = post["crawler_properties"]
-
-            follow_links = True
-            if (
-                properties
-                and properties["M"]
-                and properties["M"]["follow_links"]
-                and properties["M"]["follow_links"]["BOOL"] == False
-            ):
-                follow_links = False
-
-            limit = 250
-            if (
-                properties
-                and properties["M"]
-                and properties["M"]["limit"]
-                and properties["M"]["limit"]["N"]
-            ):
-                limit = int(post["crawler_properties"]["M"]["limit"]["N"])
-
-            content_types = []
-            if (
-                properties
-                and properties["M"]
-                and properties["M"]["content_types"]
-                and properties["M"]["content_types"]["L"]
-            ):
-                for type in post["crawler_properties"]["M"]["content_types"]["L"]:
-                    content_types.append(type["S"])
-            else:
-                content_types.append("text/html")
-
-            create_document(
-                workspace_id,
-                "website",
-                path=path,
-                crawler_properties={
-                    "follow_links": follow_links,
-                    "limit": limit,
-                    "content_types": content_types,
-                },
-            )
-            set_status(workspace_id, document_id, "processed")
-            update_subscription_timestamp(workspace_id, feed_id)
+        with ThreadPoolExecutor(max_workers=RSS_POSTS_CRAWL_WORKERS) as executor:
+            for future in [
+                executor.submit(_crawl_rss_post, post) for post in posts["Items"]
+            ]:
+                try:
+                    future.result()
+                except Exception as e:
+                    # The post stays pending and is crawled by the next run
+                    logger.exception(e)
+
+
+def _crawl_rss_post(post: dict):
+    workspace_id = post["workspace_id"]["S"]
+    feed_id = post["rss_feed_id"]["S"]
+    document_id = post["document_id"]["S"]
+    path = post["path"]["S"]
+
+    properties = post["crawler_properties"]
+
+    follow_links = True
+    if (
+        properties
+        and properties["M"]
+        and properties["M"]["follow_links"]
+        and properties["M"]["follow_links"]["BOOL"] == False
+    ):
+        follow_links = False
+
+    limit = 250
+    if (
+        properties
+        and properties["M"]
+        and properties["M"]["limit"]
+        and properties["M"]["limit"]["N"]
+    ):
+        limit = int(post["crawler_properties"]["M"]["limit"]["N"])
+
+    content_types = []
+    if (
+        properties
+        and properties["M"]
+        and properties["M"]["content_types"]
+        and properties["M"]["content_types"]["L"]
+    ):
+        for type in post["crawler_properties"]["M"]["content_types"]["L"]:
+            content_types.append(type["S"])
+    else:
+        content_types.append("text/html")
+
+    create_document(
+        workspace_id,
+        "website",
+        path=path,
+        crawler_properties={
+            "follow_links": follow_links,
+            "limit": limit,
+            "content_types": content_types,
+        },
+    )
+    set_status(workspace_id, document_id, "processed")
+    update_subscription_timestamp(workspace_id, feed_id)
 
 
 def _get_batch_pending_posts():
-    """Gets the first 10 Pending Posts from the RSS Feed to Crawl"""
+    """Gets the first pending posts from the RSS Feed to Crawl"""
     return dynamodb_client.query(
         TableName=DOCUMENTS_TABLE_NAME,
         IndexName=DOCUMENTS_BY_STATUS_INDEX,
-        Limit=10,
+        Limit=RSS_POSTS_CRAWL_BATCH_SIZE,
         KeyConditionExpression="#status = :status and #document_type = :document_type",
         ExpressionAttributeValues={
             ":status": {"S": "pending"},
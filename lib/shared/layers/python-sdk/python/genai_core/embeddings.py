@@ -8,29 +8,43 @@ import numpy as np
 from genai_core.types import EmbeddingsModel, CommonError, Provider, Task
 import genai_core.clients
 import genai_core.parameters
+import genai_core.utils.telemetry as telemetry
 from typing import List, Optional
 
 SAGEMAKER_RAG_MODELS_ENDPOINT = os.environ.get("SAGEMAKER_RAG_MODELS_ENDPOINT")
+MAX_INPUT_CHARS = 10000
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "Throttling",
+}
 logger = Logger()
 
 
 def generate_embeddings(
     model: EmbeddingsModel, input: List[str], task: str = "store", batch_size: int = 50
 ) -> List[List[float]]:
-    input = list(map(lambda x: x[:10000], input))
+    truncated = sum(1 for x in input if len(x) > MAX_INPUT_CHARS)
+    if truncated:
+        # Use the token chunking strategy to fit the chunks to the model
+        logger.warning("Embeddings input truncated", count=truncated)
+        telemetry.add_metric("EmbeddingTruncations", truncated)
+    input = list(map(lambda x: x[:MAX_INPUT_CHARS], input))
 
     ret_value = []
     batch_split = [input[i : i + batch_size] for i in range(0, len(input), batch_size)]
 
     for batch in batch_split:
-        if model.provider == Provider.OPENAI.value:
-            ret_value.extend(_generate_embeddings_openai(model, batch))
-        elif model.provider == Provider.BEDROCK.value:
-            ret_value.extend(_generate_embeddings_bedrock(model, batch, task))
-        elif model.provider == Provider.SAGEMAKER.value:
-            ret_value.extend(_generate_embeddings_sagemaker(model, batch))
-        else:
-            raise CommonError(f"Unknown provider: {model.provider}")
+        telemetry.add_metric("EmbeddingBatches", 1)
+        with telemetry.span("Embedding"):
+            if model.provider == Provider.OPENAI.value:
+                ret_value.extend(_generate_embeddings_openai(model, batch))
+            elif model.provider == Provider.BEDROCK.value:
+                ret_value.extend(_generate_embeddings_bedrock(model, batch, task))
+            elif model.provider == Provider.SAGEMAKER.value:
+                ret_value.extend(_generate_embeddings_sagemaker(model, batch))
+            else:
+                raise CommonError(f"Unknown provider: {model.provider}")
 
     return ret_value
 
@@ -73,6 +87,7 @@ def _generate_embeddings_bedrock(model: EmbeddingsModel, input: List[str], task:
 
     if not bedrock:
         raise CommonError("Bedrock is not enabled.")
+    _count_throttles(bedrock)
 
     model_provider = model.name.split(".")[0]
     if model_provider == Provider.AMAZON.value:
@@ -93,6 +108,7 @@ def _generate_embeddings_amazon(model: EmbeddingsModel, input: List[str], bedroc
             accept="application/json",
             contentType="application/json",
         )
+        _count_retries(response)
         response_body = json.loads(response.get("body").read())
         embedding = response_body.get("embedding")
 
@@ -117,6 +133,7 @@ def _generate_embeddings_cohere(
         accept="application/json",
         contentType="application/json",
     )
+    _count_retries(response)
     response_body = json.loads(response.get("body").read())
     embeddings = response_body.get("embeddings")
 
@@ -125,6 +142,7 @@ def _generate_embeddings_cohere(
 
 def _generate_embeddings_sagemaker(model: EmbeddingsModel, input: List[str]):
     client = genai_core.clients.get_sagemaker_client()
+    _count_throttles(client)
 
     max_retries = 5
     for attempt in range(max_retries):
@@ -137,6 +155,7 @@ def _generate_embeddings_sagemaker(model: EmbeddingsModel, input: List[str]):
                 ),
             )
 
+            _count_retries(response)
             ret_value = json.loads(response["Body"].read().decode())
 
             return ret_value
@@ -148,6 +167,7 @@ def _generate_embeddings_sagemaker(model: EmbeddingsModel, input: List[str]):
                 or error_code == "InternalServerError"
             ):
                 logger.info(f"Attempt {attempt + 1} failed with a 500 error.")
+                telemetry.add_metric("EmbeddingRetries", 1)
                 time.sleep(
                     random.uniform(
                         0.3, 1.5
@@ -157,3 +177,26 @@ def _generate_embeddings_sagemaker(model: EmbeddingsModel, input: List[str]):
             else:
                 # If the exception was due to another reason, raise it.
                 raise error
+
+
+def _count_retries(response: dict):
+    # Attempts retried by the botocore retry mode of the client
+    retries = response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+    if retries > 0:
+        telemetry.add_metric("EmbeddingRetries", retries)
+
+
+def _count_throttles(client):
+    client.meta.events.register("needs-retry", _on_needs_retry)
+
+
+def _on_needs_retry(response=None, **kwargs):
+    # Called for each attempt, before botocore decides to retry it
+    if response is None:
+        return None
+
+    error_code = response[1].get("Error", {}).get("Code")
+    if error_code in THROTTLING_ERROR_CODES:
+        telemetry.add_metric("EmbeddingThrottles", 1)
+
+    return None
@@ -3,7 +3,8 @@ from aws_lambda_powertools import Logger
 import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 import genai_core.utils.delete_files_with_prefix
-from datetime import datetime
+import genai_core.workspace_deletion
+import genai_core.workspace_stats
 
 PROCESSING_BUCKET_NAME = os.environ["PROCESSING_BUCKET_NAME"]
 UPLOAD_BUCKET_NAME = os.environ["UPLOAD_BUCKET_NAME"]
@@ -19,61 +20,37 @@ dynamodb = boto3.resource("dynamodb")
 logger = Logger()
 
 
-def delete_workspace(workspace: dict):
+def delete_workspace(workspace: dict, should_stop=None) -> bool:
     workspace_id = workspace["workspace_id"]
-    genai_core.utils.delete_files_with_prefix.delete_files_with_prefix(
-        UPLOAD_BUCKET_NAME, workspace_id
-    )
-    genai_core.utils.delete_files_with_prefix.delete_files_with_prefix(
-        PROCESSING_BUCKET_NAME, workspace_id
-    )
-    genai_core.utils.delete_files_with_prefix.delete_files_with_prefix(
-        DEFAULT_KENDRA_S3_DATA_SOURCE_BUCKET_NAME, f"documents/{workspace_id}"
-    )
-    genai_core.utils.delete_files_with_prefix.delete_files_with_prefix(
-        DEFAULT_KENDRA_S3_DATA_SOURCE_BUCKET_NAME, f"metadata/documents/{workspace_id}"
-    )
 
-    workspaces_table = dynamodb.Table(WORKSPACES_TABLE_NAME)
-    documents_table = dynamodb.Table(DOCUMENTS_TABLE_NAME)
+    def delete_files():
+        return genai_core.utils.delete_files_with_prefix.delete_files_with_prefixes(
+            [
+                (UPLOAD_BUCKET_NAME, workspace_id),
+                (PROCESSING_BUCKET_NAME, workspace_id),
+                (
+                    DEFAULT_KENDRA_S3_DATA_SOURCE_BUCKET_NAME,
+                    f"documents/{workspace_id}",
+                ),
+                (
+                    DEFAULT_KENDRA_S3_DATA_SOURCE_BUCKET_NAME,
+                    f"metadata/documents/{workspace_id}",
+                ),
+            ],
+            should_stop,
+        )
 
-    items_to_delete = []
-    last_evaluated_key = None
-    while True:
-        query_args = {
-            "KeyConditionExpression": boto3.dynamodb.conditions.Key("workspace_id").eq(
-                workspace_id
-            )
-        }
-
-        if last_evaluated_key:
-            query_args["ExclusiveStartKey"] = last_evaluated_key
-
-        response = documents_table.query(**query_args)
-        items_to_delete.extend(response["Items"])
-
-        last_evaluated_key = response.get("LastEvaluatedKey")
-        if not last_evaluated_key:
-            break
-
-    # Batch delete in groups of 25
-    for i in range(0, len(items_to_delete), 25):
-        with documents_table.batch_writer() as batch:
-            for item in items_to_delete[i : i + 25]:
-                batch.delete_item(
-                    Key={
-                        "workspace_id": item["workspace_id"],
-                        "document_id": item["document_id"],
-                    }
-                )
-
-    logger.info(f"Deleted {len(items_to_delete)} items.")
-
-    response = workspaces_table.delete_item(
-        Key={"workspace_id": workspace_id, "object_type": WORKSPACE_OBJECT_TYPE},
-    )
+    def delete_documents():
+        return genai_core.workspace_deletion.delete_documents(workspace_id, should_stop)
 
-    logger.info(f"Delete Item succeeded: {response}")
+    return genai_core.workspace_deletion.run_deletion_steps(
+        workspace,
+        [
+            ("files", delete_files),
+            ("documents", delete_documents),
+        ],
+        should_stop,
+    )
 
 
 def delete_kendra_document(workspace_id: str, document: dict):
@@ -81,7 +58,6 @@ def delete_kendra_document(workspace_id: str, document: dict):
     document_vectors = document["vectors"]
     documents_diff = 1
     document_size_in_bytes = document["size_in_bytes"]
-    timestamp = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
     document_type = document["document_type"]
 
     if document["path"]:
@@ -99,7 +75,6 @@ def delete_kendra_document(workspace_id: str, document: dict):
     deleteKendraDocument(workspace_id, document_id, document_type)
 
     documents_table = dynamodb.Table(DOCUMENTS_TABLE_NAME)
-    workspaces_table = dynamodb.Table(WORKSPACES_TABLE_NAME)
 
     try:
         response = documents_table.delete_item(
@@ -110,18 +85,11 @@ def delete_kendra_document(workspace_id: str, document: dict):
         )
         logger.info(f"Delete document succeeded: {response}")
 
-        updateResponse = workspaces_table.update_item(
-            Key={"workspace_id": workspace_id, "object_type": WORKSPACE_OBJECT_TYPE},
-            UpdateExpression="ADD size_in_bytes :incrementValue, "
-            + "documents :documentsIncrementValue, "
-            + "vectors :vectorsIncrementValue SET updated_at=:timestampValue",
-            ExpressionAttributeValues={
-                ":incrementValue": -document_size_in_bytes,
-                ":documentsIncrementValue": -documents_diff,
-                ":vectorsIncrementValue": -document_vectors,
-                ":timestampValue": timestamp,
-            },
-            ReturnValues="UPDATED_NEW",
+        updateResponse = genai_core.workspace_stats.add_workspace_stats(
+            workspace_id,
+            documents=-documents_diff,
+            vectors=-document_vectors,
+            size_in_bytes=-document_size_in_bytes,
         )
         logger.info(f"Workspaces table updated for the document: {updateResponse}")
 
@@ -1,7 +1,8 @@
 import json
+import time
 from aws_lambda_powertools import Logger
 import boto3
-from typing import List
+from typing import List, Optional
 from decimal import Decimal
 from datetime import datetime
 from botocore.exceptions import ClientError
@@ -15,10 +16,17 @@ from langchain.schema.messages import (
 )
 from langchain_core.messages.ai import AIMessage, AIMessageChunk
 from langchain_core.messages.human import HumanMessage
+from langchain_core.messages.system import SystemMessage
+from .history_window import Summarizer, window_messages
+import genai_core.utils.telemetry as telemetry
 
 client = boto3.resource("dynamodb")
 logger = Logger()
 
+TITLE_MAX_LENGTH = 200
+HISTORY_WRITE_ATTEMPTS = 3
+HISTORY_WRITE_BACKOFF = 0.1
+
 
 class DynamoDBChatMessageHistory(BaseChatMessageHistory):
     def __init__(
@@ -26,16 +34,63 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
         table_name: str,
         session_id: str,
         user_id: str,
+        max_tokens: Optional[int] = None,
+        summarizer: Optional[Summarizer] = None,
+        defer_writes: bool = False,
     ):
         self.table = client.Table(table_name)
         self.session_id = session_id
         self.user_id = user_id
+        self.max_tokens = max_tokens
+        self.summarizer = summarizer
         self.temporary_messages = []
         self.start_time = None
+        self.summary = None
+        self.summarized_count = 0
+        # When deferred, the messages of the turn are kept in memory
+        # and stored with a single update by flush()
+        self.defer_writes = defer_writes
+        self.pending_messages = []
+        self.summary_changed = False
 
     @property
     def messages(self) -> List[BaseMessage]:
-        return self.get_messages_from_storage() + self.temporary_messages
+        """Messages used in the prompt, limited to max_tokens if it is set"""
+        with telemetry.span("HistoryLoad"):
+            stored_messages = self.get_messages_from_storage()
+        summary = self.summary
+        messages, self.summary, self.summarized_count = window_messages(
+            stored_messages,
+            self.max_tokens,
+            summary=self.summary,
+            summarized_count=self.summarized_count,
+            summarizer=self.summarizer,
+        )
+        if self.summary != summary:
+            if self.defer_writes:
+                self.summary_changed = True
+            else:
+                self.save_summary()
+
+        if len(messages) < len(stored_messages):
+            logger.info(
+                "Chat history windowed",
+                stored=len(stored_messages),
+                used=len(messages),
+                max_tokens=self.max_tokens,
+            )
+
+        if self.summary:
+            messages = [
+                SystemMessage(
+                    content="Summary of the earlier conversation: " + self.summary
+                )
+            ] + messages
+        return (
+            messages
+            + messages_from_dict(self.pending_messages)
+            + self.temporary_messages
+        )
 
     def get_messages_from_storage(self) -> List[BaseMessage]:
         """Retrieve the messages from DynamoDB"""
@@ -53,6 +108,10 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
         if response and "Item" in response:
             items = response["Item"]["History"]
             self.start_time = response["Item"]["StartTime"]
+            # A summary waiting for flush() is newer than the stored one
+            if not self.summary_changed:
+                self.summary = response["Item"].get("Summary")
+                self.summarized_count = int(response["Item"].get("SummarizedCount", 0))
         else:
             items = []
 
@@ -60,7 +119,25 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
 
     def add_message(self, message: BaseMessage) -> None:
         """Append the message to the record in DynamoDB"""
+        if self.defer_writes:
+            self.pending_messages.append(self._message_to_dict(message))
+            return
+
+        with telemetry.span("HistoryPersist"):
+            self._add_message(message)
+
+    def _add_message(self, message: BaseMessage) -> None:
         messages = messages_to_dict(self.get_messages_from_storage())
+        messages.append(self._message_to_dict(message))
+
+        try:
+            self.table.put_item(
+                Item=self._get_item(messages, datetime.now().isoformat())
+            )
+        except ClientError as err:
+            logger.exception(err)
+
+    def _message_to_dict(self, message: BaseMessage) -> dict:
         if isinstance(message, AIMessageChunk):
             # When streaming with RunnableWithMessageHistory,
             # it would add a chunk to the history but it expects a text as content.
@@ -68,19 +145,36 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
             for c in message.content:
                 if "text" in c:
                     ai_message = ai_message + c.get("text")
-            _message = _message_to_dict(AIMessage(ai_message))
-        else:
-            _message = _message_to_dict(message)
-        messages.append(_message)
+            return _message_to_dict(AIMessage(ai_message))
+        return _message_to_dict(message)
 
+    def _get_item(self, messages: list, start_time: Optional[str]) -> dict:
+        item = {
+            "SessionId": self.session_id,
+            "UserId": self.user_id,
+            "StartTime": (
+                datetime.now().isoformat() if start_time is None else start_time
+            ),
+            "History": messages,
+        }
+        # Stored for the sessions list (projected in the summary index)
+        if len(messages) > 0 and isinstance(messages[0]["data"]["content"], str):
+            item["Title"] = messages[0]["data"]["content"][:TITLE_MAX_LENGTH]
+        # Keep the rolling summary of the messages out of the window
+        if self.summary:
+            item["Summary"] = self.summary
+            item["SummarizedCount"] = self.summarized_count
+        return item
+
+    def save_summary(self) -> None:
         try:
-            self.table.put_item(
-                Item={
-                    "SessionId": self.session_id,
-                    "UserId": self.user_id,
-                    "StartTime": datetime.now().isoformat(),
-                    "History": messages,
-                }
+            self.table.update_item(
+                Key={"SessionId": self.session_id, "UserId": self.user_id},
+                UpdateExpression="SET Summary = :summary, SummarizedCount = :count",
+                ExpressionAttributeValues={
+                    ":summary": self.summary,
+                    ":count": self.summarized_count,
+                },
             )
         except ClientError as err:
             logger.exception(err)
@@ -91,6 +185,16 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
 
     def add_metadata(self, metadata: dict) -> None:
         """Add additional metadata to the last message"""
+        if self.defer_writes and self.pending_messages:
+            self.pending_messages[-1]["data"]["additional_kwargs"] = json.loads(
+                json.dumps(metadata), parse_float=Decimal
+            )
+            return
+
+        with telemetry.span("HistoryPersist"):
+            self._add_metadata(metadata)
+
+    def _add_metadata(self, metadata: dict) -> None:
         messages = messages_to_dict(self.get_messages_from_storage())
         if not messages:
             return
@@ -99,27 +203,21 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
         messages[-1]["data"]["additional_kwargs"] = metadata
 
         try:
-            self.table.put_item(
-                Item={
-                    "SessionId": self.session_id,
-                    "UserId": self.user_id,
-                    "StartTime": (
-                        datetime.now().isoformat()
-                        if self.start_time is None
-                        else self.start_time
-                    ),
-                    "History": messages,
-                }
-            )
+            self.table.put_item(Item=self._get_item(messages, self.start_time))
 
         except Exception as err:
             logger.exception(err)
 
     def replace_last_message(self, content: str) -> None:
         """Replace the last message. For example when it is blocked by guardrails"""
+        if self.defer_writes and self.pending_messages:
+            self.pending_messages[-1]["data"]["content"] = content
+            return
+
         messages = messages_to_dict(self.get_messages_from_storage())
         if not messages:
             return
+        messages[-1]["data"]["content"] = content
 
         logger.info(
             "updaing",
@@ -137,22 +235,68 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
             },
         )
         try:
-            self.table.put_item(
-                Item={
-                    "SessionId": self.session_id,
-                    "UserId": self.user_id,
-                    "StartTime": (
-                        datetime.now().isoformat()
-                        if self.start_time is None
-                        else self.start_time
-                    ),
-                    "History": messages,
-                }
-            )
+            self.table.put_item(Item=self._get_item(messages, self.start_time))
 
         except Exception as err:
             logger.exception(err)
 
+    def flush(self) -> None:
+        """Store the pending messages, their metadata and the summary
+        with a single update (Used when the writes are deferred)"""
+        if not self.pending_messages and not self.summary_changed:
+            return
+
+        with telemetry.span("HistoryPersist"):
+            self._flush()
+
+    def _flush(self) -> None:
+        expressions = [
+            "History = list_append(if_not_exists(History, :empty), :messages)",
+            # Last activity of the session, sorts the sessions of a user
+            "StartTime = :startTime",
+        ]
+        values = {
+            ":empty": [],
+            ":messages": self.pending_messages,
+            ":startTime": datetime.now().isoformat(),
+        }
+        # The title is the first message of the session
+        if (
+            self.start_time is None
+            and self.pending_messages
+            and isinstance(self.pending_messages[0]["data"]["content"], str)
+        ):
+            expressions.append("Title = if_not_exists(Title, :title)")
+            values[":title"] = self.pending_messages[0]["data"]["content"][
+                :TITLE_MAX_LENGTH
+            ]
+        if self.summary_changed:
+            expressions.append("Summary = :summary, SummarizedCount = :count")
+            values[":summary"] = self.summary
+            values[":count"] = self.summarized_count
+
+        for attempt in range(HISTORY_WRITE_ATTEMPTS):
+            try:
+                self.table.update_item(
+                    Key={"SessionId": self.session_id, "UserId": self.user_id},
+                    UpdateExpression="SET " + ", ".join(expressions),
+                    ExpressionAttributeValues=values,
+                )
+                break
+            except ClientError as err:
+                code = err.response["Error"]["Code"]
+                if code == "ValidationException" or (
+                    attempt == HISTORY_WRITE_ATTEMPTS - 1
+                ):
+                    # The response is already sent, the turn is not stored
+                    logger.exception(err)
+                    break
+                logger.warning("Retrying the history update", code=code)
+                time.sleep(HISTORY_WRITE_BACKOFF * 2**attempt)
+
+        self.pending_messages = []
+        self.summary_changed = False
+
     def clear(self) -> None:
         """Clear session memory from DynamoDB"""
         try:
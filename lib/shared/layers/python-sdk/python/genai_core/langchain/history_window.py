@@ -0,0 +1,86 @@
+from typing import Callable, List, Optional, Tuple
+
+from langchain.schema.messages import BaseMessage
+from langchain_core.messages.human import HumanMessage
+
+# Rough estimation (~4 characters per token) used for every model. It avoids
+# loading a tokenizer per model and is accurate enough to bound the prompt.
+CHARS_PER_TOKEN = 4
+# Attachments are not part of the stored text. Count them with a fixed cost.
+FILE_TOKENS = 1500
+
+Summarizer = Callable[[Optional[str], List[BaseMessage]], str]
+
+
+def estimate_tokens(message: BaseMessage) -> int:
+    tokens = 0
+    if isinstance(message.content, str):
+        tokens += len(message.content) // CHARS_PER_TOKEN + 1
+    else:
+        for block in message.content:
+            if isinstance(block, dict) and "text" in block:
+                tokens += len(block.get("text") or "") // CHARS_PER_TOKEN + 1
+            else:
+                tokens += FILE_TOKENS
+
+    files = message.additional_kwargs.get("files", [])
+    return tokens + FILE_TOKENS * len(files)
+
+
+def window_start(messages: List[BaseMessage], max_tokens: int) -> int:
+    """Index of the oldest message that fits in the token budget.
+
+    The last human message and the answers after it are always kept, even
+    over the budget, and the window always starts with a human message.
+    """
+    last_human = next(
+        (
+            i
+            for i in range(len(messages) - 1, -1, -1)
+            if isinstance(messages[i], HumanMessage)
+        ),
+        len(messages),
+    )
+    start = len(messages)
+    total = 0
+    for i in range(len(messages) - 1, -1, -1):
+        total += estimate_tokens(messages[i])
+        if total > max_tokens and start <= last_human:
+            break
+        start = i
+
+    while start < last_human and not isinstance(messages[start], HumanMessage):
+        start += 1
+
+    return start
+
+
+def window_messages(
+    messages: List[BaseMessage],
+    max_tokens: Optional[int],
+    summary: Optional[str] = None,
+    summarized_count: int = 0,
+    summarizer: Optional[Summarizer] = None,
+) -> Tuple[List[BaseMessage], Optional[str], int]:
+    """Returns the messages to send to the model and the (updated) summary.
+
+    Without a summarizer, the oldest messages are dropped to fit the budget.
+    With a summarizer, the messages not covered by the summary are kept until
+    they exceed the budget. They are then folded into the summary until they
+    fit in half of the budget so the summarizer is only called every few turns.
+    """
+    if max_tokens is None:
+        return messages, summary, summarized_count
+
+    if summarizer is None:
+        start = window_start(messages, max_tokens)
+        return messages[start:], summary, summarized_count
+
+    summarized_count = min(summarized_count, len(messages))
+    recent = messages[summarized_count:]
+    if window_start(recent, max_tokens) > 0:
+        start = window_start(recent, max_tokens // 2)
+        summary = summarizer(summary, recent[:start])
+        summarized_count += start
+
+    return messages[summarized_count:], summary, summarized_count
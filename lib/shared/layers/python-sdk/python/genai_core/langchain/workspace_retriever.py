@@ -1,6 +1,6 @@
 from aws_lambda_powertools import Logger
 import genai_core.semantic_search
-from typing import List
+from typing import List, Optional
 from langchain.callbacks.manager import CallbackManagerForRetrieverRun
 from langchain.schema import BaseRetriever, Document
 
@@ -9,6 +9,8 @@ logger = Logger()
 
 class WorkspaceRetriever(BaseRetriever):
     workspace_id: str
+    # Restricts the search, see genai_core.search_filters
+    filters: Optional[dict] = None
     documents_found: List[Document] = []
 
     def get_last_search_documents(self) -> List[Document]:
@@ -19,7 +21,11 @@ class WorkspaceRetriever(BaseRetriever):
     ) -> List[Document]:
         logger.debug("SearchRequest", query=query)
         result = genai_core.semantic_search.semantic_search(
-            self.workspace_id, query, limit=3, full_response=False
+            self.workspace_id,
+            query,
+            limit=3,
+            full_response=False,
+            filters=self.filters,
         )
 
         self.documents_found = [
@@ -1,4 +1,9 @@
+import os
 import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional
 from aws_lambda_powertools import Logger
 import genai_core.types
 import genai_core.clients
@@ -8,33 +13,112 @@ from genai_core.types import Modality, Provider, ModelInterface
 
 logger = Logger()
 
+# Each provider is served from the cache while it is younger than the TTL.
+# Until the max staleness, a stale provider is returned while it is queried
+# in the background. Past it, or on a cold start, the request waits for the
+# providers up to the timeout and a slow provider is left out until it
+# answers. After a failed query the provider keeps its last models (none on
+# a cold start) and is queried again in the background after the retry TTL.
+MODELS_CACHE_TTL = int(os.environ.get("MODELS_CACHE_TTL", "300"))
+MODELS_FAILURE_TTL = int(os.environ.get("MODELS_FAILURE_TTL", "30"))
+MODELS_CACHE_MAX_STALENESS = int(os.environ.get("MODELS_CACHE_MAX_STALENESS", "3600"))
+MODELS_PROVIDER_TIMEOUT = float(os.environ.get("MODELS_PROVIDER_TIMEOUT", "5"))
+
+_executor = ThreadPoolExecutor(max_workers=5)
+_lock = threading.Lock()
+# provider -> (fetched at, models)
+_catalog = {}
+# provider -> future of the running query
+_pending = {}
+
 
 def list_models():
+    ages = _get_provider_ages()
+    missing = [provider for provider in PROVIDER_LOADERS if provider not in ages]
+    stale = [provider for provider, age in ages.items() if age > MODELS_CACHE_TTL]
+    futures = _refresh_providers(missing + stale)
+
+    if ages:
+        waiting = [
+            futures[provider]
+            for provider in stale
+            if ages[provider] > MODELS_CACHE_MAX_STALENESS
+        ]
+    else:
+        waiting = list(futures.values())
+
+    if waiting:
+        _, not_done = wait(waiting, timeout=MODELS_PROVIDER_TIMEOUT)
+        if not_done:
+            logger.warning(f"{len(not_done)} model providers timed out")
+
     models = []
+    with _lock:
+        for provider in PROVIDER_LOADERS:
+            if provider in _catalog:
+                models.extend(dict(model) for model in _catalog[provider][1])
+
+    return models
+
+
+def _get_provider_ages():
+    """Age of the loaded providers, the missing ones are not included"""
+    now = time.monotonic()
+    with _lock:
+        return {
+            provider: now - _catalog[provider][0]
+            for provider in PROVIDER_LOADERS
+            if provider in _catalog
+        }
+
+
+def _refresh_providers(providers: list) -> dict:
+    futures = {}
+    with _lock:
+        for provider in providers:
+            future = _pending.get(provider)
+            if future is None:
+                future = _executor.submit(
+                    _load_provider, provider, PROVIDER_LOADERS[provider]
+                )
+                _pending[provider] = future
+            futures[provider] = future
+
+    return futures
 
-    bedrock_models = list_bedrock_models()
-    if bedrock_models:
-        models.extend(bedrock_models)
 
-    bedrock_cris_models = list_bedrock_cris_models()
-    if bedrock_cris_models:
-        models.extend(bedrock_cris_models)
+def _load_provider(provider: str, loader):
+    fetched_at = time.monotonic()
+    try:
+        models = loader() or []
+    except Exception as e:
+        logger.error(f"Error listing {provider} models: {e}")
+        with _lock:
+            models = _catalog.get(provider, (None, []))[1]
+        # Stale after the retry TTL instead of the cache TTL
+        fetched_at -= max(0, MODELS_CACHE_TTL - MODELS_FAILURE_TTL)
 
-    fine_tuned_models = list_bedrock_finetuned_models()
-    if fine_tuned_models:
-        models.extend(fine_tuned_models)
+    with _lock:
+        _catalog[provider] = (fetched_at, models)
+        _pending.pop(provider, None)
 
-    sagemaker_models = list_sagemaker_models()
-    if sagemaker_models:
-        models.extend(sagemaker_models)
 
-    openai_models = list_openai_models()
-    if openai_models:
-        models.extend(openai_models)
+def list_all_bedrock_models():
+    """On-demand and cross region inference models, the foundation models are
+    listed once for both"""
+    bedrock = genai_core.clients.get_bedrock_client(service_name="bedrock")
+    if not bedrock:
+        return None
 
-    azure_openai_models = list_azure_openai_models()
-    if azure_openai_models:
-        models.extend(azure_openai_models)
+    foundation_models = bedrock.list_foundation_models()["modelSummaries"]
+
+    models = []
+    for bedrock_models in [
+        list_bedrock_models(foundation_models),
+        list_bedrock_cris_models(foundation_models),
+    ]:
+        if bedrock_models:
+            models.extend(bedrock_models)
 
     return models
 
@@ -106,7 +190,8 @@ def create_bedrock_model_profile(bedrock_model: dict, model_name: str) -> dict:
         "provider": Provider.BEDROCK.value,
         "name": model_name,
         "streaming": bedrock_model.get("responseStreamingSupported", False),
-        "inputModalities": bedrock_model["inputModalities"],
+        # Copied, the summary is shared by the on-demand and CRIS profiles
+        "inputModalities": list(bedrock_model["inputModalities"]),
         "outputModalities": bedrock_model["outputModalities"],
         "interface": ModelInterface.LANGCHAIN.value,
         "ragSupported": True,
@@ -134,11 +219,15 @@ def list_cross_region_inference_profiles():
     }
 
 
-def list_bedrock_cris_models():
+def list_bedrock_cris_models(foundation_models: Optional[list] = None):
     try:
         cross_region_profiles = list_cross_region_inference_profiles()
-        bedrock_client = genai_core.clients.get_bedrock_client(service_name="bedrock")
-        all_models = bedrock_client.list_foundation_models()["modelSummaries"]
+        all_models = foundation_models
+        if all_models is None:
+            bedrock_client = genai_core.clients.get_bedrock_client(
+                service_name="bedrock"
+            )
+            all_models = bedrock_client.list_foundation_models()["modelSummaries"]
 
         return [
             create_bedrock_model_profile(model, cross_region_profiles[model["modelId"]])
@@ -151,18 +240,26 @@ def list_bedrock_cris_models():
         return None
 
 
-def list_bedrock_models():
+def list_bedrock_models(foundation_models: Optional[list] = None):
     try:
-        bedrock = genai_core.clients.get_bedrock_client(service_name="bedrock")
-        if not bedrock:
-            return None
+        on_demand = genai_core.types.InferenceType.ON_DEMAND.value
+        if foundation_models is None:
+            bedrock = genai_core.clients.get_bedrock_client(service_name="bedrock")
+            if not bedrock:
+                return None
+
+            response = bedrock.list_foundation_models(byInferenceType=on_demand)
+            foundation_models = response.get("modelSummaries", [])
+        else:
+            foundation_models = [
+                m
+                for m in foundation_models
+                if on_demand in m.get("inferenceTypesSupported", [])
+            ]
 
-        response = bedrock.list_foundation_models(
-            byInferenceType=genai_core.types.InferenceType.ON_DEMAND.value,
-        )
         bedrock_models = [
             m
-            for m in response.get("modelSummaries", [])
+            for m in foundation_models
             if m.get("modelLifecycle", {}).get("status")
             == genai_core.types.ModelStatus.ACTIVE.value
         ]
@@ -253,3 +350,12 @@ def _get_model_modalities(model_id: str):
         return model.get("outputModalities", [])
     except IndexError:
         raise genai_core.types.CommonError(f"Invalid model ID format: {model_id}")
+
+
+PROVIDER_LOADERS = {
+    "bedrock": list_all_bedrock_models,
+    "bedrock_finetuned": list_bedrock_finetuned_models,
+    "sagemaker": list_sagemaker_models,
+    "openai": list_openai_models,
+    "azure_openai": list_azure_openai_models,
+}
@@ -1,5 +1,6 @@
 from aws_lambda_powertools import Logger
 from .client import get_open_search_client
+from .precision import get_vector_mapping
 
 logger = Logger()
 
@@ -7,7 +8,6 @@ logger = Logger()
 def create_workspace_index(workspace: dict):
     workspace_id = workspace["workspace_id"]
     index_name = workspace_id.replace("-", "")
-    embeddings_model_dimensions = workspace["embeddings_model_dimensions"]
 
     client = get_open_search_client()
 
@@ -21,23 +21,17 @@ def create_workspace_index(workspace: dict):
         },
         "mappings": {
             "properties": {
-                "content_embeddings": {
-                    "type": "knn_vector",
-                    "dimension": int(embeddings_model_dimensions),
-                    "method": {
-                        "name": "hnsw",
-                        "space_type": "l2",
-                        "engine": "nmslib",
-                        "parameters": {"ef_construction": 512, "m": 16},
-                    },
-                },
+                "content_embeddings": get_vector_mapping(workspace),
                 "chunk_id": {"type": "keyword"},
                 "workspace_id": {"type": "keyword"},
                 "document_id": {"type": "keyword"},
                 "document_sub_id": {"type": "keyword"},
                 "document_type": {"type": "keyword"},
                 "document_sub_type": {"type": "keyword"},
-                "path": {"type": "text"},
+                "path": {
+                    "type": "text",
+                    "fields": {"keyword": {"type": "keyword", "ignore_above": 2048}},
+                },
                 "language": {"type": "keyword"},
                 "title": {"type": "text"},
                 "content": {"type": "text"},
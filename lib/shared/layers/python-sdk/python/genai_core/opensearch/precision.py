@@ -0,0 +1,44 @@
+# Storage precision of the embeddings in the knn index:
+# - float32: float vectors in the nmslib engine
+# - float16: faiss scalar quantizer encoding the vectors as fp16
+# - quantized: lucene scalar quantizer, the engine computes the range of each
+#   segment from the indexed vectors and stores them as 7-bit integers
+VECTOR_PRECISIONS = ["float32", "float16", "quantized"]
+DEFAULT_VECTOR_PRECISION = "float32"
+PRECISION_ENGINES = {
+    "float32": "nmslib",
+    "float16": "faiss",
+    "quantized": "lucene",
+}
+
+
+def get_vector_precision(workspace: dict) -> str:
+    return workspace.get("vector_precision") or DEFAULT_VECTOR_PRECISION
+
+
+def get_engine(vector_precision: str) -> str:
+    return PRECISION_ENGINES[vector_precision or DEFAULT_VECTOR_PRECISION]
+
+
+def get_vector_mapping(workspace: dict) -> dict:
+    """knn_vector mapping of the content_embeddings field"""
+    precision = get_vector_precision(workspace)
+    parameters = {"ef_construction": 512, "m": 16}
+    mapping = {
+        "type": "knn_vector",
+        "dimension": int(workspace["embeddings_model_dimensions"]),
+    }
+
+    if precision == "float16":
+        parameters["encoder"] = {"name": "sq", "parameters": {"type": "fp16"}}
+    elif precision == "quantized":
+        parameters["encoder"] = {"name": "sq"}
+
+    mapping["method"] = {
+        "name": "hnsw",
+        "space_type": "l2",
+        "engine": get_engine(precision),
+        "parameters": parameters,
+    }
+
+    return mapping
@@ -1,12 +1,18 @@
 import genai_core.embeddings
 import genai_core.cross_encoder
-from typing import List
+from typing import List, Optional
 from .client import get_open_search_client
+import genai_core.utils.telemetry as telemetry
 from aws_lambda_powertools import Logger
 from genai_core.types import CommonError, Task
 
 logger = Logger()
 
+# Engines supporting the filter parameter of the knn query
+EFFICIENT_FILTERING_ENGINES = ["faiss", "lucene"]
+FILTERED_K_FACTOR = 4
+MAX_K = 10000
+
 
 def query_workspace_open_search(
     workspace_id: str,
@@ -15,8 +21,10 @@ def query_workspace_open_search(
     limit: int,
     full_response: bool,
     threshold: float = 0.0,
+    filters: Optional[dict] = None,
 ):
     index_name = workspace_id.replace("-", "")
+    engine = workspace.get("aoss_engine", "nmslib")
 
     embeddings_model_provider = workspace["embeddings_model_provider"]
     embeddings_model_name = workspace["embeddings_model_name"]
@@ -44,16 +52,18 @@ def query_workspace_open_search(
     items = []
 
     client = get_open_search_client()
-    vector_search_records = vector_query(
-        client, index_name, query_embeddings, vector_search_limit
-    )
+    with telemetry.span("VectorQuery"):
+        vector_search_records = vector_query(
+            client, index_name, query_embeddings, vector_search_limit, filters, engine
+        )
     vector_search_records = _convert_records("vector_search", vector_search_records)
     items.extend(vector_search_records)
 
     if hybrid_search:
-        keyword_search_records = keyword_query(
-            client, index_name, query, keyword_search_limit
-        )
+        with telemetry.span("KeywordQuery"):
+            keyword_search_records = keyword_query(
+                client, index_name, query, keyword_search_limit, filters
+            )
 
         keyword_search_records = _convert_records(
             "keyword_search", keyword_search_records
@@ -203,8 +213,36 @@ def _convert_records(source: str, records: List[dict]):
     return converted_records
 
 
-def vector_query(client, index_name: str, vector: List[float], size: int = 25):
-    query = {"query": {"knn": {"content_embeddings": {"vector": vector, "k": 5}}}}
+def vector_query(
+    client,
+    index_name: str,
+    vector: List[float],
+    size: int = 25,
+    filters: Optional[dict] = None,
+    engine: str = "nmslib",
+):
+    # k is the number of neighbors found per segment, size the number of hits
+    knn = {"vector": vector, "k": size}
+    filter_clauses = _get_filter_clauses(filters)
+
+    if len(filter_clauses) == 0:
+        query = {"query": {"knn": {"content_embeddings": knn}}}
+    elif engine in EFFICIENT_FILTERING_ENGINES:
+        # The filter is applied during the graph search
+        knn["filter"] = {"bool": {"filter": filter_clauses}}
+        query = {"query": {"knn": {"content_embeddings": knn}}}
+    else:
+        # nmslib filters the nearest neighbors after the search. More are
+        # retrieved so the filtered results still fill the page.
+        knn["k"] = min(size * FILTERED_K_FACTOR, MAX_K)
+        query = {
+            "query": {
+                "bool": {
+                    "must": [{"knn": {"content_embeddings": knn}}],
+                    "filter": filter_clauses,
+                }
+            }
+        }
 
     response = client.search(index=index_name, body=query, size=size)
 
@@ -214,8 +252,20 @@ def vector_query(client, index_name: str, vector: List[float], size: int = 25):
     return ret_value
 
 
-def keyword_query(client, index_name: str, text: str, size: int = 25):
+def keyword_query(
+    client, index_name: str, text: str, size: int = 25, filters: Optional[dict] = None
+):
     query = {"query": {"match": {"content": text}}}
+    filter_clauses = _get_filter_clauses(filters)
+    if len(filter_clauses) > 0:
+        query = {
+            "query": {
+                "bool": {
+                    "must": [{"match": {"content": text}}],
+                    "filter": filter_clauses,
+                }
+            }
+        }
 
     response = client.search(index=index_name, body=query, size=size)
 
@@ -223,3 +273,22 @@ def keyword_query(client, index_name: str, text: str, size: int = 25):
     ret_value = ret_value if ret_value is not None else []
 
     return ret_value
+
+
+def _get_filter_clauses(filters: Optional[dict]) -> List[dict]:
+    """Filter clauses of the search filters (see search_filters)"""
+    if not filters:
+        return []
+
+    clauses = []
+    if "document_ids" in filters:
+        clauses.append({"terms": {"document_id": filters["document_ids"]}})
+    if "document_types" in filters:
+        clauses.append({"terms": {"document_type": filters["document_types"]}})
+    if "path_prefix" in filters:
+        # path.keyword is mapped for the indexes created with the filters
+        clauses.append({"prefix": {"path.keyword": filters["path_prefix"]}})
+    for key, value in filters.get("metadata", {}).items():
+        clauses.append({"match_phrase": {f"metadata.{key}": value}})
+
+    return clauses
@@ -1,25 +1,98 @@
 import re
+import threading
+from collections import OrderedDict
+from aws_lambda_powertools import Logger
+
+logger = Logger()
+
+# The model ids come from the requests and the regexes match any suffix,
+# only the most recently used ones are kept
+RESOLVED_MAX_SIZE = 256
 
 
 class AdapterRegistry:
     def __init__(self):
-        # The registry is a dictionary where:
-        # Keys are compiled regular expressions
-        # Values are model IDs
+        # Exact model ids
+        self.exact = {}
+        # Character trie of the prefixes, each node is a dictionary of its
+        # children with the adapter of the prefix under the None key
+        self.prefixes = {}
+        # Compiled regular expressions, in registration order
         self.registry = {}
+        # Adapters resolved by model id, least recently used first
+        self.resolved = OrderedDict()
+        self.lock = threading.Lock()
 
     def register(self, regex, model_id):
         # Compiles the regex and stores it in the registry
-        self.registry[re.compile(regex)] = model_id
+        with self.lock:
+            self.registry[re.compile(regex)] = model_id
+            self.resolved.clear()
+
+    def register_exact(self, model, model_id):
+        with self.lock:
+            self.exact[model] = model_id
+            self.resolved.clear()
+
+    def register_prefix(self, prefix, model_id):
+        with self.lock:
+            node = self.prefixes
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[None] = model_id
+            self.resolved.clear()
 
     def get_adapter(self, model):
-        # Iterates over the registered regexes
-        for regex, adapter in self.registry.items():
-            # If a match is found, returns the associated model ID
-            if regex.match(model):
+        """Adapter of the model: the exact id first, then the longest
+        prefix, then the first matching regex"""
+        with self.lock:
+            adapter = self.resolved.get(model)
+            if adapter is not None:
+                self.resolved.move_to_end(model)
                 return adapter
-        # If no match is found, returns None
-        raise ValueError(
-            f"Adapter for model {model} not found in registry. "
-            + f"Available adapters: {self.registry}"
+
+        adapter = self._resolve(model)
+        with self.lock:
+            self.resolved[model] = adapter
+            if len(self.resolved) > RESOLVED_MAX_SIZE:
+                self.resolved.popitem(last=False)
+
+        return adapter
+
+    def _resolve(self, model):
+        matches = []
+        if model in self.exact:
+            matches.append((f"exact {model}", self.exact[model]))
+        prefix, adapter = self._match_prefix(model)
+        if adapter is not None:
+            matches.append((f"prefix {prefix}", adapter))
+        matches.extend(
+            (f"regex {regex.pattern}", adapter)
+            for regex, adapter in self.registry.items()
+            if regex.match(model)
         )
+        if len(matches) == 0:
+            raise ValueError(f"Adapter for model {model} not found in registry")
+
+        if len(set(adapter for _, adapter in matches)) > 1:
+            logger.warning(
+                f"Several adapters match model {model}, using the {matches[0][0]}",
+                matches=[match for match, _ in matches],
+            )
+
+        return matches[0][1]
+
+    def _match_prefix(self, model):
+        """Longest registered prefix of the model and its adapter"""
+        adapter = None
+        length = 0
+        node = self.prefixes
+        for index, char in enumerate(model):
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                adapter = node[None]
+                length = index + 1
+
+        return model[:length], adapter
@@ -0,0 +1,54 @@
+import uuid
+from typing import Optional
+from genai_core.types import CommonError
+
+# Filters supported by the Aurora and OpenSearch workspaces:
+# {
+#     "document_ids": ["..."],
+#     "document_types": ["file", "website", ...],
+#     "path_prefix": "https://example.com/docs/",
+#     "metadata": {"key": "value"},
+# }
+LIST_FILTERS = ["document_ids", "document_types"]
+MAX_FILTER_VALUES = 100
+
+
+def normalize_filters(filters: Optional[dict]) -> Optional[dict]:
+    """Validates the search filters and drops the empty ones.
+    Returns None when nothing is filtered."""
+    if not filters:
+        return None
+
+    unknown = set(filters.keys()) - set(LIST_FILTERS + ["path_prefix", "metadata"])
+    if len(unknown) > 0:
+        raise CommonError(f"Unknown search filters: {', '.join(sorted(unknown))}")
+
+    normalized = {}
+    for key in LIST_FILTERS:
+        values = filters.get(key)
+        if not values:
+            continue
+        if not isinstance(values, list) or len(values) > MAX_FILTER_VALUES:
+            raise CommonError(f"Invalid {key} filter")
+        normalized[key] = [str(value) for value in values]
+
+    if "document_ids" in normalized:
+        # The Aurora tables store the ids in a uuid column
+        try:
+            normalized["document_ids"] = [
+                str(uuid.UUID(value)) for value in normalized["document_ids"]
+            ]
+        except ValueError:
+            raise CommonError("Invalid document_ids filter")
+
+    path_prefix = filters.get("path_prefix")
+    if path_prefix:
+        normalized["path_prefix"] = str(path_prefix)
+
+    metadata = filters.get("metadata")
+    if metadata:
+        if not isinstance(metadata, dict):
+            raise CommonError("Invalid metadata filter")
+        normalized["metadata"] = metadata
+
+    return normalized if len(normalized) > 0 else None
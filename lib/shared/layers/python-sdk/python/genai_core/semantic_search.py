@@ -1,4 +1,6 @@
+from typing import Optional
 import genai_core.types
+import genai_core.search_filters
 import genai_core.workspaces
 import genai_core.embeddings
 from genai_core.aurora import query_workspace_aurora
@@ -8,8 +10,13 @@ from genai_core.bedrock_kb import query_workspace_bedrock_kb
 
 
 def semantic_search(
-    workspace_id: str, query: str, limit: int = 5, full_response: bool = False
+    workspace_id: str,
+    query: str,
+    limit: int = 5,
+    full_response: bool = False,
+    filters: Optional[dict] = None,
 ):
+    filters = genai_core.search_filters.normalize_filters(filters)
     workspace = genai_core.workspaces.get_workspace(workspace_id)
 
     if not workspace:
@@ -20,13 +27,19 @@ def semantic_search(
 
     if workspace["engine"] == "aurora":
         return query_workspace_aurora(
-            workspace_id, workspace, query, limit, full_response
+            workspace_id, workspace, query, limit, full_response, filters=filters
         )
     elif workspace["engine"] == "opensearch":
         return query_workspace_open_search(
-            workspace_id, workspace, query, limit, full_response
+            workspace_id, workspace, query, limit, full_response, filters=filters
         )
-    elif workspace["engine"] == "kendra":
+
+    if filters is not None:
+        raise genai_core.types.CommonError(
+            "Search filters are not supported for this workspace"
+        )
+
+    if workspace["engine"] == "kendra":
         return query_workspace_kendra(
             workspace_id, workspace, query, limit, full_response
         )
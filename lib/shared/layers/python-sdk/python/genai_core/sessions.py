@@ -1,16 +1,35 @@
 import os
+import json
+import time
+import base64
+from concurrent.futures import ThreadPoolExecutor
 from aws_lambda_powertools import Logger
 import boto3
 from botocore.exceptions import ClientError
+import genai_core.utils.thread_local
+from genai_core.types import CommonError
 
 AWS_REGION = os.environ["AWS_REGION"]
 SESSIONS_TABLE_NAME = os.environ["SESSIONS_TABLE_NAME"]
 SESSIONS_BY_USER_ID_INDEX_NAME = os.environ["SESSIONS_BY_USER_ID_INDEX_NAME"]
+SESSIONS_BY_USER_ID_SUMMARY_INDEX_NAME = os.environ[
+    "SESSIONS_BY_USER_ID_SUMMARY_INDEX_NAME"
+]
+SESSIONS_PAGE_MAX_LIMIT = 100
+DELETE_BATCH_SIZE = 25
+DELETE_WORKERS = 8
+S3_DELETE_BATCH_SIZE = 1000
+# Unprocessed keys of the batch reads are retried with an exponential backoff
+BATCH_READ_ATTEMPTS = 5
+BATCH_READ_BACKOFF = 0.05
 
 
-dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
-table = dynamodb.Table(SESSIONS_TABLE_NAME)
-s3 = boto3.resource("s3")
+# The sessions are deleted by several workers
+dynamodb = genai_core.utils.thread_local.resource("dynamodb", region_name=AWS_REGION)
+table = genai_core.utils.thread_local.ThreadLocalResource(
+    lambda: dynamodb.Table(SESSIONS_TABLE_NAME)
+)
+s3_client = boto3.client("s3")
 logger = Logger()
 
 
@@ -28,60 +47,121 @@ def get_session(session_id, user_id):
 
 
 def list_sessions_by_user_id(user_id):
+    """Returns the summary (id, title, start time) of all the user sessions"""
     items = []
-    try:
-        last_evaluated_key = None
-        while True:
-            if last_evaluated_key:
-                response = table.query(
-                    KeyConditionExpression="UserId = :user_id",
-                    ExpressionAttributeValues={":user_id": user_id},
-                    IndexName=SESSIONS_BY_USER_ID_INDEX_NAME,
-                    ExclusiveStartKey=last_evaluated_key,
-                )
-            else:
-                response = table.query(
-                    KeyConditionExpression="UserId = :user_id",
-                    ExpressionAttributeValues={":user_id": user_id},
-                    IndexName=SESSIONS_BY_USER_ID_INDEX_NAME,
-                )
+    next_token = None
+    while True:
+        page = list_sessions_page(
+            user_id, limit=SESSIONS_PAGE_MAX_LIMIT, next_token=next_token
+        )
+        items.extend(page["items"])
+        next_token = page["next_token"]
+        if not next_token:
+            break
+
+    return items
 
-            items.extend(response.get("Items", []))
 
-            last_evaluated_key = response.get("LastEvaluatedKey")
-            if not last_evaluated_key:
-                break
+def list_sessions_page(user_id, limit=SESSIONS_PAGE_MAX_LIMIT, next_token=None):
+    """Returns a page of sessions summaries, most recent first.
+
+    The summary index only projects the keys and the title so the cost does
+    not depend on the length of the conversations.
+    """
+    items = []
+    last_evaluated_key = None
+    try:
+        query_args = {
+            "KeyConditionExpression": "UserId = :user_id",
+            "ExpressionAttributeValues": {":user_id": user_id},
+            "IndexName": SESSIONS_BY_USER_ID_SUMMARY_INDEX_NAME,
+            "ScanIndexForward": False,
+            "Limit": min(limit, SESSIONS_PAGE_MAX_LIMIT),
+        }
+        if next_token:
+            query_args["ExclusiveStartKey"] = decode_next_token(next_token, user_id)
 
+        response = table.query(**query_args)
+        items = response.get("Items", [])
+        last_evaluated_key = response.get("LastEvaluatedKey")
     except ClientError as error:
         if error.response["Error"]["Code"] == "ResourceNotFoundException":
             logger.warning("No record found for user id: %s", user_id)
         else:
             logger.exception(error)
 
+    return {
+        "items": _add_missing_titles(items, user_id),
+        "next_token": (
+            encode_next_token(last_evaluated_key) if last_evaluated_key else None
+        ),
+    }
+
+
+def _add_missing_titles(items, user_id):
+    # Sessions created before the title was stored only have it in the history
+    missing = [item["SessionId"] for item in items if "Title" not in item]
+    if len(missing) == 0:
+        return items
+
+    titles = {}
+    for i in range(0, len(missing), 100):
+        keys = [
+            {"SessionId": session_id, "UserId": user_id}
+            for session_id in missing[i : i + 100]
+        ]
+        request = {
+            SESSIONS_TABLE_NAME: {
+                "Keys": keys,
+                "ProjectionExpression": "SessionId, History[0].#data.content",
+                "ExpressionAttributeNames": {"#data": "data"},
+            }
+        }
+        for attempt in range(BATCH_READ_ATTEMPTS):
+            if attempt > 0:
+                time.sleep(BATCH_READ_BACKOFF * 2**attempt)
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for item in response.get("Responses", {}).get(SESSIONS_TABLE_NAME, []):
+                history = item.get("History", [{}])
+                titles[item["SessionId"]] = history[0].get("data", {}).get("content")
+            request = response.get("UnprocessedKeys")
+            if not request:
+                break
+        else:
+            # The page is returned without these titles
+            logger.warning(
+                "Session titles not read",
+                count=len(request[SESSIONS_TABLE_NAME]["Keys"]),
+            )
+
+    for item in items:
+        if "Title" not in item and titles.get(item["SessionId"]):
+            item["Title"] = titles[item["SessionId"]]
     return items
 
 
+def encode_next_token(last_evaluated_key):
+    return base64.urlsafe_b64encode(json.dumps(last_evaluated_key).encode()).decode()
+
+
+def decode_next_token(next_token, user_id):
+    try:
+        start_key = json.loads(base64.urlsafe_b64decode(next_token.encode()))
+    except ValueError:
+        raise CommonError("Invalid next token")
+    if not isinstance(start_key, dict) or start_key.get("UserId") != user_id:
+        raise CommonError("Invalid next token")
+    return start_key
+
+
 def delete_session(session_id, user_id):
     try:
         session = table.get_item(Key={"SessionId": session_id, "UserId": user_id}).get(
             "Item", {}
         )
-        for item in session.get("History"):
-            metadata = item.get("data", {}).get("additional_kwargs", {})
-            for file in (
-                metadata.get("images", [])
-                + metadata.get("documents", [])
-                + metadata.get("videos", [])
-            ):
-                if not isinstance(file, dict) or "key" not in file:
-                    continue
-                key = "private/" + user_id + "/" + file["key"]
-                logger.info(
-                    "Deleting session file",
-                    bucket=os.environ["CHATBOT_FILES_BUCKET_NAME"],
-                    key=key,
-                )
-                s3.Object(os.environ["CHATBOT_FILES_BUCKET_NAME"], key).delete()
+        failed_keys = _delete_files(_get_session_files_keys(session, user_id))
+        if len(failed_keys) > 0:
+            return {"id": session_id, "deleted": False}
 
         table.delete_item(Key={"SessionId": session_id, "UserId": user_id})
         logger.info("Sessions deleted", sessionId=session_id)
@@ -98,10 +178,109 @@ def delete_session(session_id, user_id):
 
 def delete_user_sessions(user_id):
     sessions = list_sessions_by_user_id(user_id)
-    ret_value = []
+    session_ids = [session["SessionId"] for session in sessions]
+    batches = [
+        session_ids[i : i + DELETE_BATCH_SIZE]
+        for i in range(0, len(session_ids), DELETE_BATCH_SIZE)
+    ]
+
+    deleted = {}
+    with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as pool:
+        for result in pool.map(
+            lambda batch: _delete_sessions_batch(batch, user_id), batches
+        ):
+            deleted.update(result)
+
+    return [
+        {"id": session_id, "deleted": deleted.get(session_id, False)}
+        for session_id in session_ids
+    ]
+
+
+def _delete_sessions_batch(session_ids, user_id):
+    """Deletes the sessions and their files. Returns the status per session"""
+    deleted = {session_id: False for session_id in session_ids}
+    try:
+        keys_by_session = {}
+        unread = set()
+        request = {
+            SESSIONS_TABLE_NAME: {
+                "Keys": [
+                    {"SessionId": session_id, "UserId": user_id}
+                    for session_id in session_ids
+                ],
+                # The file keys are nested in the history items
+                "ProjectionExpression": "SessionId, History",
+            }
+        }
+        for attempt in range(BATCH_READ_ATTEMPTS):
+            if attempt > 0:
+                time.sleep(BATCH_READ_BACKOFF * 2**attempt)
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for session in response.get("Responses", {}).get(SESSIONS_TABLE_NAME, []):
+                keys_by_session[session["SessionId"]] = _get_session_files_keys(
+                    session, user_id
+                )
+            request = response.get("UnprocessedKeys")
+            if not request:
+                break
+        else:
+            # Their files are unknown, they are kept for a next deletion
+            unread = {key["SessionId"] for key in request[SESSIONS_TABLE_NAME]["Keys"]}
+            logger.warning("Sessions not read", count=len(unread))
 
-    for session in sessions:
-        result = delete_session(session["SessionId"], user_id)
-        ret_value.append({"id": session["SessionId"], "deleted": result["deleted"]})
+        failed_keys = _delete_files(
+            [key for keys in keys_by_session.values() for key in keys]
+        )
+        # Keep the sessions with files that could not be deleted
+        to_delete = [
+            session_id
+            for session_id in session_ids
+            if session_id not in unread
+            and not failed_keys.intersection(keys_by_session.get(session_id, []))
+        ]
+
+        with table.batch_writer() as batch:
+            for session_id in to_delete:
+                batch.delete_item(Key={"SessionId": session_id, "UserId": user_id})
+                deleted[session_id] = True
+
+        logger.info("Sessions deleted", count=len(to_delete))
+    except ClientError as error:
+        logger.exception(error)
+
+    return deleted
+
+
+def _get_session_files_keys(session, user_id):
+    keys = []
+    for item in session.get("History", []):
+        metadata = item.get("data", {}).get("additional_kwargs", {})
+        for file in (
+            metadata.get("images", [])
+            + metadata.get("documents", [])
+            + metadata.get("videos", [])
+        ):
+            if not isinstance(file, dict) or "key" not in file:
+                continue
+            keys.append("private/" + user_id + "/" + file["key"])
+    return keys
+
+
+def _delete_files(keys):
+    """Deletes the files in batches of 1000 keys. Returns the keys not deleted"""
+    failed_keys = set()
+    keys = list(dict.fromkeys(keys))
+    bucket_name = os.environ["CHATBOT_FILES_BUCKET_NAME"] if keys else None
+    for i in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+        batch = keys[i : i + S3_DELETE_BATCH_SIZE]
+        logger.info("Deleting session files", bucket=bucket_name, count=len(batch))
+        response = s3_client.delete_objects(
+            Bucket=bucket_name,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+        )
+        for error in response.get("Errors", []):
+            logger.error("Session file not deleted", key=error.get("Key"), error=error)
+            failed_keys.add(error.get("Key"))
 
-    return ret_value
+    return failed_keys
@@ -81,6 +81,7 @@ class ChatbotAction(Enum):
     RUN = "run"
     LLM_NEW_TOKEN = "llm_new_token"  # nosec B105 False positive, this is not password
     FINAL_RESPONSE = "final_response"
+    LLM_SOURCES = "llm_sources"
 
 
 class ChatbotMessageType(Enum):
@@ -1,5 +1,12 @@
+import os
 import boto3
-from typing import Optional, List
+from functools import lru_cache
+from typing import Optional, List, Tuple
+from genai_core.utils.language_detection import detect_languages
+
+# "comprehend" or "local" for the offline detector
+QUERY_LANGUAGE_DETECTION = os.environ.get("QUERY_LANGUAGE_DETECTION", "comprehend")
+LANGUAGE_CACHE_SIZE = 1024
 
 comprehend = boto3.client("comprehend")
 
@@ -41,20 +48,38 @@ def comprehend_language_code_to_postgres(language_code: str) -> Optional[str]:
 
 
 def get_query_language(query: str, languages: List[str]):
-    language_name = "english"
-    comprehend_response = comprehend.detect_dominant_language(Text=query)
-    comprehend_languages = comprehend_response["Languages"]
+    # A single language workspace only has the text search config of it
+    if len(languages) == 1:
+        return [languages[0], []]
+
+    language_name = "english" if "english" in languages else languages[0]
     detected_languages = [
-        {"code": language["LanguageCode"], "score": language["Score"]}
-        for language in comprehend_languages
+        {"code": code, "score": score}
+        for code, score in _detect_languages(_normalize_query(query))
     ]
 
-    if len(comprehend_languages) > 0:
+    if len(detected_languages) > 0:
         postgres_language_name = comprehend_language_code_to_postgres(
-            comprehend_languages[0]["LanguageCode"]
+            detected_languages[0]["code"]
         )
 
         if postgres_language_name is not None and postgres_language_name in languages:
             language_name = postgres_language_name
 
     return [language_name, detected_languages]
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+@lru_cache(maxsize=LANGUAGE_CACHE_SIZE)
+def _detect_languages(text: str) -> Tuple[Tuple[str, float], ...]:
+    if QUERY_LANGUAGE_DETECTION == "local":
+        return tuple(detect_languages(text))
+
+    comprehend_response = comprehend.detect_dominant_language(Text=text)
+    return tuple(
+        (language["LanguageCode"], language["Score"])
+        for language in comprehend_response["Languages"]
+    )
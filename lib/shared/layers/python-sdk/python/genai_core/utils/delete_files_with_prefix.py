@@ -1,36 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
 from aws_lambda_powertools import Logger
 import boto3
 
 logger = Logger()
 
+# Number of concurrent DeleteObjects calls per prefix. The listing of a prefix
+# is sequential (continuation tokens) but the deletes of each page are not.
+DELETE_WORKERS_PER_PREFIX = 4
+MAX_PREFIXES_IN_PARALLEL = 4
 
-def delete_files_with_prefix(bucket_name, prefix):
+
+def delete_files_with_prefix(
+    bucket_name, prefix, should_stop: Optional[Callable[[], bool]] = None
+) -> bool:
+    """Deletes all the objects under the prefix.
+
+    Returns False if should_stop interrupted the deletion before the end.
+    The objects already deleted are not listed again so a new call resumes.
+    """
     s3_client = boto3.client("s3")
-    continuation_token = None
+    paginator = s3_client.get_paginator("list_objects_v2")
+    deleted = 0
+
+    with ThreadPoolExecutor(max_workers=DELETE_WORKERS_PER_PREFIX) as pool:
+        futures = []
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+            if "Contents" in page:
+                delete_list = [{"Key": obj["Key"]} for obj in page["Contents"]]
+                deleted += len(delete_list)
+
+                # Delete the objects in a batch while the next page is listed
+                futures.append(
+                    pool.submit(
+                        s3_client.delete_objects,
+                        Bucket=bucket_name,
+                        Delete={"Objects": delete_list, "Quiet": True},
+                    )
+                )
+
+            if should_stop is not None and should_stop():
+                logger.info("Stopped deleting objects", prefix=prefix, count=deleted)
+                return False
+
+        errors = sum(len(future.result().get("Errors", [])) for future in futures)
+
+    if errors > 0:
+        raise Exception(f"Failed to delete {errors} objects with prefix {prefix}")
+
+    logger.info(
+        "Finished deleting all objects with the specified prefix.",
+        bucket=bucket_name,
+        prefix=prefix,
+        count=deleted,
+    )
+    return True
 
-    while True:
-        # If we have a continuation token from the previous response, use it
-        if continuation_token:
-            objects_to_delete = s3_client.list_objects_v2(
-                Bucket=bucket_name, Prefix=prefix, ContinuationToken=continuation_token
-            )
-        else:
-            objects_to_delete = s3_client.list_objects_v2(
-                Bucket=bucket_name, Prefix=prefix
-            )
 
-        # Prepare the list of objects to delete
-        if "Contents" in objects_to_delete:
-            delete_list = [{"Key": obj["Key"]} for obj in objects_to_delete["Contents"]]
+def delete_files_with_prefixes(
+    targets: List[Tuple[str, str]], should_stop: Optional[Callable[[], bool]] = None
+) -> bool:
+    """Deletes the objects of several (bucket, prefix) pairs in parallel"""
+    targets = [(bucket, prefix) for bucket, prefix in targets if bucket]
+    if len(targets) == 0:
+        return True
 
-            # Delete the objects in a batch
-            s3_client.delete_objects(
-                Bucket=bucket_name, Delete={"Objects": delete_list}
+    workers = min(MAX_PREFIXES_IN_PARALLEL, len(targets))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(
+            pool.map(
+                lambda target: delete_files_with_prefix(*target, should_stop),
+                targets,
             )
+        )
 
-        # If there"s no NextContinuationToken in the response, we"ve fetched all objects
-        if "NextContinuationToken" in objects_to_delete:
-            continuation_token = objects_to_delete["NextContinuationToken"]
-        else:
-            logger.info("Finished deleting all objects with the specified prefix.")
-            break
+    return all(results)
@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import boto3
+from aws_lambda_powertools import Logger
+from botocore.exceptions import ClientError
+
+s3 = boto3.client("s3")
+logger = Logger()
+
+MAX_CACHE_BYTES = int(os.environ.get("FILES_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+# Files larger than this are downloaded but never cached
+MAX_FILE_BYTES = MAX_CACHE_BYTES // 4
+# Entries are used without checking the ETag for this duration (in seconds)
+FRESH_SECONDS = 60
+PREFETCH_WORKERS = 8
+
+
+class FileCache:
+    """LRU cache of S3 objects bytes, bounded by size and kept by the warm
+    containers. Entries are revalidated with their ETag (conditional GET)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, bucket: str, key: str) -> bytes:
+        cache_key = (bucket, key)
+        with self.lock:
+            entry = self.entries.get(cache_key)
+            if entry is not None:
+                self.entries.move_to_end(cache_key)
+
+        if entry is not None and time.monotonic() - entry["checked"] < FRESH_SECONDS:
+            return entry["bytes"]
+
+        try:
+            if entry is not None:
+                response = s3.get_object(
+                    Bucket=bucket, Key=key, IfNoneMatch=entry["etag"]
+                )
+            else:
+                response = s3.get_object(Bucket=bucket, Key=key)
+        except ClientError as error:
+            # The cached version is still the latest
+            if entry is not None and error.response["Error"]["Code"] in (
+                "304",
+                "NotModified",
+            ):
+                entry["checked"] = time.monotonic()
+                return entry["bytes"]
+            raise
+
+        body = response["Body"].read()
+        self.put(cache_key, response["ETag"], body)
+        return body
+
+    def put(self, cache_key, etag: str, body: bytes) -> None:
+        if len(body) > MAX_FILE_BYTES:
+            return
+
+        with self.lock:
+            previous = self.entries.pop(cache_key, None)
+            if previous is not None:
+                self.size -= len(previous["bytes"])
+            self.entries[cache_key] = {
+                "etag": etag,
+                "bytes": body,
+                "checked": time.monotonic(),
+            }
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted["bytes"])
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+cache = FileCache(MAX_CACHE_BYTES)
+
+
+def get_file_bytes(bucket: str, key: str) -> bytes:
+    return cache.get(bucket, key)
+
+
+def prefetch_files(bucket: str, keys: List[str]) -> Dict[str, bytes]:
+    """Downloads the files in parallel so they are served from the cache"""
+    keys = list(dict.fromkeys(keys))
+    if len(keys) == 0:
+        return {}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(PREFETCH_WORKERS, len(keys))) as pool:
+        results = dict(zip(keys, pool.map(lambda k: get_file_bytes(bucket, k), keys)))
+    logger.info(
+        "Files prefetched",
+        count=len(keys),
+        latency_ms=int((time.perf_counter() - start) * 1000),
+    )
+    return results
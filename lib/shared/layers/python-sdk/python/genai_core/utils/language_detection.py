@@ -0,0 +1,99 @@
+import re
+from typing import List, Tuple
+
+# Offline language detection for short queries. Scripts used by a single
+# language decide directly, Latin languages are scored with their most
+# frequent words and their distinctive letters. The codes are the ones
+# returned by Amazon Comprehend.
+
+SCRIPTS = [
+    ("el", "Ͱ", "Ͽ"),
+    ("ru", "Ѐ", "ӿ"),
+    ("he", "֐", "׿"),
+    ("ar", "؀", "ۿ"),
+    ("hi", "ऀ", "ॿ"),
+    ("bn", "ঀ", "৿"),
+    ("zh", "㐀", "鿿"),
+]
+# Arabic script letters only used in Persian
+PERSIAN_LETTERS = "پچژگ"
+
+COMMON_WORDS = {
+    "cs": "a je to se na že v jak co pro jsou který není",
+    "da": "og er det at en til på med af ikke hvad hvordan jeg",
+    "de": "der die das und ist nicht ich wie was mit für auf ein eine zu",
+    "en": "the and is are of to in what how for with can does not this",
+    "es": "el la los las de que y es en por para cómo qué una con",
+    "fi": "ja on ei se mitä miten että kuinka ovat olla tai kun",
+    "fr": "le la les des et est que une pour dans comment quel quelle pas",
+    "hu": "a az és hogy nem van mi hogyan egy meg vagy ez",
+    "id": "yang dan di ini itu dengan untuk apa bagaimana tidak adalah",
+    "it": "il la di che è per come non una sono gli con del",
+    "nl": "de het een en van is dat niet hoe wat voor met zijn",
+    "no": "og er det at en til på med av ikke hva hvordan jeg",
+    "pl": "i w nie jest się na że jak co to do z dla",
+    "pt": "o a os de que e é em para como não uma um com",
+    "ro": "și este în de la nu ce cum un o care pentru cu",
+    "sv": "och är det att en till på med av inte vad hur jag",
+    "tr": "ve bir bu ne nasıl için ile değil mi da de olarak",
+    "vi": "và là của có không các những cho trong được như thế",
+}
+COMMON_WORDS = {code: set(words.split()) for code, words in COMMON_WORDS.items()}
+
+DISTINCTIVE_LETTERS = {
+    "cs": "řěůčšž",
+    "da": "æøå",
+    "de": "äöüß",
+    "es": "ñ¿¡áíóú",
+    "fi": "äö",
+    "fr": "çèêëîôœùû",
+    "hu": "őűáéö",
+    "it": "àèìòù",
+    "no": "æøå",
+    "pl": "łąęśźżńć",
+    "pt": "ãõçâêô",
+    "ro": "șțăâî",
+    "sv": "åäö",
+    "tr": "ğşıçöü",
+    "vi": "đơưạảấầẩẫậắằẳẵặẹẻẽếềểễệỉịọỏốồổỗộớờởỡợụủứừửữựỳỵỷỹ",
+}
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def detect_languages(text: str) -> List[Tuple[str, float]]:
+    """Language codes and scores of the text, the most likely first.
+    Returns an empty list when the text has no hint."""
+    script_counts = {}
+    for char in text:
+        for code, start, end in SCRIPTS:
+            if start <= char <= end:
+                script_counts[code] = script_counts.get(code, 0) + 1
+                break
+
+    if "ar" in script_counts and any(char in PERSIAN_LETTERS for char in text):
+        script_counts["fa"] = script_counts.pop("ar")
+
+    if len(script_counts) > 0:
+        return _normalize(script_counts)
+
+    scores = {}
+    words = WORD_PATTERN.findall(text.lower())
+    for code, common in COMMON_WORDS.items():
+        score = sum(1 for word in words if word in common)
+        score += 0.5 * sum(
+            1 for char in text if char in DISTINCTIVE_LETTERS.get(code, "")
+        )
+        if score > 0:
+            scores[code] = score
+
+    return _normalize(scores)
+
+
+def _normalize(scores: dict) -> List[Tuple[str, float]]:
+    total = sum(scores.values())
+    return sorted(
+        [(code, score / total) for code, score in scores.items()],
+        key=lambda item: item[1],
+        reverse=True,
+    )
@@ -0,0 +1,165 @@
+import os
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Optional
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.metrics import EphemeralMetrics, MetricUnit
+
+# Timings of the stages of a request, exported as CloudWatch EMF metrics
+# with one X-Ray subsegment per span. The spans of the code called during
+# the request (history, retrieval) are attached to the active telemetry,
+# they only measure their duration outside of a request.
+
+TELEMETRY_ENABLED = os.environ.get("TELEMETRY_ENABLED", "false") == "true"
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "GenAIChatBot")
+
+logger = Logger()
+
+_active = contextvars.ContextVar("telemetry", default=None)
+_tracer = None
+
+
+class EmfExporter:
+    def export(self, namespace: str, dimensions: Dict[str, str], metrics: dict):
+        emf = EphemeralMetrics(namespace=namespace)
+        for name, value in dimensions.items():
+            emf.add_dimension(name=name, value=value)
+        for name, (value, unit) in metrics.items():
+            emf.add_metric(name=name, unit=unit, value=value)
+        emf.flush_metrics()
+
+
+class StubExporter:
+    """Keeps the exported metrics, to check the instrumentation locally"""
+
+    def __init__(self):
+        self.exports = []
+
+    def export(self, namespace: str, dimensions: Dict[str, str], metrics: dict):
+        self.exports.append(
+            {"namespace": namespace, "dimensions": dimensions, "metrics": metrics}
+        )
+
+
+_exporter = EmfExporter()
+
+
+def set_exporter(exporter):
+    global _exporter
+    _exporter = exporter
+
+
+class Span:
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.elapsed_ms = None
+
+    def stop(self):
+        self.elapsed_ms = round((time.perf_counter() - self.start) * 1000, 2)
+
+
+class Telemetry:
+    """Metrics of a request, exported when the context exits"""
+
+    def __init__(
+        self,
+        dimensions: Optional[Dict[str, str]] = None,
+        namespace: str = METRICS_NAMESPACE,
+        enabled: Optional[bool] = None,
+        tracing: bool = True,
+    ):
+        self.dimensions = dimensions or {}
+        self.namespace = namespace
+        self.enabled = TELEMETRY_ENABLED if enabled is None else enabled
+        self.tracing = tracing
+        self.start = time.perf_counter()
+        self.metrics = {}
+        self._token = None
+
+    def __enter__(self):
+        self._token = _active.set(self)
+        return self
+
+    def __exit__(self, *args):
+        _active.reset(self._token)
+        self.flush()
+
+    @contextmanager
+    def span(self, name: str):
+        tracer = _get_tracer() if self.enabled and self.tracing else None
+        span = Span(name)
+        try:
+            if tracer is not None:
+                with tracer.provider.in_subsegment(f"## {name}"):
+                    yield span
+            else:
+                yield span
+        finally:
+            span.stop()
+            self.add_metric(name, span.elapsed_ms, MetricUnit.Milliseconds)
+
+    def mark(self, name: str):
+        """Records the time elapsed since the start of the request"""
+        elapsed_ms = round((time.perf_counter() - self.start) * 1000, 2)
+        self.add_metric(name, elapsed_ms, MetricUnit.Milliseconds)
+        return elapsed_ms
+
+    def add_metric(self, name: str, value: float, unit=MetricUnit.Count):
+        # The stages run several times in a request are added up
+        previous = self.metrics.get(name, (0, unit))[0]
+        self.metrics[name] = (previous + value, unit)
+
+    def get(self, name: str):
+        return self.metrics.get(name, (None, None))[0]
+
+    def flush(self):
+        if self.enabled and self.metrics:
+            try:
+                _exporter.export(self.namespace, self.dimensions, self.metrics)
+            except Exception as e:
+                logger.warning(f"Error exporting the metrics: {e}")
+        self.metrics = {}
+
+
+def _get_tracer():
+    # Imported on use, the batch jobs run without the X-Ray SDK
+    global _tracer
+    if _tracer is None:
+        from aws_lambda_powertools import Tracer
+
+        _tracer = Tracer()
+
+    return _tracer
+
+
+def get_active() -> Optional[Telemetry]:
+    return _active.get()
+
+
+@contextmanager
+def span(name: str):
+    """Span of the active telemetry, only timed without one"""
+    telemetry = _active.get()
+    if telemetry is None:
+        span = Span(name)
+        try:
+            yield span
+        finally:
+            span.stop()
+    else:
+        with telemetry.span(name) as span:
+            yield span
+
+
+def mark(name: str):
+    telemetry = _active.get()
+    if telemetry is not None:
+        return telemetry.mark(name)
+
+
+def add_metric(name: str, value: float, unit=MetricUnit.Count):
+    telemetry = _active.get()
+    if telemetry is not None:
+        telemetry.add_metric(name, value, unit)
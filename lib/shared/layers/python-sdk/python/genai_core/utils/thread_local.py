@@ -0,0 +1,27 @@
+import threading
+from typing import Any, Callable
+
+import boto3
+
+
+class ThreadLocalResource:
+    """boto3 resources are not thread safe. Each thread gets its own instance,
+    created by the factory on first use."""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._local = threading.local()
+
+    def __getattr__(self, name: str):
+        resource = getattr(self._local, "resource", None)
+        if resource is None:
+            resource = self._factory()
+            self._local.resource = resource
+        return getattr(resource, name)
+
+
+def resource(service_name: str, **kwargs) -> ThreadLocalResource:
+    # The default session is shared too, each thread uses its own session
+    return ThreadLocalResource(
+        lambda: boto3.session.Session().resource(service_name, **kwargs)
+    )
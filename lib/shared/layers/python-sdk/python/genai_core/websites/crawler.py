@@ -5,6 +5,7 @@ import boto3
 import requests
 import genai_core.chunks
 import genai_core.documents
+import genai_core.utils.telemetry as telemetry
 import pdfplumber
 import io
 from typing import List
@@ -28,70 +29,90 @@ def crawl_urls(
     workspace_id = workspace["workspace_id"]
     document_id = document["document_id"]
     batch_size = 20
+    # The crawl ends at the limit or earlier when it runs out of links
+    total = limit
+    if not follow_links:
+        total = min(limit, len(processed_urls) + len(priority_queue))
 
     idx = 0
-    while True:
-        # break the loop when priority loop is empty or processed urls is equal to limit
-        if len(priority_queue) == 0 or len(processed_urls) == limit:
-            break
-
-        priority_queue = sorted(priority_queue, key=lambda val: val["priority"])
-        current = priority_queue.pop(0)
-        current_url = current["url"]
-        current_priority = current["priority"]
-        if current_url in processed_urls:
-            continue
-
-        idx += 1
-
-        document_sub_id = str(uuid.uuid4())
-        processed_urls.append(current_url)
-        print(f"Processing url {document_sub_id}: {current_url}")
+    metrics = genai_core.chunks.IngestionMetrics(
+        workspace,
+        document_id,
+        total,
+        job="WebCrawler",
+        initial=len(processed_urls),
+    )
+    with metrics:
+        while True:
+            # break the loop when priority loop is empty or processed urls
+            # is equal to limit
+            if len(priority_queue) == 0 or len(processed_urls) == limit:
+                break
+
+            priority_queue = sorted(priority_queue, key=lambda val: val["priority"])
+            current = priority_queue.pop(0)
+            current_url = current["url"]
+            current_priority = current["priority"]
+            if current_url in processed_urls:
+                continue
+
+            idx += 1
+
+            document_sub_id = str(uuid.uuid4())
+            processed_urls.append(current_url)
+            print(f"Processing url {document_sub_id}: {current_url}")
+
+            try:
+                with telemetry.span("Parse"):
+                    content, local_links, _ = parse_url(current_url, content_types)
+            except Exception as e:
+                print(e)
+                print(f"Failed to parse url: {current_url}")
+                telemetry.add_metric("ParseErrors", 1)
+                metrics.update(len(processed_urls))
+                continue
+
+            _store_content_on_s3(
+                workspace_id,
+                document_id,
+                document_sub_id,
+                current_url,
+                content,
+            )
 
-        try:
-            content, local_links, _ = parse_url(current_url, content_types)
-        except Exception as e:
-            print(e)
-            print(f"Failed to parse url: {current_url}")
-            continue
+            chunks = genai_core.chunks.split_content(workspace, content)
 
-        _store_content_on_s3(
-            workspace_id,
-            document_id,
-            document_sub_id,
-            current_url,
-            content,
-        )
-
-        chunks = genai_core.chunks.split_content(workspace, content)
-
-        genai_core.chunks.add_chunks(
-            replace=False,
-            workspace=workspace,
-            document=document,
-            document_sub_id=document_sub_id,
-            chunks=chunks,
-            chunk_complements=None,
-            path=current_url,
-        )
-        if follow_links:
-            for link in local_links:
-                if link not in processed_urls:
-                    priority_queue.append(
-                        {"url": link, "priority": current_priority + 1}
-                    )
-
-        # update the status for every 20 (default batch size) links
-        if (
-            idx == batch_size
-            or len(priority_queue) == 0
-            or len(processed_urls) == limit
-        ):
-            sub_documents = len(processed_urls)
-            genai_core.documents.set_sub_documents(
-                workspace_id, document_id, sub_documents
+            genai_core.chunks.add_chunks(
+                replace=False,
+                workspace=workspace,
+                document=document,
+                document_sub_id=document_sub_id,
+                chunks=chunks,
+                chunk_complements=None,
+                path=current_url,
             )
-            idx = 0
+            if follow_links:
+                for link in local_links:
+                    if link not in processed_urls:
+                        priority_queue.append(
+                            {"url": link, "priority": current_priority + 1}
+                        )
+
+            # update the status for every 20 (default batch size) links
+            if (
+                idx == batch_size
+                or len(priority_queue) == 0
+                or len(processed_urls) == limit
+            ):
+                sub_documents = len(processed_urls)
+                genai_core.documents.set_sub_documents(
+                    workspace_id, document_id, sub_documents
+                )
+                idx = 0
+
+            metrics.update(len(processed_urls))
+
+        metrics.finish()
 
     return {
         "workspace_id": workspace_id,
@@ -0,0 +1,110 @@
+import os
+from typing import Callable, List, Optional, Tuple
+from aws_lambda_powertools import Logger
+import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+WORKSPACES_TABLE_NAME = os.environ.get("WORKSPACES_TABLE_NAME")
+DOCUMENTS_TABLE_NAME = os.environ.get("DOCUMENTS_TABLE_NAME")
+
+WORKSPACE_OBJECT_TYPE = "workspace"
+# String set stored on the workspace item with the steps already completed
+CHECKPOINT_ATTRIBUTE = "deletion_steps"
+
+dynamodb = boto3.resource("dynamodb")
+logger = Logger()
+
+# A step returns False when it was interrupted by should_stop
+Step = Tuple[str, Callable[[], Optional[bool]]]
+
+
+def run_deletion_steps(
+    workspace: dict,
+    steps: List[Step],
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> bool:
+    """Runs the deletion steps of a workspace then deletes the workspace item.
+
+    Completed steps are checkpointed on the workspace item so an invocation
+    retried by the state machine skips them. Returns False if the deletion
+    was interrupted and has to be resumed by another invocation. A retry
+    finding the workspace item already deleted returns True.
+    """
+    workspace_id = workspace["workspace_id"]
+    workspaces_table = dynamodb.Table(WORKSPACES_TABLE_NAME)
+    completed = set(workspace.get(CHECKPOINT_ATTRIBUTE, []))
+
+    for name, step in steps:
+        if name in completed:
+            logger.info("Skipping completed deletion step", step=name)
+            continue
+
+        if should_stop is not None and should_stop():
+            return False
+
+        if step() is False:
+            logger.info("Deletion step interrupted", step=name)
+            return False
+
+        try:
+            # Does not create the item again if it is already deleted
+            workspaces_table.update_item(
+                Key={
+                    "workspace_id": workspace_id,
+                    "object_type": WORKSPACE_OBJECT_TYPE,
+                },
+                UpdateExpression="ADD #steps :step",
+                ConditionExpression="attribute_exists(workspace_id)",
+                ExpressionAttributeNames={"#steps": CHECKPOINT_ATTRIBUTE},
+                ExpressionAttributeValues={":step": {name}},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise e
+            logger.info("Workspace already deleted", workspace_id=workspace_id)
+            return True
+        logger.info("Deletion step completed", step=name)
+
+    response = workspaces_table.delete_item(
+        Key={"workspace_id": workspace_id, "object_type": WORKSPACE_OBJECT_TYPE},
+    )
+    logger.info(f"Delete Item succeeded: {response}")
+
+    return True
+
+
+def delete_documents(
+    workspace_id: str, should_stop: Optional[Callable[[], bool]] = None
+) -> bool:
+    """Deletes the document items of the workspace page by page as they are
+    read. Deleted items are not returned again so a new call resumes."""
+    documents_table = dynamodb.Table(DOCUMENTS_TABLE_NAME)
+    query_args = {
+        "KeyConditionExpression": Key("workspace_id").eq(workspace_id),
+        "ProjectionExpression": "workspace_id, document_id",
+    }
+
+    deleted = 0
+    with documents_table.batch_writer() as batch:
+        while True:
+            response = documents_table.query(**query_args)
+            for item in response["Items"]:
+                batch.delete_item(
+                    Key={
+                        "workspace_id": item["workspace_id"],
+                        "document_id": item["document_id"],
+                    }
+                )
+            deleted += len(response["Items"])
+
+            last_evaluated_key = response.get("LastEvaluatedKey")
+            if not last_evaluated_key:
+                break
+            if should_stop is not None and should_stop():
+                logger.info(f"Deleted {deleted} items before stopping.")
+                return False
+            query_args["ExclusiveStartKey"] = last_evaluated_key
+
+    logger.info(f"Deleted {deleted} items.")
+    return True
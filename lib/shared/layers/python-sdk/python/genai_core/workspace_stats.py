@@ -0,0 +1,111 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from aws_lambda_powertools import Logger
+from botocore.exceptions import ClientError
+import genai_core.workspaces
+import genai_core.utils.thread_local
+from genai_core.types import WorkspaceStatus
+
+WORKSPACES_TABLE_NAME = os.environ.get("WORKSPACES_TABLE_NAME", "")
+DOCUMENTS_TABLE_NAME = os.environ.get("DOCUMENTS_TABLE_NAME", "")
+
+WORKSPACE_OBJECT_TYPE = "workspace"
+MAX_WORKSPACES_IN_PARALLEL = 4
+
+# The workspaces are aggregated in parallel
+dynamodb = genai_core.utils.thread_local.resource("dynamodb")
+logger = Logger()
+
+
+def add_workspace_stats(
+    workspace_id: str, documents: int = 0, vectors: int = 0, size_in_bytes: int = 0
+):
+    """Applies the changes of a document to the counters of the workspace"""
+    workspaces_table = dynamodb.Table(WORKSPACES_TABLE_NAME)
+    response = workspaces_table.update_item(
+        Key={"workspace_id": workspace_id, "object_type": WORKSPACE_OBJECT_TYPE},
+        UpdateExpression="ADD size_in_bytes :incrementValue, "
+        + "documents :documentsIncrementValue, "
+        + "vectors :vectorsIncrementValue SET updated_at=:timestampValue",
+        ExpressionAttributeValues={
+            ":incrementValue": size_in_bytes,
+            ":documentsIncrementValue": documents,
+            ":vectorsIncrementValue": vectors,
+            ":timestampValue": _get_timestamp(),
+        },
+        ReturnValues="UPDATED_NEW",
+    )
+
+    logger.info("Response for add_workspace_stats", response=response)
+
+    return response
+
+
+def aggregate_workspace_stats(workspace_id: str) -> dict:
+    """Recomputes the counters of the workspace from its documents.
+
+    The incremental updates drift when an ingestion fails halfway. Documents
+    added while the aggregation runs can be missed and are counted by the
+    next run."""
+    documents_table = dynamodb.Table(DOCUMENTS_TABLE_NAME)
+    stats = {"documents": 0, "vectors": 0, "size_in_bytes": 0}
+
+    query_args = {
+        "KeyConditionExpression": "workspace_id = :workspace_id",
+        "ExpressionAttributeValues": {":workspace_id": workspace_id},
+        "ProjectionExpression": "vectors, size_in_bytes",
+    }
+    while True:
+        response = documents_table.query(**query_args)
+        for item in response["Items"]:
+            stats["documents"] += 1
+            stats["vectors"] += int(item.get("vectors", 0))
+            stats["size_in_bytes"] += int(item.get("size_in_bytes", 0))
+
+        if "LastEvaluatedKey" not in response:
+            break
+        query_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    workspaces_table = dynamodb.Table(WORKSPACES_TABLE_NAME)
+    try:
+        workspaces_table.update_item(
+            Key={"workspace_id": workspace_id, "object_type": WORKSPACE_OBJECT_TYPE},
+            UpdateExpression="SET documents=:documents, vectors=:vectors, "
+            + "size_in_bytes=:sizeInBytes, stats_aggregated_at=:timestampValue",
+            ConditionExpression="attribute_exists(workspace_id)",
+            ExpressionAttributeValues={
+                ":documents": stats["documents"],
+                ":vectors": stats["vectors"],
+                ":sizeInBytes": stats["size_in_bytes"],
+                ":timestampValue": _get_timestamp(),
+            },
+        )
+    except ClientError as error:
+        # The workspace was deleted during the aggregation
+        if error.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+
+    logger.info("Aggregated workspace stats", workspace_id=workspace_id, **stats)
+
+    return stats
+
+
+def aggregate_all_workspace_stats() -> int:
+    """Recomputes the counters of every workspace with documents.
+    Returns the number of workspaces aggregated."""
+    workspace_ids = [
+        workspace["workspace_id"]
+        for workspace in genai_core.workspaces.list_workspaces()
+        if workspace.get("engine") != "bedrock_kb"
+        and workspace.get("status") == WorkspaceStatus.READY.value
+    ]
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKSPACES_IN_PARALLEL) as executor:
+        list(executor.map(aggregate_workspace_stats, workspace_ids))
+
+    return len(workspace_ids)
+
+
+def _get_timestamp():
+    return datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
@@ -1,14 +1,18 @@
 import os
 import json
 import uuid
+from typing import Optional
 from aws_lambda_powertools import Logger
 import boto3
 import genai_core.embeddings
+import genai_core.opensearch.precision
+import genai_core.utils.thread_local
 from datetime import datetime
 from .types import WorkspaceStatus
 from genai_core.types import Task
 
-dynamodb = boto3.resource("dynamodb")
+# Used by the threads creating documents
+dynamodb = genai_core.utils.thread_local.resource("dynamodb")
 sfn_client = boto3.client("stepfunctions")
 logger = Logger()
 
@@ -30,7 +34,9 @@ DELETE_WORKSPACE_WORKFLOW_ARN = os.environ.get("DELETE_WORKSPACE_WORKFLOW_ARN")
 WORKSPACE_OBJECT_TYPE = "workspace"
 
 if WORKSPACES_TABLE_NAME:
-    table = dynamodb.Table(WORKSPACES_TABLE_NAME)
+    table = genai_core.utils.thread_local.ThreadLocalResource(
+        lambda: dynamodb.Table(WORKSPACES_TABLE_NAME)
+    )
 else:
     logger.error("WORKSPACES_TABLE_NAME environment variable is not set")
     table = None
@@ -104,6 +110,19 @@ def set_status(workspace_id: str, status: str):
     return response
 
 
+def set_workspace_flag(workspace_id: str, name: str):
+    """Marks a migration of the workspace storage as done"""
+    if not table:
+        raise genai_core.types.CommonError("Workspaces table is not configured")
+
+    return table.update_item(
+        Key={"workspace_id": workspace_id, "object_type": WORKSPACE_OBJECT_TYPE},
+        UpdateExpression="SET #flag=:value",
+        ExpressionAttributeNames={"#flag": name},
+        ExpressionAttributeValues={":value": True},
+    )
+
+
 def create_workspace_aurora(
     workspace_name: str,
     embeddings_model_provider: str,
@@ -118,6 +137,9 @@ def create_workspace_aurora(
     chunking_strategy: str,
     chunk_size: int,
     chunk_overlap: int,
+    index_type: str = "ivfflat",
+    index_options: Optional[dict] = None,
+    vector_precision: str = "float32",
 ):
     workspace_id = str(uuid.uuid4())
     timestamp = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
@@ -145,7 +167,11 @@ def create_workspace_aurora(
         "languages": languages,
         "metric": metric,
         "has_index": has_index,
+        "index_type": index_type,
+        "vector_precision": vector_precision,
         "hybrid_search": hybrid_search,
+        "keyword_search_columns": True,
+        "filter_indexes": True,
         "chunking_strategy": chunking_strategy,
         "chunk_size": chunk_size,
         "chunk_overlap": chunk_overlap,
@@ -155,6 +181,10 @@ def create_workspace_aurora(
         "created_at": timestamp,
         "updated_at": timestamp,
     }
+    # hnsw_m, hnsw_ef_construction, hnsw_ef_search or ivfflat_probes
+    for key, value in (index_options or {}).items():
+        if value is not None:
+            item[key] = value
 
     if not table:
         raise genai_core.types.CommonError("Workspaces table is not configured")
@@ -191,6 +221,7 @@ def create_workspace_open_search(
     chunking_strategy: str,
     chunk_size: int,
     chunk_overlap: int,
+    vector_precision: str = "float32",
 ):
     workspace_id = str(uuid.uuid4())
     timestamp = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
@@ -217,7 +248,8 @@ def create_workspace_open_search(
         "cross_encoder_model_name": cross_encoder_model_name,
         "languages": languages,
         "metric": "l2",
-        "aoss_engine": "nmslib",
+        "aoss_engine": genai_core.opensearch.precision.get_engine(vector_precision),
+        "vector_precision": vector_precision,
         "hybrid_search": hybrid_search,
         "chunking_strategy": chunking_strategy,
         "chunk_size": chunk_size,
@@ -125,11 +125,17 @@ export interface SystemConfig {
       identifier: string;
       version: string;
     };
+    condenseQuestionModelId?: string;
   };
   llms: {
     rateLimitPerIP?: number;
     sagemaker: SupportedSageMakerModels[];
     huggingfaceApiSecretArn?: string;
+    chatHistory?: {
+      maxTokens?: number;
+      maxTokensByModel?: { [modelId: string]: number };
+      summarize?: boolean;
+    };
     sagemakerSchedule?: {
       enabled?: boolean;
       timezonePicker?: string;
@@ -149,6 +155,7 @@ export interface SystemConfig {
     engines: {
       aurora: {
         enabled: boolean;
+        languageDetection?: "comprehend" | "local";
       };
       opensearch: {
         enabled: boolean;
@@ -177,6 +184,7 @@ export interface SystemConfig {
     embeddingsModels: ModelConfig[];
     crossEncodingEnabled: boolean;
     crossEncoderModels: ModelConfig[];
+    rssCrawlBatchSize?: number;
   };
 }
 
@@ -2,6 +2,7 @@ import os
 import json
 import boto3
 import genai_core.utils.json
+import genai_core.aurora.index
 import genai_core.websites.crawler
 
 PROCESSING_BUCKET_NAME = os.environ["INPUT_BUCKET_NAME"]
@@ -25,7 +26,7 @@ def main():
     limit = data["limit"]
     content_types = data["content_types"]
 
-    return genai_core.websites.crawler.crawl_urls(
+    result = genai_core.websites.crawler.crawl_urls(
         workspace=workspace,
         document=document,
         priority_queue=priority_queue,
@@ -34,6 +35,9 @@ def main():
         limit=limit,
         content_types=content_types,
     )
+    genai_core.aurora.index.request_ivfflat_index_build(workspace)
+
+    return result
 
 
 if __name__ == "__main__":
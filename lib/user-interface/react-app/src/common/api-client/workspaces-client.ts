@@ -61,6 +61,8 @@ export class WorkspacesClient {
     languages: string[];
     metric: string;
     index: boolean;
+    indexType?: string;
+    vectorPrecision?: string;
     hybridSearch: boolean;
     chunkingStrategy: string;
     chunkSize: number;
@@ -82,6 +84,7 @@ export class WorkspacesClient {
     crossEncoderModelProvider?: string;
     crossEncoderModelName?: string;
     languages: string[];
+    vectorPrecision?: string;
     hybridSearch: boolean;
     chunkingStrategy: string;
     chunkSize: number;
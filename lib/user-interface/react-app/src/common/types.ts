@@ -74,6 +74,8 @@ export interface AuroraWorkspaceCreateInput {
   languages: readonly SelectProps.Option[];
   metric: string;
   index: boolean;
+  indexType: string;
+  vectorPrecision: string;
   hybridSearch: boolean;
   chunkSize: number;
   chunkOverlap: number;
@@ -84,6 +86,7 @@ export interface OpenSearchWorkspaceCreateInput {
   embeddingsModel: SelectProps.Option | null;
   languages: readonly SelectProps.Option[];
   crossEncoderModel: SelectProps.Option | null;
+  vectorPrecision: string;
   hybridSearch: boolean;
   chunkSize: number;
   chunkOverlap: number;
@@ -43,6 +43,7 @@ export enum ChatBotAction {
   Run = "run",
   FinalResponse = "final_response",
   LLMNewToken = "llm_new_token",
+  LLMSources = "llm_sources",
   Error = "error",
 }
 
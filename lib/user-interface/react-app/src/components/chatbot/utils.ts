@@ -121,6 +121,26 @@ export function updateMessageHistoryRef(
 ) {
   if (response.data?.sessionId !== sessionId) return;
 
+  if (response.action === ChatBotAction.LLMSources) {
+    // The sources are sent before the answer is generated
+    const metadata = response.data?.metadata;
+    if (messageHistory.at(-1)?.type === ChatBotMessageType.AI) {
+      const lastMessage = messageHistory[messageHistory.length - 1];
+      messageHistory[messageHistory.length - 1] = {
+        ...lastMessage,
+        metadata: { ...lastMessage.metadata, ...metadata },
+      };
+    } else {
+      messageHistory.push({
+        type: ChatBotMessageType.AI,
+        content: "",
+        metadata,
+        tokens: [],
+      });
+    }
+    return;
+  }
+
   if (
     response.action === ChatBotAction.LLMNewToken ||
     response.action === ChatBotAction.FinalResponse ||
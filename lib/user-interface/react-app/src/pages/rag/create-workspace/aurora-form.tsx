@@ -17,6 +17,7 @@ import { LanguageSelectorField } from "./language-selector-field";
 import { CrossEncoderSelectorField } from "./cross-encoder-selector-field";
 import { ChunkSelectorField } from "./chunks-selector";
 import { HybridSearchField } from "./hybrid-search-field";
+import { VectorPrecisionField } from "./vector-precision-field";
 import { useState } from "react";
 
 export interface AuroraFormProps {
@@ -120,6 +121,31 @@ function AuroraFooter(props: {
             Create an index
           </Toggle>
         </FormField>
+        {props.data.index && (
+          <FormField
+            label="Index Type"
+            description="HNSW has better recall and query latency but takes longer to build and uses more memory. IVFFlat is built once the workspace contains enough documents and is rebuilt as it grows."
+            errorText={props.errors.indexType}
+          >
+            <RadioGroup
+              items={[
+                { value: "ivfflat", label: "IVFFlat" },
+                { value: "hnsw", label: "HNSW" },
+              ].map((item) => ({ ...item, disabled: props.submitting }))}
+              value={props.data.indexType}
+              onChange={({ detail: { value } }) =>
+                props.onChange({ indexType: value })
+              }
+            />
+          </FormField>
+        )}
+        <VectorPrecisionField
+          submitting={props.submitting}
+          description="Half precision stores the embeddings as halfvec, halving the size of the table and of the index. Quantized keeps the full vectors and indexes their binary quantization, the nearest candidates are re-ranked with the full vectors. Lower precisions trade some recall for memory and latency."
+          value={props.data.vectorPrecision}
+          onChange={props.onChange}
+          errors={props.errors}
+        />
         <CrossEncoderSelectorField
           errors={props.errors}
           submitting={props.submitting}
@@ -34,6 +34,8 @@ const defaults: AuroraWorkspaceCreateInput = {
   languages: [{ value: "english", label: "English" }],
   metric: metrics[0].value,
   index: true,
+  indexType: "ivfflat",
+  vectorPrecision: "float32",
   hybridSearch: false,
   chunkSize: 1000,
   chunkOverlap: 200,
@@ -152,6 +154,8 @@ export default function CreateWorkspaceAurora() {
         languages: data.languages.map((x) => x.value ?? ""),
         metric: data.metric,
         index: data.index,
+        indexType: data.index ? data.indexType : undefined,
+        vectorPrecision: data.vectorPrecision,
         hybridSearch: data.hybridSearch && crossEncoderSelected,
         chunkingStrategy: "recursive",
         chunkSize: data.chunkSize,
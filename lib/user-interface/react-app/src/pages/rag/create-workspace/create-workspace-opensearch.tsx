@@ -17,6 +17,7 @@ const defaults: OpenSearchWorkspaceCreateInput = {
   embeddingsModel: null,
   crossEncoderModel: null,
   languages: [{ value: "english", label: "English" }],
+  vectorPrecision: "float32",
   hybridSearch: false,
   chunkSize: 1000,
   chunkOverlap: 200,
@@ -122,6 +123,7 @@ export default function CreateWorkspaceOpenSearch() {
         crossEncoderModelProvider: crossEncoderModel?.provider,
         crossEncoderModelName: crossEncoderModel?.name,
         languages: data.languages.map((x) => x.value ?? ""),
+        vectorPrecision: data.vectorPrecision,
         hybridSearch: data.hybridSearch && crossEncoderSelected,
         chunkingStrategy: "recursive",
         chunkSize: data.chunkSize,
@@ -11,6 +11,7 @@ import EmbeddingSelector from "./embeddings-selector-field";
 import { CrossEncoderSelectorField } from "./cross-encoder-selector-field";
 import { ChunkSelectorField } from "./chunks-selector";
 import { HybridSearchField } from "./hybrid-search-field";
+import { VectorPrecisionField } from "./vector-precision-field";
 import { LanguageSelectorField } from "./language-selector-field";
 import { useState } from "react";
 
@@ -87,6 +88,13 @@ function OpenSearchFooter(props: {
             props.onChange(data);
           }}
         />
+        <VectorPrecisionField
+          submitting={props.submitting}
+          description="Half precision encodes the vectors as fp16 in a Faiss index. Quantized uses the scalar quantizer of a Lucene index. Lower precisions trade some recall for memory and latency."
+          value={props.data.vectorPrecision}
+          onChange={props.onChange}
+          errors={props.errors}
+        />
         <HybridSearchField
           submitting={props.submitting}
           disabled={!props.crossEncodingEnabled || noEncodingSelected}
@@ -0,0 +1,31 @@
+import { FormField, RadioGroup } from "@cloudscape-design/components";
+
+interface VectorPrecisionProps {
+  submitting: boolean;
+  description: string;
+  onChange: (data: Partial<{ vectorPrecision: string }>) => void;
+  value: string;
+  errors: Record<string, string | string[]>;
+}
+
+export function VectorPrecisionField(props: VectorPrecisionProps) {
+  return (
+    <FormField
+      label="Vector Precision"
+      description={props.description}
+      errorText={props.errors.vectorPrecision}
+    >
+      <RadioGroup
+        items={[
+          { value: "float32", label: "Full (float32)" },
+          { value: "float16", label: "Half (float16)" },
+          { value: "quantized", label: "Quantized" },
+        ].map((item) => ({ ...item, disabled: props.submitting }))}
+        value={props.value}
+        onChange={({ detail: { value } }) =>
+          props.onChange({ vectorPrecision: value })
+        }
+      />
+    </FormField>
+  );
+}
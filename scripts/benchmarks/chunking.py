@@ -0,0 +1,196 @@
+"""Split throughput and embedding calls of the workspace chunking strategies.
+
+Splits synthetic documents (paragraphs of sentences with a Zipf distribution
+of the words and a few dense tables) with genai_core.chunking and reports
+for each strategy and document size:
+
+* the throughput in MB/s,
+* the chunks and the embedding calls needed to store them (batches of
+  genai_core.embeddings.generate_embeddings),
+* the tokens per chunk and the chunks truncated by generate_embeddings or
+  longer than the input limit of the embeddings model.
+
+For example:
+
+    pip install -r lib/shared/layers/common/requirements.txt
+    python scripts/benchmarks/chunking.py --sizes 1 4 16 --output chunking.json
+
+The tokens are counted with the tokenizer of the model (see
+genai_core.chunking.get_token_counter). Its encoding is downloaded on first
+use, set TIKTOKEN_CACHE_DIR when running offline, otherwise the tokens are
+estimated and the report says so.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+LAYER_PATH = os.path.join(ROOT, "lib", "shared", "layers", "python-sdk", "python")
+
+SYLLABLES = [
+    consonant + vowel
+    for consonant in "bdfgklmnprstvz"
+    for vowel in ["a", "e", "i", "o", "u", "ai", "ou"]
+]
+
+
+def generate_document(size: int, args) -> str:
+    """Text of about size bytes, the tables are 1 paragraph out of 20"""
+    rng = np.random.default_rng([args.seed, size])
+    words = set()
+    while len(words) < args.vocabulary:
+        words.add("".join(rng.choice(SYLLABLES, size=rng.integers(1, 5))))
+    words = np.array(sorted(words))
+    weights = 1 / np.arange(1, len(words) + 1)
+    probabilities = weights / weights.sum()
+
+    paragraphs = []
+    length = 0
+    while length < size:
+        if rng.random() < 0.05:
+            rows = [
+                " | ".join(str(value) for value in rng.integers(0, 100000, size=8))
+                for _ in range(rng.integers(5, 40))
+            ]
+            paragraph = "\n".join(rows)
+        else:
+            sentences = []
+            for _ in range(rng.integers(2, 8)):
+                sentence = " ".join(
+                    rng.choice(words, size=rng.integers(5, 30), p=probabilities)
+                )
+                sentences.append(sentence.capitalize() + ".")
+            paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+
+    return "\n\n".join(paragraphs)
+
+
+def run_strategy(chunking, workspace: dict, content: str, args) -> dict:
+    durations = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        chunks = chunking.split_text(workspace, content)
+        durations.append(time.perf_counter() - start)
+
+    count_tokens = chunking.get_token_counter(
+        workspace["embeddings_model_provider"], workspace["embeddings_model_name"]
+    )
+    tokens = np.array([count_tokens(chunk) for chunk in chunks])
+    chars = np.array([len(chunk) for chunk in chunks])
+    duration = min(durations)
+    size = len(content.encode("utf-8"))
+    return {
+        "strategy": workspace["chunking_strategy"],
+        "chunk_size": workspace["chunk_size"],
+        "chunk_overlap": workspace["chunk_overlap"],
+        "bytes": size,
+        "split_ms": round(duration * 1000, 1),
+        "mb_per_second": round(size / duration / 1e6, 2),
+        "chunks": len(chunks),
+        "embedding_calls": math.ceil(len(chunks) / args.batch_size),
+        "chars_mean": round(float(chars.mean()), 1),
+        "tokens_mean": round(float(tokens.mean()), 1),
+        "tokens_p99": int(np.percentile(tokens, 99)),
+        "tokens_max": int(tokens.max()),
+        "truncated": int((chars > args.max_input_chars).sum()),
+        "over_model_limit": int((tokens > args.model_max_tokens).sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=["recursive", "sentence", "token"],
+    )
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4], help="MB")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="characters")
+    parser.add_argument("--chunk-overlap", type=int, default=200, help="characters")
+    parser.add_argument("--token-chunk-size", type=int, default=250)
+    parser.add_argument("--token-chunk-overlap", type=int, default=50)
+    parser.add_argument("--embeddings-provider", default="bedrock")
+    parser.add_argument("--embeddings-model", default="amazon.titan-embed-text-v2:0")
+    parser.add_argument("--model-max-tokens", type=int, default=512)
+    parser.add_argument("--max-input-chars", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", help="name of the run, a commit or a release")
+    parser.add_argument("--output", help="JSON file of the results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("POWERTOOLS_SERVICE_NAME", "benchmark")
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    sys.path.insert(0, LAYER_PATH)
+    import genai_core.chunking as chunking
+
+    unknown = set(args.strategies) - set(chunking.CHUNKING_STRATEGIES)
+    if unknown:
+        parser.error(f"unknown strategies {sorted(unknown)}")
+
+    count_tokens = chunking.get_token_counter(
+        args.embeddings_provider, args.embeddings_model
+    )
+    tokenizer = "estimated" if count_tokens is chunking.estimate_tokens else "tiktoken"
+    results = []
+    for size in args.sizes:
+        content = generate_document(int(size * 1e6), args)
+        for strategy in args.strategies:
+            token = strategy == "token"
+            workspace = {
+                "chunking_strategy": strategy,
+                "chunk_size": args.token_chunk_size if token else args.chunk_size,
+                "chunk_overlap": (
+                    args.token_chunk_overlap if token else args.chunk_overlap
+                ),
+                "embeddings_model_provider": args.embeddings_provider,
+                "embeddings_model_name": args.embeddings_model,
+            }
+            result = run_strategy(chunking, workspace, content, args)
+            results.append(result)
+            print(_format_result(result))
+
+    report = {
+        "benchmark": "chunking",
+        "version": _get_version(),
+        "label": args.label,
+        "created_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "tokenizer": tokenizer,
+        "parameters": vars(args),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+def _format_result(result: dict) -> str:
+    return (
+        f"{result['strategy']:<10} {result['bytes'] / 1e6:.1f}MB "
+        f"split={result['split_ms']:.0f}ms ({result['mb_per_second']:.2f} MB/s) "
+        f"chunks={result['chunks']} calls={result['embedding_calls']} "
+        f"tokens mean={result['tokens_mean']:.0f} max={result['tokens_max']} "
+        f"over_limit={result['over_model_limit']} truncated={result['truncated']}"
+    )
+
+
+def _get_version():
+    with open(os.path.join(ROOT, "package.json")) as file:
+        return json.load(file)["version"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+"""Ingestion throughput, query latency and recall of the RAG retrieval path.
+
+Runs genai_core.chunks.add_chunks and genai_core.semantic_search end to end
+with local stand-ins: moto for S3, DynamoDB and the SSM configuration, a
+deterministic hashing embeddings model and a word overlap cross-encoder in
+place of the SageMaker models, a local PostgreSQL with pgvector and a local
+OpenSearch. For example:
+
+    docker run --rm -p 5432:5432 -e POSTGRES_HOST_AUTH_METHOD=trust \\
+        pgvector/pgvector:pg16
+    docker run --rm -p 9200:9200 -e discovery.type=single-node \\
+        -e DISABLE_SECURITY_PLUGIN=true opensearchproject/opensearch:2.11.1
+    pip install -r lib/shared/layers/common/requirements.txt "moto[all]>=5"
+    python scripts/benchmarks/rag_retrieval.py --chunks 1000 10000 100000 \\
+        --output rag_retrieval.json
+
+PostgreSQL has to trust local connections, the Aurora connection sends an
+IAM token as password. Each query is built from the rarest words of a
+chunk of the corpus, recall@k is the share of queries returning their
+chunk in the first k items. The results are written as JSON to compare
+releases, moto keeps the S3 objects in memory so the largest corpora need
+a few GB of RAM.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import uuid
+import zlib
+from datetime import datetime
+
+import boto3
+import numpy as np
+from moto import mock_aws
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+LAYER_PATH = os.path.join(ROOT, "lib", "shared", "layers", "python-sdk", "python")
+
+WORKSPACES_TABLE_NAME = "BenchmarkWorkspaces"
+DOCUMENTS_TABLE_NAME = "BenchmarkDocuments"
+PROCESSING_BUCKET_NAME = "benchmark-processing"
+CONFIG_PARAMETER_NAME = "/benchmark/config"
+EMBEDDINGS_MODEL = "benchmark/hashing-embeddings"
+CROSS_ENCODER_MODEL = "benchmark/overlap-cross-encoder"
+# Same as the vector search limit of genai_core.aurora.query
+MAX_K = 25
+
+SYLLABLES = [
+    consonant + vowel
+    for consonant in "bdfgklmnprstvz"
+    for vowel in ["a", "e", "i", "o", "u", "ai", "ou"]
+]
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class Corpus:
+    """Synthetic chunks with a Zipf distribution of the words. Each document
+    is generated from its own seed so any chunk can be rebuilt for the
+    queries without keeping the corpus in memory."""
+
+    def __init__(self, args):
+        self.seed = args.seed
+        self.chunk_words = args.chunk_words
+        self.chunks_per_document = args.chunks_per_document
+        rng = np.random.default_rng(args.seed)
+        words = set()
+        while len(words) < args.vocabulary:
+            length = rng.integers(2, 5)
+            words.add("".join(rng.choice(SYLLABLES, size=length)))
+        self.words = np.array(sorted(words))
+        rng.shuffle(self.words)
+        weights = 1 / np.arange(1, len(self.words) + 1)
+        self.probabilities = weights / weights.sum()
+        self.rank = {word: rank for rank, word in enumerate(self.words)}
+
+    def documents(self, chunks: int):
+        for document_idx in range(0, chunks, self.chunks_per_document):
+            count = min(self.chunks_per_document, chunks - document_idx)
+            yield document_idx, self.document_chunks(document_idx)[:count]
+
+    def document_chunks(self, document_idx: int):
+        rng = np.random.default_rng([self.seed, document_idx])
+        words = rng.choice(
+            self.words,
+            size=(self.chunks_per_document, self.chunk_words),
+            p=self.probabilities,
+        )
+        return [" ".join(chunk) for chunk in words]
+
+    def chunk(self, chunk_idx: int) -> str:
+        document_idx = chunk_idx - chunk_idx % self.chunks_per_document
+        return self.document_chunks(document_idx)[chunk_idx - document_idx]
+
+    def query(self, chunk: str, words: int) -> str:
+        distinct = sorted(set(chunk.split()), key=lambda word: -self.rank[word])
+        return " ".join(distinct[:words])
+
+
+def hashing_embeddings(dimensions: int):
+    """Deterministic embeddings: the hashed words of the text with a sign"""
+
+    def generate(model, input):
+        embeddings = np.zeros((len(input), dimensions), dtype=np.float32)
+        for idx, text in enumerate(input):
+            for token in TOKEN_PATTERN.findall(text.lower()):
+                digest = zlib.crc32(token.encode("utf-8"))
+                sign = 1 if (digest >> 31) & 1 else -1
+                embeddings[idx, digest % dimensions] += sign
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return (embeddings / norms).tolist()
+
+    return generate
+
+
+def overlap_cross_encoder(model, input, passages):
+    """Share of the query words found in each passage"""
+    query = set(TOKEN_PATTERN.findall(input.lower()))
+    return [
+        len(query & set(TOKEN_PATTERN.findall(passage.lower()))) / max(1, len(query))
+        for passage in passages
+    ]
+
+
+def setup_environment(args):
+    """Environment of the genai_core modules, read when they are imported"""
+    os.environ.update(
+        {
+            "AWS_DEFAULT_REGION": "us-east-1",
+            "AWS_REGION": "us-east-1",
+            "AWS_ACCESS_KEY_ID": "testing",
+            "AWS_SECRET_ACCESS_KEY": "testing",
+            "POWERTOOLS_SERVICE_NAME": "benchmark",
+            "LOG_LEVEL": "WARNING",
+            "WORKSPACES_TABLE_NAME": WORKSPACES_TABLE_NAME,
+            "DOCUMENTS_TABLE_NAME": DOCUMENTS_TABLE_NAME,
+            "PROCESSING_BUCKET_NAME": PROCESSING_BUCKET_NAME,
+            "CONFIG_PARAMETER_NAME": CONFIG_PARAMETER_NAME,
+            "SAGEMAKER_RAG_MODELS_ENDPOINT": "benchmark",
+            "QUERY_LANGUAGE_DETECTION": "local",
+            "AURORA_DB_HOST": args.pg_host,
+            "AURORA_DB_PORT": str(args.pg_port),
+            "AURORA_DB_USER": args.pg_user,
+            "OPEN_SEARCH_COLLECTION_ENDPOINT": args.opensearch_url,
+        }
+    )
+    sys.path.insert(0, LAYER_PATH)
+
+
+def create_resources(args):
+    dynamodb = boto3.client("dynamodb")
+    for table_name, sort_key in [
+        (WORKSPACES_TABLE_NAME, "object_type"),
+        (DOCUMENTS_TABLE_NAME, "document_id"),
+    ]:
+        dynamodb.create_table(
+            TableName=table_name,
+            KeySchema=[
+                {"AttributeName": "workspace_id", "KeyType": "HASH"},
+                {"AttributeName": sort_key, "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "workspace_id", "AttributeType": "S"},
+                {"AttributeName": sort_key, "AttributeType": "S"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+    boto3.client("s3").create_bucket(Bucket=PROCESSING_BUCKET_NAME)
+
+    config = {
+        "rag": {
+            "embeddingsModels": [
+                {
+                    "provider": "sagemaker",
+                    "name": EMBEDDINGS_MODEL,
+                    "dimensions": args.dimensions,
+                    "default": True,
+                }
+            ],
+            "crossEncoderModels": [
+                {"provider": "sagemaker", "name": CROSS_ENCODER_MODEL, "default": True}
+            ],
+        }
+    }
+    boto3.client("ssm").put_parameter(
+        Name=CONFIG_PARAMETER_NAME, Value=json.dumps(config), Type="String"
+    )
+
+
+def use_local_models(args):
+    import genai_core.cross_encoder
+    import genai_core.embeddings
+
+    genai_core.embeddings._generate_embeddings_sagemaker = hashing_embeddings(
+        args.dimensions
+    )
+    genai_core.cross_encoder._rank_passages_sagemaker = overlap_cross_encoder
+
+
+def use_local_opensearch(url: str):
+    """The collection client signs its requests for OpenSearch Serverless"""
+    import genai_core.opensearch.chunks
+    import genai_core.opensearch.create
+    import genai_core.opensearch.query
+    from opensearchpy import OpenSearch
+
+    client = OpenSearch(hosts=[url], timeout=300)
+    for module in [
+        genai_core.opensearch.chunks,
+        genai_core.opensearch.create,
+        genai_core.opensearch.query,
+    ]:
+        module.get_open_search_client = lambda: client
+
+    return client
+
+
+def create_workspace(engine: str, args) -> dict:
+    import genai_core.aurora.create
+    import genai_core.opensearch.create
+    import genai_core.opensearch.precision
+    import genai_core.workspaces
+    from genai_core.aurora.connection import AuroraConnection
+
+    workspace = {
+        "workspace_id": str(uuid.uuid4()),
+        "object_type": "workspace",
+        "format_version": 1,
+        "name": f"benchmark-{engine}",
+        "engine": engine,
+        "status": "ready",
+        "embeddings_model_provider": "sagemaker",
+        "embeddings_model_name": EMBEDDINGS_MODEL,
+        "embeddings_model_dimensions": args.dimensions,
+        "cross_encoder_model_provider": "sagemaker" if args.rerank else None,
+        "cross_encoder_model_name": CROSS_ENCODER_MODEL if args.rerank else None,
+        "languages": ["english"],
+        "vector_precision": args.precision,
+        "hybrid_search": args.hybrid_search,
+        "chunking_strategy": "recursive",
+        "chunk_size": 1000,
+        "chunk_overlap": 200,
+        "documents": 0,
+        "vectors": 0,
+        "size_in_bytes": 0,
+    }
+
+    if engine == "aurora":
+        workspace.update(
+            {
+                "metric": args.metric,
+                "has_index": True,
+                "index_type": args.index_type,
+                "keyword_search_columns": True,
+                "filter_indexes": True,
+            }
+        )
+        with AuroraConnection() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+        genai_core.workspaces.table.put_item(Item=workspace)
+        genai_core.aurora.create.create_workspace_table(workspace)
+    else:
+        workspace.update(
+            {
+                "metric": "l2",
+                "aoss_engine": genai_core.opensearch.precision.get_engine(
+                    args.precision
+                ),
+            }
+        )
+        genai_core.workspaces.table.put_item(Item=workspace)
+        genai_core.opensearch.create.create_workspace_index(workspace)
+
+    return workspace
+
+
+def delete_workspace(workspace: dict, opensearch):
+    from genai_core.aurora.connection import AuroraConnection
+    from psycopg2 import sql
+
+    table_name = workspace["workspace_id"].replace("-", "")
+    if workspace["engine"] == "aurora":
+        with AuroraConnection() as cursor:
+            cursor.execute(
+                sql.SQL("DROP TABLE IF EXISTS {};").format(sql.Identifier(table_name))
+            )
+    else:
+        opensearch.indices.delete(index=table_name, ignore_unavailable=True)
+
+
+def ingest(workspace: dict, corpus: Corpus, chunks: int) -> dict:
+    import genai_core.chunks
+    import genai_core.utils.telemetry as telemetry
+
+    start = time.perf_counter()
+    with telemetry.Telemetry(enabled=False) as metrics:
+        for document_idx, document_chunks in corpus.documents(chunks):
+            document = {
+                "document_id": str(uuid.uuid4()),
+                "document_type": "file",
+                "document_sub_type": None,
+                "path": f"benchmark/{document_idx}.txt",
+                "title": f"Document {document_idx}",
+            }
+            genai_core.chunks.add_chunks(
+                replace=False,
+                workspace=workspace,
+                document=document,
+                document_sub_id=None,
+                chunks=document_chunks,
+                chunk_complements=None,
+            )
+        stages = _get_stages(metrics, ["Embedding", "ChunkStore", "VectorStoreWrite"])
+    seconds = time.perf_counter() - start
+
+    return {
+        "rows": chunks,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(chunks / seconds, 1),
+        "stages_ms": stages,
+    }
+
+
+def run_queries(workspace: dict, corpus: Corpus, chunks: int, args) -> dict:
+    import genai_core.semantic_search
+    import genai_core.utils.telemetry as telemetry
+
+    rng = np.random.default_rng(args.seed + 1)
+    targets = rng.choice(chunks, size=args.warmup + args.queries, replace=True)
+    k_values = sorted(set(args.k))
+    stage_names = ["Embedding", "VectorQuery", "KeywordQuery", "Rerank"]
+
+    latencies = []
+    hits = {k: 0 for k in k_values}
+    stages = {name: 0 for name in stage_names}
+    for idx, target in enumerate(targets):
+        chunk = corpus.chunk(int(target))
+        query = corpus.query(chunk, args.query_words)
+
+        start = time.perf_counter()
+        with telemetry.Telemetry(enabled=False) as metrics:
+            response = genai_core.semantic_search.semantic_search(
+                workspace["workspace_id"],
+                query,
+                limit=max(k_values),
+                full_response=True,
+            )
+            query_stages = _get_stages(metrics, stage_names)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if idx < args.warmup:
+            continue
+
+        latencies.append(elapsed_ms)
+        for name, value in query_stages.items():
+            stages[name] += value
+        contents = [item["content"] for item in response["items"]]
+        for k in k_values:
+            if chunk in contents[:k]:
+                hits[k] += 1
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "queries": args.queries,
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(p95, 2),
+        "p99_ms": round(p99, 2),
+        "mean_stages_ms": {
+            name: round(value / args.queries, 2) for name, value in stages.items()
+        },
+        "recall": {f"@{k}": round(hits[k] / args.queries, 4) for k in k_values},
+    }
+
+
+def refresh(workspace: dict, opensearch):
+    # OpenSearch Serverless refreshes the index on its own
+    if workspace["engine"] == "opensearch":
+        opensearch.indices.refresh(index=workspace["workspace_id"].replace("-", ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--engine", choices=["aurora", "opensearch"], nargs="+", default=["aurora"]
+    )
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--chunks-per-document", type=int, default=100)
+    parser.add_argument("--chunk-words", type=int, default=120)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--query-words", type=int, default=8)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--metric", choices=["cosine", "l2", "inner"], default="cosine")
+    parser.add_argument("--index-type", choices=["ivfflat", "hnsw"], default="hnsw")
+    parser.add_argument(
+        "--precision", choices=["float32", "float16", "quantized"], default="float32"
+    )
+    parser.add_argument("--hybrid-search", action="store_true")
+    parser.add_argument("--rerank", action="store_true")
+    parser.add_argument("--pg-host", default="localhost")
+    parser.add_argument("--pg-port", type=int, default=5432)
+    parser.add_argument("--pg-user", default="postgres")
+    parser.add_argument("--opensearch-url", default="http://localhost:9200")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="keep the workspaces")
+    parser.add_argument("--label", help="name of the run, a commit or a release")
+    parser.add_argument("--output", help="JSON file of the results")
+    args = parser.parse_args()
+    if max(args.k) > MAX_K:
+        parser.error(f"--k is limited to {MAX_K}")
+
+    setup_environment(args)
+    with mock_aws():
+        create_resources(args)
+        use_local_models(args)
+        opensearch = None
+        if "opensearch" in args.engine:
+            opensearch = use_local_opensearch(args.opensearch_url)
+
+        corpus = Corpus(args)
+        results = []
+        for engine in args.engine:
+            for chunks in args.chunks:
+                workspace = create_workspace(engine, args)
+                try:
+                    ingestion = ingest(workspace, corpus, chunks)
+                    refresh(workspace, opensearch)
+                    queries = run_queries(workspace, corpus, chunks, args)
+                finally:
+                    if not args.keep:
+                        delete_workspace(workspace, opensearch)
+
+                result = {"engine": engine, "chunks": chunks, "ingestion": ingestion}
+                result.update(queries)
+                results.append(result)
+                print(_format_result(result))
+
+    report = {
+        "benchmark": "rag_retrieval",
+        "version": _get_version(),
+        "label": args.label,
+        "created_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "parameters": vars(args),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+def _get_stages(metrics, names) -> dict:
+    return {name: round(metrics.get(name) or 0, 2) for name in names}
+
+
+def _format_result(result: dict) -> str:
+    recall = " ".join(f"recall{k}={value:.3f}" for k, value in result["recall"].items())
+    return (
+        f"{result['engine']:<10} chunks={result['chunks']:<8} "
+        f"ingest={result['ingestion']['rows_per_second']:.0f} rows/s "
+        f"p50={result['p50_ms']:.1f}ms p95={result['p95_ms']:.1f}ms "
+        f"p99={result['p99_ms']:.1f}ms {recall}"
+    )
+
+
+def _get_version():
+    with open(os.path.join(ROOT, "package.json")) as file:
+        return json.load(file)["version"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,511 @@
+"""Load test of the langchain request handler with a fake Bedrock model.
+
+Sends bursts of synthetic SQS batches (SNS notifications of chat requests)
+to the handler of lib/model-interfaces/langchain/functions/request-handler.
+The Bedrock client streams a fake answer at a configurable rate, SNS and
+the sessions table are in memory stand-ins with a configurable latency.
+No AWS account is needed:
+
+    python scripts/benchmarks/request_handler_load.py --messages 200 \\
+        --workers 4 --tokens-per-second 80 --output request_handler.json
+
+Each worker process stands for a Lambda instance and receives the batches
+of its own sessions, in the order they were sent. The report has the
+latency from the message sent to the final response, the processing time
+of the handler without the model (overhead), the SNS publishes per message
+and the history writes: DynamoDB calls per message and the bytes written
+compared to the growth of the session item (write amplification).
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from datetime import datetime
+from multiprocessing import Pool
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+HANDLER_PATH = os.path.join(
+    ROOT, "lib", "model-interfaces", "langchain", "functions", "request-handler"
+)
+LAYER_PATH = os.path.join(ROOT, "lib", "shared", "layers", "python-sdk", "python")
+
+MESSAGES_TOPIC_ARN = "arn:aws:sns:us-east-1:123456789012:benchmark-messages"
+SESSIONS_TABLE_NAME = "BenchmarkSessions"
+# SQS event source default
+SQS_BATCH_SIZE = 10
+WORDS = (
+    "the city offers services for residents and visitors about permits parking "
+    "schools parks housing transportation events libraries health safety"
+).split()
+
+
+class FakeBedrockClient:
+    """Converse API of bedrock-runtime, streams the tokens at a fixed rate"""
+
+    def __init__(self, args, stats):
+        self.first_token_ms = args.first_token_ms
+        self.token_interval = 1 / args.tokens_per_second
+        self.output_tokens = args.output_tokens
+        self.stats = stats
+
+    def _tokens(self):
+        return [f"{WORDS[i % len(WORDS)]} " for i in range(self.output_tokens)]
+
+    def _usage(self, messages):
+        input_tokens = len(json.dumps(messages)) // 4
+        return {
+            "inputTokens": input_tokens,
+            "outputTokens": self.output_tokens,
+            "totalTokens": input_tokens + self.output_tokens,
+        }
+
+    def converse_stream(self, messages, **kwargs):
+        return {"stream": self._stream(messages)}
+
+    def _stream(self, messages):
+        start = time.perf_counter()
+        yield {"messageStart": {"role": "assistant"}}
+        time.sleep(self.first_token_ms / 1000)
+        for token in self._tokens():
+            yield {
+                "contentBlockDelta": {"delta": {"text": token}, "contentBlockIndex": 0}
+            }
+            time.sleep(self.token_interval)
+        yield {"contentBlockStop": {"contentBlockIndex": 0}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+        self.stats["model_ms"] += (time.perf_counter() - start) * 1000
+        yield {"metadata": {"usage": self._usage(messages), "metrics": {}}}
+
+    def converse(self, messages, **kwargs):
+        start = time.perf_counter()
+        time.sleep(
+            (self.first_token_ms + self.output_tokens * self.token_interval * 1000)
+            / 1000
+        )
+        self.stats["model_ms"] += (time.perf_counter() - start) * 1000
+        return {
+            "output": {
+                "message": {
+                    "role": "assistant",
+                    "content": [{"text": "".join(self._tokens())}],
+                }
+            },
+            "stopReason": "end_turn",
+            "usage": self._usage(messages),
+            "metrics": {"latencyMs": 0},
+        }
+
+
+class FakeSns:
+    def __init__(self, args, stats):
+        self.latency = args.publish_latency_ms / 1000
+        self.stats = stats
+
+    def publish(self, TopicArn, Message):
+        time.sleep(self.latency)
+        detail = json.loads(Message)
+        action = detail.get("action")
+        self.stats["publishes"][action] = self.stats["publishes"].get(action, 0) + 1
+        self.stats["publish_bytes"] += len(Message)
+        if action == "final_response":
+            session_id = detail["data"]["sessionId"]
+            self.stats["final_responses"].setdefault(session_id, []).append(time.time())
+        return {"MessageId": str(uuid.uuid4())}
+
+
+class FakeTable:
+    """Sessions table in memory, counts the calls and the bytes written"""
+
+    def __init__(self, args, stats):
+        self.latency = args.dynamodb_latency_ms / 1000
+        self.items = {}
+        self.stats = stats
+
+    def _call(self, operation):
+        time.sleep(self.latency)
+        self.stats["dynamodb"][operation] = self.stats["dynamodb"].get(operation, 0) + 1
+
+    def get_item(self, Key, **kwargs):
+        self._call("get_item")
+        item = self.items.get(_key(Key))
+        return {"Item": json.loads(item)} if item else {}
+
+    def put_item(self, Item, **kwargs):
+        self._call("put_item")
+        item = json.dumps(Item, default=str)
+        self.items[_key(Item)] = item
+        self.stats["history_bytes_written"] += len(item)
+        return {}
+
+    def update_item(
+        self, Key, UpdateExpression, ExpressionAttributeValues=None, **kwargs
+    ):
+        self._call("update_item")
+        item = json.loads(self.items.get(_key(Key), json.dumps(Key)))
+        values = ExpressionAttributeValues or {}
+        # Only the SET actions used by the chat history
+        for name, value in re.findall(r"(\w+)\s*=\s*(:\w+)", UpdateExpression):
+            item[name] = values[value]
+        for name, value in re.findall(
+            r"(\w+)\s*=\s*if_not_exists\(\w+,\s*(:\w+)\)", UpdateExpression
+        ):
+            item.setdefault(name, values[value])
+        for name, empty, value in re.findall(
+            r"(\w+)\s*=\s*list_append\(if_not_exists\(\w+,\s*(:\w+)\),\s*(:\w+)\)",
+            UpdateExpression,
+        ):
+            item[name] = item.get(name, values[empty]) + values[value]
+        updated = json.dumps(item, default=str)
+        self.items[_key(Key)] = updated
+        # Updates are billed on the size of the whole item
+        self.stats["history_bytes_written"] += len(updated)
+        return {}
+
+    def item_size(self, session_id: str, user_id: str) -> int:
+        return len(self.items.get((session_id, user_id), ""))
+
+
+class FakeDynamoDB:
+    def __init__(self, table):
+        self.table = table
+
+    def Table(self, name):
+        return self.table
+
+
+def _key(item: dict):
+    return (item["SessionId"], item["UserId"])
+
+
+def setup_environment():
+    os.environ.update(
+        {
+            "AWS_REGION": "us-east-1",
+            "AWS_DEFAULT_REGION": "us-east-1",
+            "AWS_ACCESS_KEY_ID": "testing",
+            "AWS_SECRET_ACCESS_KEY": "testing",
+            "API_KEYS_SECRETS_ARN": "benchmark",
+            "MESSAGES_TOPIC_ARN": MESSAGES_TOPIC_ARN,
+            "SESSIONS_TABLE_NAME": SESSIONS_TABLE_NAME,
+            "POWERTOOLS_SERVICE_NAME": "benchmark",
+            "POWERTOOLS_TRACE_DISABLED": "true",
+            "POWERTOOLS_DEV": "false",
+            "LOG_LEVEL": "ERROR",
+        }
+    )
+    sys.path[:0] = [HANDLER_PATH, LAYER_PATH]
+
+
+def build_detail(args, user_id: str, session_id: str, turn: int) -> dict:
+    return {
+        "action": "run",
+        "modelInterface": "langchain",
+        "direction": "IN",
+        "userId": user_id,
+        "userGroups": ["admin"] if args.admin else ["user"],
+        "systemPrompts": {},
+        "data": {
+            "provider": "bedrock",
+            "modelName": args.model,
+            "mode": "chain",
+            "text": f"Question {turn}: how do I apply for a resident parking permit?",
+            "sessionId": session_id,
+            "modelKwargs": {
+                "streaming": args.streaming,
+                "maxTokens": 512,
+                "temperature": 0.6,
+                "topP": 0.9,
+            },
+        },
+    }
+
+
+def build_record(detail: dict, sent_timestamp: int) -> dict:
+    """SQS record of the SNS notification sent to the queue"""
+    body = {
+        "Type": "Notification",
+        "MessageId": str(uuid.uuid4()),
+        "TopicArn": MESSAGES_TOPIC_ARN,
+        "Message": json.dumps(detail),
+        "Timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+    }
+    return {
+        "messageId": str(uuid.uuid4()),
+        "receiptHandle": "benchmark",
+        "body": json.dumps(body),
+        "attributes": {
+            "ApproximateReceiveCount": "1",
+            "SentTimestamp": str(sent_timestamp),
+            "SenderId": "benchmark",
+            "ApproximateFirstReceiveTimestamp": str(sent_timestamp),
+        },
+        "messageAttributes": {},
+        "md5OfBody": "",
+        "eventSource": "aws:sqs",
+        "eventSourceARN": "arn:aws:sqs:us-east-1:123456789012:benchmark",
+        "awsRegion": "us-east-1",
+    }
+
+
+def build_messages(args):
+    """Messages of the burst by worker: (session_id, user_id, turn)"""
+    sessions = [
+        (str(uuid.uuid4()), f"user-{idx}")
+        for idx in range(min(args.sessions, args.messages))
+    ]
+    messages = [[] for _ in range(args.workers)]
+    for idx in range(args.messages):
+        session_idx = idx % len(sessions)
+        session_id, user_id = sessions[session_idx]
+        turn = idx // len(sessions)
+        messages[session_idx % args.workers].append((session_id, user_id, turn))
+
+    return messages
+
+
+def run_worker(params):
+    """Processes the batches of a worker, one Lambda instance"""
+    args, messages, sent_at = params
+
+    import genai_core.clients
+    import genai_core.langchain.chat_message_history
+    import genai_core.utils.websocket
+    import index
+
+    stats = {
+        "model_ms": 0.0,
+        "publishes": {},
+        "publish_bytes": 0,
+        "final_responses": {},
+        "dynamodb": {},
+        "history_bytes_written": 0,
+    }
+    table = FakeTable(args, stats)
+    bedrock = FakeBedrockClient(args, stats)
+    context = SimpleNamespace(
+        function_name="benchmark",
+        memory_limit_in_mb=1024,
+        invoked_function_arn="arn:aws:lambda:us-east-1:123456789012:function:benchmark",
+        aws_request_id="benchmark",
+    )
+
+    history_growth = 0
+    results = []
+    patches = [
+        mock.patch.object(genai_core.utils.websocket, "sns", FakeSns(args, stats)),
+        mock.patch.object(
+            genai_core.langchain.chat_message_history, "client", FakeDynamoDB(table)
+        ),
+        mock.patch.object(
+            genai_core.clients, "get_bedrock_client", lambda *args: bedrock
+        ),
+        mock.patch.object(index.parameters, "get_secret", lambda *args, **kw: {}),
+    ]
+    for patch in patches:
+        patch.start()
+
+    try:
+        for idx in range(0, len(messages), args.batch_size):
+            batch = messages[idx : idx + args.batch_size]
+            _prefill_history(table, batch, args.history_turns)
+            sizes = {key[:2]: table.item_size(*key[:2]) for key in batch}
+            records = [
+                build_record(build_detail(args, user_id, session_id, turn), sent_at)
+                for session_id, user_id, turn in batch
+            ]
+
+            model_ms = stats["model_ms"]
+            dynamodb_calls = sum(stats["dynamodb"].values())
+            start = time.perf_counter()
+            response = index.handler({"Records": records}, context)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            failures = len(response.get("batchItemFailures", []))
+
+            for key, size in sizes.items():
+                history_growth += table.item_size(*key) - size
+            latencies = []
+            for session_id, _, _ in batch:
+                responses = stats["final_responses"].get(session_id)
+                if responses:
+                    latencies.append(responses.pop(0) * 1000 - sent_at)
+            results.append(
+                {
+                    "messages": len(batch),
+                    "failures": failures,
+                    "handler_ms": elapsed_ms,
+                    "model_ms": stats["model_ms"] - model_ms,
+                    "dynamodb_calls": sum(stats["dynamodb"].values()) - dynamodb_calls,
+                    "latencies_ms": latencies,
+                }
+            )
+    finally:
+        for patch in patches:
+            patch.stop()
+
+    stats.pop("final_responses")
+    stats["history_growth_bytes"] = history_growth
+    return {"batches": results, "stats": stats}
+
+
+def _prefill_history(table, batch, turns: int):
+    """Earlier turns of the sessions, the history is rewritten on each write"""
+    for session_id, user_id, _ in batch:
+        if turns == 0 or table.item_size(session_id, user_id):
+            continue
+
+        history = []
+        for turn in range(turns):
+            for message_type, text in [
+                ("human", f"Earlier question {turn} about the city services"),
+                ("ai", " ".join(WORDS * 10)),
+            ]:
+                history.append(
+                    {
+                        "type": message_type,
+                        "data": {
+                            "content": text,
+                            "additional_kwargs": {},
+                            "response_metadata": {},
+                            "type": message_type,
+                            "name": None,
+                            "id": None,
+                            "example": False,
+                        },
+                    }
+                )
+        table.items[(session_id, user_id)] = json.dumps(
+            {
+                "SessionId": session_id,
+                "UserId": user_id,
+                "StartTime": datetime.now().isoformat(),
+                "History": history,
+            }
+        )
+
+
+def summarize(args, workers: list, wall_seconds: float) -> dict:
+    batches = [batch for worker in workers for batch in worker["batches"]]
+    messages = sum(batch["messages"] for batch in batches)
+    handler_ms = sum(batch["handler_ms"] for batch in batches)
+    model_ms = sum(batch["model_ms"] for batch in batches)
+    latencies = [latency for batch in batches for latency in batch["latencies_ms"]]
+
+    publishes = {}
+    dynamodb = {}
+    publish_bytes = history_bytes = history_growth = 0
+    for worker in workers:
+        stats = worker["stats"]
+        for action, count in stats["publishes"].items():
+            publishes[action] = publishes.get(action, 0) + count
+        for operation, count in stats["dynamodb"].items():
+            dynamodb[operation] = dynamodb.get(operation, 0) + count
+        publish_bytes += stats["publish_bytes"]
+        history_bytes += stats["history_bytes_written"]
+        history_growth += stats["history_growth_bytes"]
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    batch_p50, batch_p95 = np.percentile([b["handler_ms"] for b in batches], [50, 95])
+    return {
+        "messages": messages,
+        "failures": sum(batch["failures"] for batch in batches),
+        "wall_seconds": round(wall_seconds, 3),
+        "messages_per_second": round(messages / wall_seconds, 2),
+        "latency_ms": {
+            "p50": round(p50, 1),
+            "p95": round(p95, 1),
+            "p99": round(p99, 1),
+            "max": round(max(latencies), 1),
+        },
+        "batch_ms": {"p50": round(batch_p50, 1), "p95": round(batch_p95, 1)},
+        "overhead_ms_per_message": round((handler_ms - model_ms) / messages, 2),
+        "model_ms_per_message": round(model_ms / messages, 2),
+        "publishes_per_message": round(sum(publishes.values()) / messages, 2),
+        "publishes": publishes,
+        "publish_bytes_per_message": round(publish_bytes / messages),
+        "dynamodb_calls_per_message": round(sum(dynamodb.values()) / messages, 2),
+        "dynamodb_calls": dynamodb,
+        "history_bytes_written_per_message": round(history_bytes / messages),
+        "history_write_amplification": (
+            round(history_bytes / history_growth, 2) if history_growth else None
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--history-turns", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--batch-size", type=int, default=SQS_BATCH_SIZE, choices=range(1, 11)
+    )
+    parser.add_argument("--model", default="anthropic.claude-3-haiku-20240307-v1:0")
+    parser.add_argument("--no-streaming", dest="streaming", action="store_false")
+    parser.add_argument("--admin", action="store_true", help="admin users")
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-second", type=float, default=100)
+    parser.add_argument("--output-tokens", type=int, default=100)
+    parser.add_argument("--publish-latency-ms", type=float, default=10)
+    parser.add_argument("--dynamodb-latency-ms", type=float, default=5)
+    parser.add_argument("--label", help="name of the run, a commit or a release")
+    parser.add_argument("--output", help="JSON file of the results")
+    args = parser.parse_args()
+
+    # Imported once, the workers are forked without a cold start
+    setup_environment()
+    import index  # noqa: F401
+
+    sent_at = int(time.time() * 1000)
+    messages = build_messages(args)
+    start = time.perf_counter()
+    with Pool(processes=args.workers) as pool:
+        workers = pool.map(
+            run_worker,
+            [
+                (args, worker_messages, sent_at)
+                for worker_messages in messages
+                if worker_messages
+            ],
+        )
+    wall_seconds = time.perf_counter() - start
+
+    summary = summarize(args, workers, wall_seconds)
+    print(
+        f"messages={summary['messages']} failures={summary['failures']} "
+        f"latency p50={summary['latency_ms']['p50']}ms "
+        f"p95={summary['latency_ms']['p95']}ms p99={summary['latency_ms']['p99']}ms "
+        f"overhead={summary['overhead_ms_per_message']}ms/message "
+        f"publishes={summary['publishes_per_message']}/message "
+        f"dynamodb={summary['dynamodb_calls_per_message']}/message "
+        f"amplification={summary['history_write_amplification']}"
+    )
+
+    report = {
+        "benchmark": "request_handler_load",
+        "version": _get_version(),
+        "label": args.label,
+        "created_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "parameters": vars(args),
+        "results": summary,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+def _get_version():
+    with open(os.path.join(ROOT, "package.json")) as file:
+        return json.load(file)["version"]
+
+
+if __name__ == "__main__":
+    main()
@@ -78,6 +78,21 @@ def test_list_applications(mocker):
     assert response[0].get("updateTime") == application.get("UpdateTime")
 
 
+def test_list_applications_by_roles(mocker):
+    mock = mocker.patch(
+        "genai_core.applications.list_applications_by_roles",
+        return_value=[application],
+    )
+    mocker.patch("genai_core.auth.get_user_roles", return_value=["role1", "role2"])
+
+    response = list_applications()
+
+    mock.assert_called_once_with(["role1", "role2"])
+    assert len(response) == 1
+    assert response[0].get("id") == application.get("Id")
+    assert response[0].get("model") is None
+
+
 def test_get_application(mocker):
     mocker.patch("genai_core.applications.get_application", return_value=application)
     mocker.patch("genai_core.auth.get_user_roles", return_value=["user", "admin"])
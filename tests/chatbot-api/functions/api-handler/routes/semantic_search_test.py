@@ -42,6 +42,7 @@ def test_semantic_search(mocker):
         limit=25,
         query=input.get("query"),
         full_response=True,
+        filters=None,
     )
 
     assert response.get("engine") == search_response.get("engine")
@@ -57,6 +58,26 @@ def test_semantic_search(mocker):
     assert len(response.get("keywordSearchItems")) == 1
 
 
+def test_semantic_search_filters(mocker):
+    mock = mocker.patch(
+        "genai_core.semantic_search.semantic_search",
+        return_value={"engine": "aurora", "items": []},
+    )
+    mocker.patch("genai_core.auth.get_user_roles", return_value=["user", "admin"])
+    input = {
+        "query": "query",
+        "workspaceId": "id",
+        "filters": {"documentTypes": ["file"], "metadata": '{"key": "value"}'},
+    }
+    semantic_search(input)
+    assert mock.call_args.kwargs["filters"] == {
+        "document_ids": None,
+        "document_types": ["file"],
+        "path_prefix": None,
+        "metadata": {"key": "value"},
+    }
+
+
 def test_semantic_search_invalid_input(mocker):
     mocker.patch("genai_core.auth.get_user_roles", return_value=["user", "admin"])
     with pytest.raises(ValidationError, match="2 validation error"):
@@ -3,6 +3,7 @@ import pytest
 from genai_core.types import CommonError
 from routes.sessions import get_file
 from routes.sessions import get_sessions
+from routes.sessions import get_sessions_page
 from routes.sessions import get_session
 from routes.sessions import delete_user_sessions
 from routes.sessions import delete_session
@@ -25,9 +26,19 @@ def test_get_file_url(mocker):
     assert get_file("file") == "url"
 
 
+session_summary = {
+    "SessionId": "SessionId",
+    "UserId": "userId",
+    "StartTime": "123",
+    "Title": "content",
+}
+
+
 def test_get_sessions(mocker):
     mocker.patch("genai_core.auth.get_user_id", return_value="userId")
-    mocker.patch("genai_core.sessions.list_sessions_by_user_id", return_value=[session])
+    mocker.patch(
+        "genai_core.sessions.list_sessions_by_user_id", return_value=[session_summary]
+    )
     expected = [
         {
             "id": session.get("SessionId"),
@@ -38,6 +49,35 @@ def test_get_sessions(mocker):
     assert get_sessions() == expected
 
 
+def test_get_sessions_page(mocker):
+    mocker.patch("genai_core.auth.get_user_id", return_value="userId")
+    mock = mocker.patch(
+        "genai_core.sessions.list_sessions_page",
+        return_value={"items": [session_summary], "next_token": "token"},
+    )
+    expected = {
+        "items": [
+            {
+                "id": session.get("SessionId"),
+                "title": "content",
+                "startTime": session.get("StartTime") + "Z",
+            }
+        ],
+        "nextToken": "token",
+    }
+    assert get_sessions_page(limit=10, nextToken="previous") == expected
+    mock.assert_called_once_with("userId", limit=10, next_token="previous")
+
+    get_sessions_page()
+    mock.assert_called_with("userId", limit=50, next_token=None)
+
+
+def test_get_sessions_page_invalid_input(mocker):
+    mocker.patch("genai_core.auth.get_user_id", return_value="userId")
+    with pytest.raises(ValidationError):
+        get_sessions_page(limit=1000)
+
+
 def test_get_sessions_user_not_found(mocker):
     mocker.patch("genai_core.auth.get_user_id", return_value=None)
     with pytest.raises(CommonError):
@@ -9,6 +9,8 @@ sys.path.append(here + "/../lib/shared/layers/python-sdk/python")
 os.environ["AWS_REGION"] = "us-east-1"
 os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
 os.environ["DOCUMENTS_TABLE_NAME"] = "DocumentTableName"
+os.environ["WORKSPACES_TABLE_NAME"] = "WorkspacesTableName"
 os.environ["SESSIONS_TABLE_NAME"] = "SessionsTableName"
 os.environ["SESSIONS_BY_USER_ID_INDEX_NAME"] = "index"
+os.environ["SESSIONS_BY_USER_ID_SUMMARY_INDEX_NAME"] = "summaryIndex"
 os.environ["PROCESSING_BUCKET_NAME"] = "Bucket"
@@ -1,11 +1,17 @@
 import pytest
 from unittest.mock import MagicMock, patch, call
 from adapters.base import ModelAdapter
+from adapters.base.query_rewriter import is_standalone_question
 from genai_core.types import ChatbotMode
 from langchain_aws import ChatBedrockConverse
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableLambda
 
 
 class MockModelAdapter(ModelAdapter):
+    model_id = "model"
+
     def get_llm(self, model_kwargs={}):
         return ChatBedrockConverse()
 
@@ -122,3 +128,87 @@ def test_run_with_output_guardrails_blocking(model_adapter):
     model_adapter.chat_history.replace_last_message.assert_called_once_with(
         "Blocked by guardrails"
     )
+
+
+def test_history_aware_retriever_skips_condense_without_history(model_adapter):
+    retriever = MagicMock()
+    retriever.invoke.return_value = ["document"]
+    condense_prompt = ChatPromptTemplate.from_messages([("human", "{input}")])
+    llm = MagicMock()
+    model_adapter.get_llm = MagicMock(return_value=RunnableLambda(llm))
+    timings = {}
+
+    runnable = model_adapter.get_history_aware_retriever(
+        retriever, condense_prompt, timings
+    )
+    attachment = HumanMessage(content=[{"type": "image", "image": {}}])
+    result = runnable.invoke({"input": "question", "chat_history": [attachment]})
+
+    assert result == ["document"]
+    llm.assert_not_called()
+    retriever.invoke.assert_called_once_with(
+        "question", config={"callbacks": [model_adapter.callback_handler]}
+    )
+    assert timings["condense"] == 0
+    assert "retrieve" in timings
+
+
+def test_history_aware_retriever_condenses_with_history(model_adapter):
+    retriever = MagicMock()
+    retriever.invoke.return_value = []
+    condense_prompt = ChatPromptTemplate.from_messages(
+        [MessagesPlaceholder("chat_history"), ("human", "{input}")]
+    )
+    model_adapter.get_llm = MagicMock(
+        return_value=RunnableLambda(lambda _: "standalone question")
+    )
+    timings = {}
+
+    runnable = model_adapter.get_history_aware_retriever(
+        retriever, condense_prompt, timings
+    )
+    runnable.invoke(
+        {
+            "input": "and tomorrow?",
+            "chat_history": [
+                HumanMessage(content="weather today?"),
+                AIMessage(content="sunny"),
+            ],
+        }
+    )
+
+    retriever.invoke.assert_called_once_with(
+        "standalone question",
+        config={"callbacks": [model_adapter.callback_handler]},
+    )
+    assert "condense" in timings
+
+
+def test_history_aware_retriever_skips_condense_for_standalone(model_adapter):
+    retriever = MagicMock()
+    retriever.invoke.return_value = []
+    condense_prompt = ChatPromptTemplate.from_messages([("human", "{input}")])
+    llm = MagicMock()
+    model_adapter.get_llm = MagicMock(return_value=RunnableLambda(llm))
+
+    runnable = model_adapter.get_history_aware_retriever(retriever, condense_prompt, {})
+    runnable.invoke(
+        {
+            "input": "What are the opening hours of Boston City Hall?",
+            "chat_history": [HumanMessage(content="hello"), AIMessage(content="hi")],
+        }
+    )
+
+    llm.assert_not_called()
+    retriever.invoke.assert_called_once_with(
+        "What are the opening hours of Boston City Hall?",
+        config={"callbacks": [model_adapter.callback_handler]},
+    )
+
+
+def test_is_standalone_question():
+    assert is_standalone_question("What are the opening hours of the library?")
+    assert not is_standalone_question("When does it open?")
+    assert not is_standalone_question("And what about the weekend hours?")
+    assert not is_standalone_question("Why?")
+    assert not is_standalone_question("Can you tell me more about those permits?")
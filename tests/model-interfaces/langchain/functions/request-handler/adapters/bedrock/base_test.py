@@ -118,3 +118,29 @@ def test_chat_without_system_adapter(mocker):
         model="model",
         callbacks=ANY,
     )
+
+
+def test_get_file_from_s3_uses_prefetched_bytes(mocker):
+    mocker.patch("aws_lambda_powertools.Logger.info", return_value=None)
+    mocker.patch("genai_core.clients.get_bedrock_client", return_value=None)
+    mocker.patch.dict(os.environ, {"CHATBOT_FILES_BUCKET_NAME": "bucket"})
+    prefetch = mocker.patch(
+        "genai_core.utils.file_cache.prefetch_files",
+        return_value={"private/user/large.png": b"bytes"},
+    )
+    get_file_bytes = mocker.patch("genai_core.utils.file_cache.get_file_bytes")
+    adapter = registry.get_adapter("bedrock.anthropic.claude-test")
+    model = adapter(
+        model_id="model",
+        mode="mode",
+        session_id="session",
+        user_id="user",
+        model_kwargs={},
+    )
+
+    model.prefetch_files([{"key": "large.png"}])
+    file = model.get_file_from_s3({"key": "large.png"})
+
+    prefetch.assert_called_once_with("bucket", ["private/user/large.png"])
+    get_file_bytes.assert_not_called()
+    assert file["source"]["bytes"] == b"bytes"
@@ -0,0 +1,72 @@
+import pytest
+from genai_core.registry.index import AdapterRegistry
+
+
+def test_get_adapter_precedence():
+    registry = AdapterRegistry()
+    registry.register(r"^bedrock.*", "regex")
+    registry.register_prefix("bedrock.amazon.nova", "nova")
+    registry.register_prefix("bedrock.amazon.nova-reel", "reel")
+    registry.register_exact("bedrock.amazon.nova-reel-v1", "exact")
+
+    assert registry.get_adapter("bedrock.amazon.nova-reel-v1") == "exact"
+    assert registry.get_adapter("bedrock.amazon.nova-reel-v2") == "reel"
+    assert registry.get_adapter("bedrock.amazon.nova-pro") == "nova"
+    assert registry.get_adapter("bedrock.amazon.nov") == "regex"
+
+
+def test_get_adapter_memoized():
+    registry = AdapterRegistry()
+    registry.register_prefix("openai", "gpt")
+
+    assert registry.get_adapter("openai.gpt-4") == "gpt"
+    assert registry.resolved == {"openai.gpt-4": "gpt"}
+
+    # A registration invalidates the resolved adapters
+    registry.register_exact("openai.gpt-4", "gpt4")
+    assert registry.get_adapter("openai.gpt-4") == "gpt4"
+
+
+def test_get_adapter_regex_ambiguous(mocker):
+    registry = AdapterRegistry()
+    registry.register(r"^sagemaker.*", "first")
+    registry.register(r"^sagemaker.*idefics", "second")
+    warning = mocker.patch("genai_core.registry.index.logger.warning")
+
+    assert registry.get_adapter("sagemaker.idefics") == "first"
+    warning.assert_called_once()
+
+
+def test_get_adapter_ambiguous_with_prefix(mocker):
+    registry = AdapterRegistry()
+    registry.register(r"^bedrock.*.amazon.nova*", "regex")
+    registry.register_prefix("bedrock.amazon.nova", "nova")
+    warning = mocker.patch("genai_core.registry.index.logger.warning")
+
+    assert registry.get_adapter("bedrock.amazon.nova-pro") == "nova"
+    warning.assert_called_once()
+    assert warning.call_args.kwargs["matches"] == [
+        "prefix bedrock.amazon.nova",
+        "regex ^bedrock.*.amazon.nova*",
+    ]
+
+
+def test_get_adapter_memo_bounded(mocker):
+    mocker.patch("genai_core.registry.index.RESOLVED_MAX_SIZE", 2)
+    registry = AdapterRegistry()
+    registry.register(r"^bedrock.*", "bedrock")
+
+    registry.get_adapter("bedrock.a")
+    registry.get_adapter("bedrock.b")
+    registry.get_adapter("bedrock.a")
+    registry.get_adapter("bedrock.c")
+
+    assert list(registry.resolved) == ["bedrock.a", "bedrock.c"]
+
+
+def test_get_adapter_not_found():
+    registry = AdapterRegistry()
+    registry.register_prefix("openai", "gpt")
+
+    with pytest.raises(ValueError):
+        registry.get_adapter("bedrock.model")
@@ -0,0 +1,126 @@
+import pytest
+import genai_core.applications
+from genai_core.types import CommonError
+from genai_core.applications import (
+    ROLES_INDEX_MARKER,
+    delete_application,
+    list_applications_by_roles,
+)
+
+
+@pytest.fixture(autouse=True)
+def tables(mocker):
+    genai_core.applications._applications_cache.clear()
+    mocker.patch("genai_core.applications._roles_index_complete", True)
+    mocker.patch("genai_core.applications.APPLICATIONS_TABLE_NAME", "Applications")
+    roles_table = mocker.patch("genai_core.applications.roles_table", create=True)
+    table = mocker.patch("genai_core.applications.table", create=True)
+    return table, roles_table
+
+
+def test_list_applications_by_roles(mocker, tables):
+    _, roles_table = tables
+    roles_table.query.side_effect = lambda **kwargs: {
+        "Items": [{"ApplicationId": "app1"}, {"ApplicationId": "app2"}]
+    }
+    batch_get = mocker.patch(
+        "genai_core.applications.dynamodb.batch_get_item",
+        return_value={
+            "Responses": {"Applications": [{"Id": "app2"}, {"Id": "app1"}]},
+            "UnprocessedKeys": {},
+        },
+    )
+
+    items = list_applications_by_roles(["role2", "role1", "role1"])
+
+    assert roles_table.query.call_count == 2
+    keys = batch_get.call_args.kwargs["RequestItems"]["Applications"]["Keys"]
+    assert keys == [{"Id": "app1"}, {"Id": "app2"}]
+    assert items == [{"Id": "app1"}, {"Id": "app2"}]
+
+    # Served from the cache
+    assert list_applications_by_roles(["role1", "role2"]) == items
+    assert batch_get.call_count == 1
+
+
+def test_list_applications_by_roles_unprocessed_keys(mocker, tables):
+    sleep = mocker.patch("genai_core.applications.time.sleep")
+    _, roles_table = tables
+    roles_table.query.return_value = {"Items": [{"ApplicationId": "app1"}]}
+    unprocessed = {"Applications": {"Keys": [{"Id": "app1"}]}}
+    batch_get = mocker.patch(
+        "genai_core.applications.dynamodb.batch_get_item",
+        side_effect=[
+            {"Responses": {}, "UnprocessedKeys": unprocessed},
+            {"Responses": {"Applications": [{"Id": "app1"}]}},
+        ],
+    )
+
+    assert list_applications_by_roles(["role1"]) == [{"Id": "app1"}]
+    assert batch_get.call_count == 2
+    sleep.assert_called_once_with(0.1)
+
+    genai_core.applications._applications_cache.clear()
+    batch_get.side_effect = None
+    batch_get.return_value = {"Responses": {}, "UnprocessedKeys": unprocessed}
+    with pytest.raises(CommonError):
+        list_applications_by_roles(["role1"])
+    assert batch_get.call_count == 7
+
+
+def test_list_applications_by_roles_indexes_existing_applications(mocker, tables):
+    table, roles_table = tables
+    mocker.patch("genai_core.applications._roles_index_complete", False)
+    # The cached list is outdated, the roles table has a removed role
+    genai_core.applications._set_cached("*", [{"Id": "app1", "Roles": ["old"]}])
+    roles_table.get_item.return_value = {}
+    roles_table.query.return_value = {"Items": []}
+    roles_table.scan.return_value = {
+        "Items": [{"Role": "old", "ApplicationId": "app1"}]
+    }
+    table.scan.return_value = {"Items": [{"Id": "app1", "Roles": ["role1"]}]}
+    batch = roles_table.batch_writer.return_value.__enter__.return_value
+
+    assert list_applications_by_roles(["role1"]) == []
+
+    table.scan.assert_called_with(ConsistentRead=True)
+    batch.delete_item.assert_called_once_with(
+        Key={"Role": "old", "ApplicationId": "app1"}
+    )
+    batch.put_item.assert_called_once_with(
+        Item={"Role": "role1", "ApplicationId": "app1"}
+    )
+    roles_table.put_item.assert_called_once()
+    assert roles_table.put_item.call_args.kwargs["Item"] == ROLES_INDEX_MARKER
+    assert "ConditionExpression" in roles_table.put_item.call_args.kwargs
+    assert genai_core.applications._roles_index_complete
+
+
+def test_roles_index_not_marked_while_applications_change(mocker, tables):
+    table, roles_table = tables
+    mocker.patch("genai_core.applications._roles_index_complete", False)
+    roles_table.get_item.return_value = {}
+    roles_table.query.return_value = {"Items": []}
+    roles_table.scan.return_value = {"Items": []}
+    # Every scan sees a new update of the roles
+    table.scan.side_effect = [
+        {"Items": [{"Id": "app1", "Roles": [f"role{i}"]}]} for i in range(4)
+    ]
+
+    list_applications_by_roles(["role1"])
+
+    assert table.scan.call_count == 4
+    roles_table.put_item.assert_not_called()
+    assert not genai_core.applications._roles_index_complete
+
+
+def test_delete_application_removes_roles(tables):
+    table, roles_table = tables
+    table.delete_item.return_value = {"Attributes": {"Id": "app1", "Roles": ["r"]}}
+    batch = roles_table.batch_writer.return_value.__enter__.return_value
+
+    assert delete_application("app1") is True
+
+    batch.delete_item.assert_called_once_with(
+        Key={"Role": "r", "ApplicationId": "app1"}
+    )
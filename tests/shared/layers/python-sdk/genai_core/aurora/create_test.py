@@ -0,0 +1,33 @@
+from genai_core.aurora.create import migrate_keyword_search_columns
+
+workspace = {
+    "workspace_id": "a-b",
+    "hybrid_search": True,
+    "languages": ["english", "french"],
+}
+
+
+def test_migrate_keyword_search_columns(mocker):
+    connection = mocker.patch("genai_core.aurora.create.AuroraConnection")
+    cursor = connection.return_value.__enter__.return_value
+    cursor.fetchall.return_value = [("ab_content_idx",)]
+    mark = mocker.patch("genai_core.workspaces.set_workspace_flag")
+
+    assert migrate_keyword_search_columns(workspace)
+
+    statements = [str(call.args[0]) for call in cursor.execute.call_args_list]
+    assert sum("GENERATED ALWAYS AS" in s for s in statements) == 2
+    assert sum("USING GIN" in s for s in statements) == 2
+    assert any("DROP INDEX" in s and "ab_content_idx" in s for s in statements)
+    cursor.connection.commit.assert_called_once()
+    mark.assert_called_once_with("a-b", "keyword_search_columns")
+
+
+def test_migrate_keyword_search_columns_skips_migrated(mocker):
+    connection = mocker.patch("genai_core.aurora.create.AuroraConnection")
+
+    assert not migrate_keyword_search_columns(
+        {**workspace, "keyword_search_columns": True}
+    )
+    assert not migrate_keyword_search_columns({**workspace, "hybrid_search": False})
+    connection.assert_not_called()
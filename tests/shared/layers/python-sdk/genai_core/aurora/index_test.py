@@ -0,0 +1,134 @@
+from genai_core.aurora.index import (
+    get_indexed_expression,
+    ivfflat_lists,
+    maybe_rebuild_ivfflat_index,
+    request_ivfflat_index_build,
+    set_search_parameters,
+)
+
+workspace = {
+    "workspace_id": "a-b",
+    "metric": "cosine",
+    "has_index": True,
+    "index_type": "ivfflat",
+    "embeddings_model_dimensions": 1024,
+}
+
+
+def test_ivfflat_lists():
+    assert ivfflat_lists(10) == 1
+    assert ivfflat_lists(500000) == 500
+    assert ivfflat_lists(4000000) == 2000
+
+
+def test_set_search_parameters():
+    cursor = type("Cursor", (), {})()
+    calls = []
+    cursor.execute = lambda *args: calls.append(args)
+
+    set_search_parameters(cursor, {**workspace, "index_type": "hnsw"}, 25)
+    set_search_parameters(cursor, {**workspace, "ivfflat_probes": 20}, 25)
+    set_search_parameters(cursor, {**workspace, "has_index": False}, 25)
+
+    assert calls == [
+        ("SET LOCAL hnsw.ef_search = %s;", [40]),
+        ("SET LOCAL ivfflat.probes = %s;", [20]),
+    ]
+
+
+def test_indexed_expression():
+    full = str(get_indexed_expression(workspace))
+    half = str(get_indexed_expression({**workspace, "vector_precision": "float16"}))
+    quantized = str(
+        get_indexed_expression({**workspace, "vector_precision": "quantized"})
+    )
+
+    assert "'vector_cosine_ops'" in full
+    assert "'halfvec_cosine_ops'" in half
+    assert "binary_quantize(content_embeddings)::bit(" in quantized
+    assert "Literal(1024)" in quantized
+    assert "'bit_hamming_ops'" in quantized
+
+
+def test_quantized_search_parameters():
+    cursor = type("Cursor", (), {})()
+    calls = []
+    cursor.execute = lambda *args: calls.append(args)
+
+    set_search_parameters(
+        cursor,
+        {**workspace, "index_type": "hnsw", "vector_precision": "quantized"},
+        25,
+    )
+
+    # Enough candidates to re-rank
+    assert calls == [("SET LOCAL hnsw.ef_search = %s;", [100])]
+
+
+def mock_connection(mocker, rows, index, invalid=[]):
+    connection = mocker.patch("genai_core.aurora.index.AuroraConnection")
+    cursor = connection.return_value.__enter__.return_value
+    cursor.fetchone.side_effect = [(True,), (rows,), index]
+    cursor.fetchall.return_value = invalid
+    return cursor
+
+
+def test_ivfflat_index_not_built_on_small_tables(mocker):
+    cursor = mock_connection(mocker, 500, None)
+
+    assert not maybe_rebuild_ivfflat_index(workspace)
+    # lock, row count and unlock
+    assert cursor.execute.call_count == 3
+
+
+def test_ivfflat_index_rebuilt_when_rows_double(mocker):
+    cursor = mock_connection(mocker, 250000, ("old", ["lists=100"]))
+
+    assert maybe_rebuild_ivfflat_index(workspace)
+    statements = [str(call.args[0]) for call in cursor.execute.call_args_list]
+    assert any("CREATE INDEX CONCURRENTLY" in s for s in statements)
+    assert any("DROP INDEX CONCURRENTLY" in s for s in statements)
+
+
+def test_ivfflat_index_drops_invalid_indexes(mocker):
+    cursor = mock_connection(mocker, 250000, None, invalid=[("ab_ivfflat_250",)])
+
+    assert maybe_rebuild_ivfflat_index(workspace)
+    statements = [str(call.args[0]) for call in cursor.execute.call_args_list]
+    drop = next(i for i, s in enumerate(statements) if "DROP INDEX" in s)
+    create = next(i for i, s in enumerate(statements) if "CREATE INDEX" in s)
+    assert drop < create
+    assert "ab_ivfflat_250" in statements[drop]
+    assert "i.indisvalid" in statements[drop + 1]
+
+
+def test_ivfflat_index_kept_when_lists_fit(mocker):
+    mock_connection(mocker, 150000, ("old", ["lists=100"]))
+
+    assert not maybe_rebuild_ivfflat_index(workspace)
+
+
+def test_hnsw_index_never_rebuilt(mocker):
+    connection = mocker.patch("genai_core.aurora.index.AuroraConnection")
+
+    assert not maybe_rebuild_ivfflat_index({**workspace, "index_type": "hnsw"})
+    connection.assert_not_called()
+
+
+def test_request_ivfflat_index_build(mocker):
+    mocker.patch(
+        "genai_core.aurora.index.CREATE_AURORA_WORKSPACE_FUNCTION_NAME", "function"
+    )
+    client = mocker.patch("genai_core.aurora.index.boto3.client")
+
+    assert request_ivfflat_index_build({**workspace, "engine": "aurora"})
+    assert not request_ivfflat_index_build(
+        {**workspace, "engine": "aurora", "index_type": "hnsw"}
+    )
+    assert not request_ivfflat_index_build({**workspace, "engine": "opensearch"})
+
+    client.return_value.invoke.assert_called_once_with(
+        FunctionName="function",
+        InvocationType="Event",
+        Payload='{"action": "build_ivfflat_index", "workspace_id": "a-b"}',
+    )
@@ -0,0 +1,67 @@
+import json
+import genai_core.chunks
+
+
+class FakeBucket:
+    """Objects of the processing bucket kept in memory"""
+
+    def __init__(self):
+        self.objects = {}
+        self.requests = 0
+
+    def upload_fileobj(self, fileobj, key):
+        self.requests += 1
+        self.objects[key] = fileobj.read()
+
+    def Bucket(self, name):
+        return self
+
+    def Object(self, bucket, key):
+        fake = self
+
+        class FakeObject:
+            def put(self, Body):
+                fake.requests += 1
+                fake.objects[key] = Body.encode("utf-8")
+
+        return FakeObject()
+
+
+def get_bucket(mocker):
+    bucket = FakeBucket()
+    mocker.patch("genai_core.chunks.s3", bucket)
+    return bucket
+
+
+def test_store_chunks_archive(mocker):
+    mocker.patch("genai_core.chunks.CHUNKS_STORAGE_FORMAT", "archive")
+    bucket = get_bucket(mocker)
+    chunks = [f"chunk {i} é\n" * i for i in range(100)]
+    chunk_ids = [f"id{i}" for i in range(100)]
+
+    genai_core.chunks.store_chunks_on_s3("ws", "doc", "sub", chunk_ids, chunks)
+
+    assert bucket.requests == 2
+    assert sorted(bucket.objects) == [
+        "ws/doc/sub/chunks.index.json",
+        "ws/doc/sub/chunks.jsonl",
+    ]
+    lines = bucket.objects["ws/doc/sub/chunks.jsonl"].decode("utf-8").splitlines()
+    assert [json.loads(line)["content"] for line in lines] == chunks
+
+    archive = bucket.objects["ws/doc/sub/chunks.jsonl"]
+    index = json.loads(bucket.objects["ws/doc/sub/chunks.index.json"])
+    for chunk_id, chunk in zip(chunk_ids, chunks):
+        offset, length = index["chunks"][chunk_id]
+        line = archive[offset : offset + length].decode("utf-8")
+        assert json.loads(line) == {"chunk_id": chunk_id, "content": chunk}
+
+
+def test_store_chunks_objects(mocker):
+    bucket = get_bucket(mocker)
+
+    genai_core.chunks.store_chunks_on_s3("ws", "doc", None, ["a", "b"], ["1", "2"])
+
+    assert bucket.requests == 2
+    assert sorted(bucket.objects) == ["ws/doc/chunks/a.txt", "ws/doc/chunks/b.txt"]
+    assert bucket.objects["ws/doc/chunks/b.txt"] == b"2"
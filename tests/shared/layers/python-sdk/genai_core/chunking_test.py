@@ -0,0 +1,101 @@
+import sys
+import pytest
+import genai_core.chunking
+from genai_core.types import CommonError
+
+workspace = {
+    "chunking_strategy": "recursive",
+    "chunk_size": 100,
+    "chunk_overlap": 10,
+    "embeddings_model_provider": "bedrock",
+    "embeddings_model_name": "amazon.titan-embed-text-v2:0",
+}
+
+content = "\n\n".join(
+    " ".join(f"Sentence {p} {s} with a few words." for s in range(5)) for p in range(20)
+)
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def test_split_text_unknown_strategy():
+    with pytest.raises(CommonError, match="Chunking strategy not supported"):
+        genai_core.chunking.split_text(
+            {**workspace, "chunking_strategy": "invalid"}, content
+        )
+
+
+def test_split_text_recursive():
+    chunks = genai_core.chunking.split_text(workspace, "a\x00b " * 50)
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert "\x00" not in "".join(chunks)
+
+
+def test_split_boundaries():
+    chunks = genai_core.chunking.split_boundaries(content, 100, 0)
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks).split() == content.split()
+
+
+def test_split_boundaries_overlap():
+    chunks = genai_core.chunking.split_boundaries(content, 100, 40)
+
+    for previous, chunk in zip(chunks, chunks[1:]):
+        overlap = chunk.split()[0]
+        assert overlap in previous.split()
+    assert chunks[-1].endswith("19 4 with a few words.")
+
+
+def test_split_boundaries_without_separator():
+    chunks = genai_core.chunking.split_boundaries("a" * 250, 100, 10)
+
+    assert chunks == ["a" * 100, "a" * 100, "a" * 50]
+    assert genai_core.chunking.split_boundaries("  \n ", 100, 10) == []
+
+
+def test_split_tokens(mocker):
+    mocker.patch("genai_core.chunking.get_token_counter", return_value=count_words)
+    # The first paragraph is denser and is split again
+    text = "a b c d e f g h i j k l m n o p. " * 4 + "\n\n" + content
+
+    chunks = genai_core.chunking.split_text(
+        {
+            **workspace,
+            "chunking_strategy": "token",
+            "chunk_size": 20,
+            "chunk_overlap": 0,
+        },
+        text,
+    )
+
+    assert all(count_words(chunk) <= 20 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_get_token_counter_fallback(mocker):
+    mocker.patch(
+        "tiktoken.get_encoding",
+        side_effect=ConnectionError("offline"),
+    )
+    genai_core.chunking.get_token_counter.cache_clear()
+
+    count_tokens = genai_core.chunking.get_token_counter("bedrock", "model")
+
+    assert count_tokens("a" * 40) == 11
+    assert genai_core.chunking.get_token_counter("bedrock", "model") is count_tokens
+    genai_core.chunking.get_token_counter.cache_clear()
+
+
+def test_get_token_counter_without_tiktoken(mocker):
+    mocker.patch.dict(sys.modules, {"tiktoken": None})
+    genai_core.chunking.get_token_counter.cache_clear()
+
+    count_tokens = genai_core.chunking.get_token_counter("bedrock", "model")
+
+    assert count_tokens is genai_core.chunking.estimate_tokens
+    genai_core.chunking.get_token_counter.cache_clear()
@@ -1,4 +1,15 @@
-from genai_core.documents import batch_crawl_websites
+import threading
+import pytest
+from botocore.exceptions import ClientError
+from genai_core.documents import (
+    DOCUMENTS_TABLE_NAME,
+    batch_crawl_websites,
+    check_rss_feed_for_posts,
+    documents_table,
+    ingest_rss_feeds,
+    list_documents,
+)
+from genai_core.types import CommonError
 
 
 def test_batch_crawl_websites(mocker):
@@ -71,3 +82,227 @@ def test_batch_crawl_websites_not_set(mocker):
             "content_types": ["text/html"],
         },
     )
+
+
+def test_list_documents_cursor(mocker):
+    mocker.patch(
+        "genai_core.workspaces.get_workspace", return_value={"engine": "aurora"}
+    )
+    last_key = {
+        "workspace_id": "w",
+        "document_id": "d",
+        "compound_sort_key": "file/a.pdf",
+    }
+    query = mocker.patch("genai_core.documents.documents_table.query")
+    query.side_effect = [
+        {"Items": [{"document_id": "d"}], "LastEvaluatedKey": last_key},
+        {"Items": [{"document_id": "e"}]},
+    ]
+    get_item = mocker.patch("genai_core.documents.documents_table.get_item")
+
+    first = list_documents("w", "file", page_size=1)
+    second = list_documents("w", "file", first["last_document_id"], page_size=1)
+
+    assert second == {"items": [{"document_id": "e"}], "last_document_id": None}
+    assert query.call_args.kwargs["ExclusiveStartKey"] == last_key
+    assert "#status" in query.call_args.kwargs["ProjectionExpression"]
+    get_item.assert_not_called()
+
+
+def test_list_documents_invalid_cursor(mocker):
+    mocker.patch(
+        "genai_core.workspaces.get_workspace", return_value={"engine": "aurora"}
+    )
+    mocker.patch("genai_core.documents.documents_table.query")
+    other_workspace = "eyJ3b3Jrc3BhY2VfaWQiOiJ4In0"
+
+    with pytest.raises(CommonError, match="Invalid pagination cursor"):
+        list_documents("w", "file", "not-a-cursor")
+    with pytest.raises(CommonError, match="Invalid pagination cursor"):
+        list_documents("w", "file", other_workspace)
+
+
+def test_ingest_rss_feeds_paginates(mocker):
+    query = mocker.patch(
+        "genai_core.documents.dynamodb_client.query",
+        side_effect=[
+            {
+                "Items": [{"workspace_id": {"S": "w1"}, "document_id": {"S": "d1"}}],
+                "LastEvaluatedKey": {"document_id": {"S": "d1"}},
+            },
+            {"Items": [{"workspace_id": {"S": "w2"}, "document_id": {"S": "d2"}}]},
+        ],
+    )
+    trigger = mocker.patch("genai_core.documents._trigger_rss_feed_ingestor")
+
+    ingest_rss_feeds()
+
+    assert query.call_args_list[1].kwargs["ExclusiveStartKey"] == {
+        "document_id": {"S": "d1"}
+    }
+    assert sorted(call.args for call in trigger.call_args_list) == [
+        ("w1", "d1"),
+        ("w2", "d2"),
+    ]
+
+
+def test_ingest_rss_feeds_logs_failed_triggers(mocker):
+    mocker.patch(
+        "genai_core.documents.dynamodb_client.query",
+        return_value={
+            "Items": [
+                {"workspace_id": {"S": "w1"}, "document_id": {"S": "d1"}},
+                {"workspace_id": {"S": "w2"}, "document_id": {"S": "d2"}},
+            ]
+        },
+    )
+    trigger = mocker.patch(
+        "genai_core.documents._trigger_rss_feed_ingestor",
+        side_effect=[Exception("throttled"), None],
+    )
+    log_exception = mocker.patch("genai_core.documents.logger.exception")
+
+    ingest_rss_feeds()
+
+    assert trigger.call_count == 2
+    log_exception.assert_called_once()
+    assert log_exception.call_args.kwargs["feed_id"] in ["d1", "d2"]
+
+
+def test_check_rss_feed_for_posts_adds_new_posts(mocker):
+    mocker.patch("genai_core.workspaces.get_workspace", return_value={"id": "w"})
+    mocker.patch(
+        "genai_core.documents.get_document",
+        return_value={
+            "document_id": "feed",
+            "path": "https://example/feed",
+            "rss_etag": "old",
+        },
+    )
+    parse = mocker.patch("genai_core.documents.feedparser.parse")
+    parse.return_value = mocker.MagicMock(
+        entries=[
+            {"link": "https://example/1", "title": "1"},
+            {"link": "https://example/2", "title": "2"},
+            {"link": "https://example/2", "title": "2"},
+        ]
+    )
+    parse.return_value.get.side_effect = {"status": 200, "etag": "new"}.get
+    existing_id = "d9c3c7f0-c4ef-5b1c-8d11-5ec1ae0c1f3b"
+    mocker.patch(
+        "genai_core.documents._get_hash_id_from_path",
+        side_effect=lambda path: existing_id if path.endswith("1") else "new-id",
+    )
+    batch_get = mocker.patch(
+        "genai_core.documents.dynamodb.batch_get_item",
+        return_value={
+            "Responses": {DOCUMENTS_TABLE_NAME: [{"document_id": existing_id}]},
+            "UnprocessedKeys": {},
+        },
+    )
+    put_item = mocker.patch("genai_core.documents.documents_table.put_item")
+    update = mocker.patch("genai_core.documents.update_subscription_timestamp")
+
+    check_rss_feed_for_posts("w", "feed")
+
+    parse.assert_called_once_with("https://example/feed", etag="old", modified=None)
+    keys = batch_get.call_args.kwargs["RequestItems"][DOCUMENTS_TABLE_NAME]["Keys"]
+    assert len(keys) == 2
+    put_item.assert_called_once()
+    assert (
+        put_item.call_args.kwargs["ConditionExpression"]
+        == "attribute_not_exists(document_id)"
+    )
+    item = put_item.call_args.kwargs["Item"]
+    assert item["document_id"] == "new-id"
+    assert item["compound_sort_key"] == "rsspost/feed/new-id"
+    update.assert_called_once_with("w", "feed", etag="new", modified=None)
+
+
+def test_check_rss_feed_for_posts_skips_added_posts(mocker):
+    mocker.patch("genai_core.workspaces.get_workspace", return_value={"id": "w"})
+    mocker.patch(
+        "genai_core.documents.get_document",
+        return_value={"document_id": "feed", "path": "https://example/feed"},
+    )
+    parse = mocker.patch("genai_core.documents.feedparser.parse")
+    parse.return_value.entries = [{"link": "https://example/1", "title": "1"}]
+    parse.return_value.get.side_effect = {"status": 200}.get
+    mocker.patch(
+        "genai_core.documents.dynamodb.batch_get_item",
+        return_value={"Responses": {}, "UnprocessedKeys": {}},
+    )
+    # Added by a concurrent run after the lookup
+    mocker.patch(
+        "genai_core.documents.documents_table.put_item",
+        side_effect=ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem"
+        ),
+    )
+    update = mocker.patch("genai_core.documents.update_subscription_timestamp")
+
+    check_rss_feed_for_posts("w", "feed")
+
+    update.assert_called_once()
+
+
+def test_check_rss_feed_for_posts_unprocessed_keys(mocker):
+    sleep = mocker.patch("genai_core.documents.time.sleep")
+    mocker.patch("genai_core.workspaces.get_workspace", return_value={"id": "w"})
+    mocker.patch(
+        "genai_core.documents.get_document",
+        return_value={"document_id": "feed", "path": "https://example/feed"},
+    )
+    parse = mocker.patch("genai_core.documents.feedparser.parse")
+    parse.return_value.entries = [{"link": "https://example/1", "title": "1"}]
+    parse.return_value.get.side_effect = {"status": 200}.get
+    mocker.patch("genai_core.documents._get_hash_id_from_path", return_value="id")
+    unprocessed = {
+        "Responses": {},
+        "UnprocessedKeys": {
+            DOCUMENTS_TABLE_NAME: {"Keys": [{"workspace_id": "w", "document_id": "id"}]}
+        },
+    }
+    batch_get = mocker.patch(
+        "genai_core.documents.dynamodb.batch_get_item", return_value=unprocessed
+    )
+    put_item = mocker.patch("genai_core.documents.documents_table.put_item")
+    mocker.patch("genai_core.documents.update_subscription_timestamp")
+
+    check_rss_feed_for_posts("w", "feed")
+
+    assert batch_get.call_count == 5
+    assert [call.args[0] for call in sleep.call_args_list] == [0.1, 0.2, 0.4, 0.8]
+    put_item.assert_called_once()
+
+
+def test_check_rss_feed_for_posts_not_modified(mocker):
+    mocker.patch("genai_core.workspaces.get_workspace", return_value={"id": "w"})
+    mocker.patch(
+        "genai_core.documents.get_document",
+        return_value={"document_id": "feed", "path": "https://example/feed"},
+    )
+    parse = mocker.patch("genai_core.documents.feedparser.parse")
+    parse.return_value.get.side_effect = {"status": 304}.get
+    batch_get = mocker.patch("genai_core.documents.dynamodb.batch_get_item")
+    mocker.patch("genai_core.documents.update_subscription_timestamp")
+
+    check_rss_feed_for_posts("w", "feed")
+
+    batch_get.assert_not_called()
+
+
+def test_documents_table_per_thread():
+    # The upload handler and the RSS posts create documents from threads
+    clients = []
+    threads = [
+        threading.Thread(target=lambda: clients.append(documents_table.meta.client))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert documents_table.meta.client not in clients
+    assert clients[0] is not clients[1]
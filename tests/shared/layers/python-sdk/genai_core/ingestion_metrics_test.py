@@ -0,0 +1,102 @@
+import pytest
+import genai_core.chunks
+import genai_core.embeddings
+import genai_core.utils.telemetry as telemetry
+
+workspace = {"workspace_id": "id", "engine": "aurora"}
+
+
+@pytest.fixture
+def exporter(mocker):
+    mocker.patch("genai_core.utils.telemetry.TELEMETRY_ENABLED", True)
+    exporter = telemetry.StubExporter()
+    telemetry.set_exporter(exporter)
+    yield exporter
+    telemetry.set_exporter(telemetry.EmfExporter())
+
+
+def test_ingestion_metrics_reports_every_interval(mocker, exporter):
+    set_progress_mock = mocker.patch("genai_core.documents.set_progress")
+    clock = mocker.patch("genai_core.chunks.time.perf_counter", return_value=0)
+
+    with genai_core.chunks.IngestionMetrics(
+        workspace, "doc", 10, job="WebCrawler", interval=30
+    ) as metrics:
+        telemetry.add_metric("Chunks", 40)
+        telemetry.add_metric("Bytes", 4000, telemetry.MetricUnit.Bytes)
+        clock.return_value = 10
+        metrics.update(2)
+        assert exporter.exports == []
+
+        clock.return_value = 40
+        metrics.update(4)
+
+        telemetry.add_metric("Chunks", 10)
+        clock.return_value = 50
+        metrics.update(5)
+        metrics.finish()
+
+    assert len(exporter.exports) == 2
+    export = exporter.exports[0]
+    assert export["dimensions"] == {"Job": "WebCrawler", "Engine": "aurora"}
+    assert export["metrics"]["ChunksPerSecond"][0] == 1
+    assert export["metrics"]["BytesPerSecond"][0] == 100
+    assert exporter.exports[1]["metrics"]["ChunksPerSecond"][0] == 1
+
+    assert set_progress_mock.call_args_list[0].args == (
+        "id",
+        "doc",
+        {"processed": 4, "total": 10, "percent": 40, "eta_seconds": 60},
+    )
+    # The crawl ran out of links before its limit
+    assert set_progress_mock.call_args_list[-1].args[2] == {
+        "processed": 5,
+        "total": 5,
+        "percent": 100,
+        "eta_seconds": 0,
+    }
+
+
+def test_ingestion_metrics_resumed(mocker, exporter):
+    set_progress_mock = mocker.patch("genai_core.documents.set_progress")
+    clock = mocker.patch("genai_core.chunks.time.perf_counter", return_value=0)
+
+    # 50 items processed by the earlier runs
+    with genai_core.chunks.IngestionMetrics(
+        workspace, "doc", 100, job="WebCrawler", interval=30, initial=50
+    ) as metrics:
+        clock.return_value = 30
+        metrics.update(60)
+
+    assert set_progress_mock.call_args.args[2] == {
+        "processed": 60,
+        "total": 100,
+        "percent": 60,
+        "eta_seconds": 120,
+    }
+
+
+def test_ingestion_metrics_without_document(mocker, exporter):
+    set_progress_mock = mocker.patch("genai_core.documents.set_progress")
+
+    with genai_core.chunks.IngestionMetrics(
+        workspace, None, 1, job="FileImport"
+    ) as metrics:
+        telemetry.add_metric("Chunks", 3)
+        metrics.update(1)
+
+    set_progress_mock.assert_not_called()
+    assert exporter.exports[0]["metrics"]["Chunks"][0] == 3
+
+
+def test_embedding_retries_and_throttles(exporter):
+    with telemetry.Telemetry() as request:
+        genai_core.embeddings._count_retries({"ResponseMetadata": {"RetryAttempts": 2}})
+        genai_core.embeddings._on_needs_retry(
+            response=(None, {"Error": {"Code": "ThrottlingException"}})
+        )
+        genai_core.embeddings._on_needs_retry(response=(None, {}))
+        genai_core.embeddings._on_needs_retry(response=None)
+
+        assert request.get("EmbeddingRetries") == 2
+        assert request.get("EmbeddingThrottles") == 1
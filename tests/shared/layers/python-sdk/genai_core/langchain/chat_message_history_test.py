@@ -0,0 +1,117 @@
+from decimal import Decimal
+from botocore.exceptions import ClientError
+from langchain_core.messages import AIMessage, HumanMessage
+from genai_core.langchain.chat_message_history import DynamoDBChatMessageHistory
+
+
+def get_history(mocker, item=None):
+    history = DynamoDBChatMessageHistory(
+        table_name="SessionsTableName",
+        session_id="session",
+        user_id="user",
+        defer_writes=True,
+    )
+    history.table = mocker.MagicMock()
+    history.table.get_item.return_value = {"Item": item} if item else {}
+    return history
+
+
+def test_deferred_writes_single_update(mocker):
+    history = get_history(mocker)
+
+    assert history.messages == []
+    history.add_message(HumanMessage("question"))
+    history.add_message(AIMessage("answer"))
+    history.add_metadata({"modelId": "model", "temperature": 0.5})
+    history.replace_last_message("blocked")
+
+    history.table.put_item.assert_not_called()
+    history.table.update_item.assert_not_called()
+    assert [m.content for m in history.messages] == ["question", "blocked"]
+
+    history.flush()
+    history.flush()
+
+    history.table.update_item.assert_called_once()
+    kwargs = history.table.update_item.call_args.kwargs
+    assert kwargs["Key"] == {"SessionId": "session", "UserId": "user"}
+    assert "list_append(if_not_exists(History, :empty), :messages)" in (
+        kwargs["UpdateExpression"]
+    )
+    values = kwargs["ExpressionAttributeValues"]
+    assert values[":title"] == "question"
+    assert [m["data"]["content"] for m in values[":messages"]] == [
+        "question",
+        "blocked",
+    ]
+    assert values[":messages"][1]["data"]["additional_kwargs"] == {
+        "modelId": "model",
+        "temperature": Decimal("0.5"),
+    }
+    assert history.table.get_item.call_count == 2
+
+
+def test_deferred_writes_existing_session(mocker):
+    history = get_history(
+        mocker,
+        item={"History": [], "StartTime": "2024-01-01T00:00:00"},
+    )
+    history.messages
+    history.add_message(HumanMessage("question"))
+    history.flush()
+
+    kwargs = history.table.update_item.call_args.kwargs
+    assert ":title" not in kwargs["ExpressionAttributeValues"]
+    assert "StartTime = :startTime" in kwargs["UpdateExpression"]
+    assert kwargs["ExpressionAttributeValues"][":startTime"] > "2024-01-01T00:00:00"
+
+
+def test_deferred_summary_not_overwritten(mocker):
+    stored = [
+        {"type": "human", "data": {"content": f"message {i}", "type": "human"}}
+        for i in range(4)
+    ]
+    history = get_history(mocker, item={"History": stored, "StartTime": "start"})
+    history.max_tokens = 1
+    history.summarizer = mocker.Mock(return_value="new summary")
+
+    history.messages
+    assert history.summary_changed
+    summary, summarized_count = history.summary, history.summarized_count
+    # Read again by the chain in the same turn
+    history.max_tokens = None
+    history.messages
+    history.add_message(HumanMessage("question"))
+    history.flush()
+
+    values = history.table.update_item.call_args.kwargs["ExpressionAttributeValues"]
+    assert values[":summary"] == summary == "new summary"
+    assert values[":count"] == summarized_count
+
+
+def test_flush_retries(mocker):
+    mocker.patch("genai_core.langchain.chat_message_history.time.sleep")
+    history = get_history(mocker)
+    throttled = ClientError(
+        {"Error": {"Code": "ProvisionedThroughputExceededException"}}, "UpdateItem"
+    )
+    history.table.update_item.side_effect = [throttled, None]
+
+    history.add_message(HumanMessage("question"))
+    history.flush()
+
+    assert history.table.update_item.call_count == 2
+    assert history.pending_messages == []
+
+
+def test_flush_gives_up(mocker):
+    mocker.patch("genai_core.langchain.chat_message_history.time.sleep")
+    history = get_history(mocker)
+    history.table.update_item.side_effect = ClientError(
+        {"Error": {"Code": "InternalServerError"}}, "UpdateItem"
+    )
+
+    history.add_message(HumanMessage("question"))
+    history.flush()
+
+    assert history.table.update_item.call_count == 3
@@ -0,0 +1,84 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from genai_core.langchain.history_window import (
+    estimate_tokens,
+    window_messages,
+    FILE_TOKENS,
+)
+
+
+def get_messages(count):
+    messages = []
+    for i in range(count):
+        messages.append(HumanMessage(content=f"question {i} " + "a" * 400))
+        messages.append(AIMessage(content=f"answer {i} " + "b" * 400))
+    return messages
+
+
+def test_estimate_tokens():
+    assert estimate_tokens(HumanMessage(content="a" * 400)) == 101
+    message = HumanMessage(
+        content="a" * 40, additional_kwargs={"files": [{"key": "image.png"}]}
+    )
+    assert estimate_tokens(message) == 11 + FILE_TOKENS
+
+
+def test_window_messages_unlimited():
+    messages = get_messages(10)
+    assert window_messages(messages, None) == (messages, None, 0)
+
+
+def test_window_messages_drops_oldest():
+    messages = get_messages(10)
+    window, summary, _ = window_messages(messages, 500)
+
+    assert summary is None
+    assert window == messages[-4:]
+    assert isinstance(window[0], HumanMessage)
+
+
+def test_window_messages_keeps_last_exchange():
+    messages = get_messages(3)
+    messages[-1] = AIMessage(content="a" * 8000)
+    window, _, _ = window_messages(messages, 500)
+
+    assert window == messages[-2:]
+
+
+def test_window_messages_keeps_summary():
+    messages = get_messages(10)
+
+    assert window_messages(messages, None, "summary", 4) == (
+        messages,
+        "summary",
+        4,
+    )
+    window, summary, count = window_messages(messages, 500, "summary", 4)
+    assert window == messages[-4:]
+    assert (summary, count) == ("summary", 4)
+
+
+def test_window_messages_summarizes_oldest():
+    messages = get_messages(10)
+    calls = []
+
+    def summarizer(summary, messages):
+        calls.append(messages)
+        return "summary"
+
+    window, summary, count = window_messages(messages, 1000, summarizer=summarizer)
+
+    assert summary == "summary"
+    assert count == len(calls[0])
+    assert window == messages[count:]
+    assert len(window) == 4
+
+    # The summary is not updated while the remaining messages fit
+    window, summary, count = window_messages(
+        messages + get_messages(1),
+        1000,
+        summary="summary",
+        summarized_count=count,
+        summarizer=summarizer,
+    )
+    assert len(calls) == 1
+    assert len(window) == 6
@@ -0,0 +1,152 @@
+import time
+import threading
+import pytest
+import genai_core.models
+from genai_core.models import list_all_bedrock_models, list_models
+
+
+@pytest.fixture(autouse=True)
+def empty_catalog(mocker):
+    mocker.patch.dict(genai_core.models._catalog, clear=True)
+    mocker.patch.dict(genai_core.models._pending, clear=True)
+
+
+def test_list_models_queries_providers_once(mocker):
+    first = mocker.Mock(return_value=[{"name": "a"}])
+    second = mocker.Mock(return_value=None)
+    mocker.patch(
+        "genai_core.models.PROVIDER_LOADERS", {"first": first, "second": second}
+    )
+
+    assert list_models() == [{"name": "a"}]
+    assert list_models() == [{"name": "a"}]
+
+    first.assert_called_once()
+    second.assert_called_once()
+
+
+def test_list_models_skips_slow_provider(mocker):
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return [{"name": "slow"}]
+
+    mocker.patch(
+        "genai_core.models.PROVIDER_LOADERS",
+        {"fast": lambda: [{"name": "fast"}], "slow": slow},
+    )
+    mocker.patch("genai_core.models.MODELS_PROVIDER_TIMEOUT", 0.1)
+
+    assert list_models() == [{"name": "fast"}]
+
+    future = genai_core.models._pending["slow"]
+    release.set()
+    future.result()
+    assert list_models() == [{"name": "fast"}, {"name": "slow"}]
+
+
+def test_list_models_serves_stale_catalog(mocker):
+    loader = mocker.Mock(return_value=[{"name": "new"}])
+    mocker.patch("genai_core.models.PROVIDER_LOADERS", {"provider": loader})
+    fetched_at = time.monotonic() - genai_core.models.MODELS_CACHE_TTL - 1
+    genai_core.models._catalog["provider"] = (fetched_at, [{"name": "old"}])
+    submit = mocker.patch.object(genai_core.models._executor, "submit")
+
+    assert list_models() == [{"name": "old"}]
+    submit.assert_called_once()
+
+
+def test_list_models_caches_failures(mocker):
+    failing = mocker.Mock(side_effect=Exception("throttled"))
+    mocker.patch(
+        "genai_core.models.PROVIDER_LOADERS",
+        {"ok": lambda: [{"name": "ok"}], "failing": failing},
+    )
+
+    assert list_models() == [{"name": "ok"}]
+    assert list_models() == [{"name": "ok"}]
+
+    failing.assert_called_once()
+
+
+def test_list_models_retries_failures_sooner(mocker):
+    failing = mocker.Mock(side_effect=[Exception("throttled"), [{"name": "back"}]])
+    mocker.patch("genai_core.models.PROVIDER_LOADERS", {"failing": failing})
+    monotonic = mocker.patch("genai_core.models.time.monotonic", return_value=1000)
+
+    assert list_models() == []
+    monotonic.return_value += genai_core.models.MODELS_FAILURE_TTL + 1
+    list_models()
+    genai_core.models._pending.get("failing", mocker.Mock()).result()
+
+    assert failing.call_count == 2
+    assert list_models() == [{"name": "back"}]
+
+
+def test_list_models_keeps_models_on_failure(mocker):
+    loader = mocker.Mock(side_effect=Exception("throttled"))
+    mocker.patch("genai_core.models.PROVIDER_LOADERS", {"provider": loader})
+    fetched_at = time.monotonic() - genai_core.models.MODELS_CACHE_MAX_STALENESS - 1
+    genai_core.models._catalog["provider"] = (fetched_at, [{"name": "old"}])
+
+    assert list_models() == [{"name": "old"}]
+    assert genai_core.models._catalog["provider"][0] > fetched_at
+
+
+def test_list_models_refreshes_stale_providers(mocker):
+    fresh = mocker.Mock(return_value=[{"name": "fresh"}])
+    stale = mocker.Mock(return_value=[{"name": "new"}])
+    mocker.patch("genai_core.models.PROVIDER_LOADERS", {"fresh": fresh, "stale": stale})
+    genai_core.models._catalog["fresh"] = (time.monotonic(), [{"name": "fresh"}])
+    fetched_at = time.monotonic() - genai_core.models.MODELS_CACHE_MAX_STALENESS - 1
+    genai_core.models._catalog["stale"] = (fetched_at, [{"name": "old"}])
+
+    assert list_models() == [{"name": "fresh"}, {"name": "new"}]
+    fresh.assert_not_called()
+    stale.assert_called_once()
+
+
+def test_list_models_does_not_wait_for_missing_provider(mocker):
+    mocker.patch(
+        "genai_core.models.PROVIDER_LOADERS",
+        {"loaded": mocker.Mock(), "missing": mocker.Mock()},
+    )
+    genai_core.models._catalog["loaded"] = (time.monotonic(), [{"name": "a"}])
+    submit = mocker.patch.object(genai_core.models._executor, "submit")
+    wait = mocker.patch("genai_core.models.wait")
+
+    assert list_models() == [{"name": "a"}]
+    submit.assert_called_once()
+    assert submit.call_args.args[1] == "missing"
+    wait.assert_not_called()
+
+
+def test_list_all_bedrock_models_lists_foundation_models_once(mocker):
+    bedrock = mocker.Mock()
+    bedrock.list_foundation_models.return_value = {
+        "modelSummaries": [
+            {
+                "modelId": "anthropic.claude",
+                "inputModalities": ["TEXT"],
+                "outputModalities": ["TEXT"],
+                "inferenceTypesSupported": ["ON_DEMAND", "INFERENCE_PROFILE"],
+                "modelLifecycle": {"status": "ACTIVE"},
+            }
+        ]
+    }
+    mocker.patch("genai_core.clients.get_bedrock_client", return_value=bedrock)
+    mocker.patch(
+        "genai_core.models.list_cross_region_inference_profiles",
+        return_value={"anthropic.claude": "us.anthropic.claude"},
+    )
+
+    models = list_all_bedrock_models()
+
+    bedrock.list_foundation_models.assert_called_once_with()
+    assert [model["name"] for model in models] == [
+        "anthropic.claude",
+        "us.anthropic.claude",
+    ]
+    assert models[0]["inputModalities"] == ["TEXT", "DOCUMENT"]
+    assert models[1]["inputModalities"] == ["TEXT", "DOCUMENT"]
@@ -0,0 +1,19 @@
+from genai_core.opensearch.precision import get_engine, get_vector_mapping
+
+workspace = {"embeddings_model_dimensions": 3}
+
+
+def test_vector_mapping():
+    assert get_vector_mapping(workspace)["method"]["engine"] == "nmslib"
+
+    half = get_vector_mapping({**workspace, "vector_precision": "float16"})
+    assert half["method"]["engine"] == "faiss"
+    assert half["method"]["parameters"]["encoder"] == {
+        "name": "sq",
+        "parameters": {"type": "fp16"},
+    }
+
+    quantized = get_vector_mapping({**workspace, "vector_precision": "quantized"})
+    assert "data_type" not in quantized
+    assert quantized["method"]["engine"] == get_engine("quantized") == "lucene"
+    assert quantized["method"]["parameters"]["encoder"] == {"name": "sq"}
@@ -0,0 +1,61 @@
+import pytest
+from genai_core.types import CommonError
+from genai_core.search_filters import normalize_filters
+from genai_core.aurora.query import _get_filters_clause
+from genai_core.opensearch.query import vector_query
+
+
+def test_normalize_filters():
+    assert normalize_filters(None) is None
+    assert normalize_filters({"document_ids": [], "path_prefix": None}) is None
+    assert normalize_filters(
+        {"document_types": ["file"], "path_prefix": "s3://", "metadata": {"a": 1}}
+    ) == {"document_types": ["file"], "path_prefix": "s3://", "metadata": {"a": 1}}
+    assert normalize_filters(
+        {"document_ids": ["B1D0D1B5-3C2A-4F7E-9E5A-0A1B2C3D4E5F"]}
+    ) == {"document_ids": ["b1d0d1b5-3c2a-4f7e-9e5a-0a1b2c3d4e5f"]}
+
+
+def test_normalize_filters_invalid():
+    with pytest.raises(CommonError):
+        normalize_filters({"unknown": ["value"]})
+    with pytest.raises(CommonError):
+        normalize_filters({"document_ids": "id"})
+    with pytest.raises(CommonError, match="Invalid document_ids filter"):
+        normalize_filters({"document_ids": ["not-a-uuid"]})
+    with pytest.raises(CommonError):
+        normalize_filters({"metadata": "value"})
+
+
+def test_aurora_filters_clause():
+    conditions, params = _get_filters_clause(
+        {"document_ids": ["id"], "path_prefix": "https://a_b/", "metadata": {"a": 1}}
+    )
+    text = str(conditions)
+    assert "document_id = ANY(%s::uuid[])" in text
+    assert "path LIKE %s" in text
+    assert "metadata @> %s::jsonb" in text
+    assert params == [["id"], "https://a\\_b/%", '{"a": 1}']
+    assert _get_filters_clause(None) == (None, [])
+
+
+def test_opensearch_vector_query(mocker):
+    client = mocker.Mock()
+    client.search.return_value = {"hits": {"hits": []}}
+
+    vector_query(client, "index", [0.1], 25)
+    body = client.search.call_args.kwargs["body"]
+    assert body["query"]["knn"]["content_embeddings"]["k"] == 25
+
+    vector_query(client, "index", [0.1], 25, {"document_types": ["file"]})
+    body = client.search.call_args.kwargs["body"]
+    knn = body["query"]["bool"]["must"][0]["knn"]["content_embeddings"]
+    assert knn["k"] == 100
+    assert body["query"]["bool"]["filter"] == [{"terms": {"document_type": ["file"]}}]
+
+    vector_query(client, "index", [0.1], 25, {"document_types": ["file"]}, "faiss")
+    knn = client.search.call_args.kwargs["body"]["query"]["knn"]["content_embeddings"]
+    assert knn["k"] == 25
+    assert knn["filter"] == {
+        "bool": {"filter": [{"terms": {"document_type": ["file"]}}]}
+    }
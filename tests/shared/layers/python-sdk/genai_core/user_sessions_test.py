@@ -0,0 +1,174 @@
+import pytest
+import genai_core.sessions
+from genai_core.types import CommonError
+from genai_core.sessions import (
+    list_sessions_page,
+    encode_next_token,
+    decode_next_token,
+    delete_user_sessions,
+)
+
+
+def test_list_sessions_page(mocker):
+    last_key = {"SessionId": "1", "UserId": "userId", "StartTime": "123"}
+    query = mocker.patch(
+        "genai_core.sessions.table.query",
+        return_value={
+            "Items": [{"SessionId": "1", "StartTime": "123", "Title": "title"}],
+            "LastEvaluatedKey": last_key,
+        },
+    )
+    batch_get = mocker.patch("genai_core.sessions.dynamodb.batch_get_item")
+
+    result = list_sessions_page("userId", limit=1)
+
+    assert result["items"] == [{"SessionId": "1", "StartTime": "123", "Title": "title"}]
+    assert decode_next_token(result["next_token"], "userId") == last_key
+    assert query.call_args.kwargs["IndexName"] == "summaryIndex"
+    assert query.call_args.kwargs["ScanIndexForward"] is False
+    assert query.call_args.kwargs["Limit"] == 1
+    batch_get.assert_not_called()
+
+    list_sessions_page("userId", next_token=result["next_token"])
+    assert query.call_args.kwargs["ExclusiveStartKey"] == last_key
+
+
+def test_list_sessions_page_legacy_title(mocker):
+    mocker.patch(
+        "genai_core.sessions.table.query",
+        return_value={"Items": [{"SessionId": "1", "StartTime": "123"}]},
+    )
+    mocker.patch(
+        "genai_core.sessions.dynamodb.batch_get_item",
+        return_value={
+            "Responses": {
+                "SessionsTableName": [
+                    {"SessionId": "1", "History": [{"data": {"content": "title"}}]}
+                ]
+            }
+        },
+    )
+
+    result = list_sessions_page("userId")
+
+    assert result["items"][0]["Title"] == "title"
+    assert result["next_token"] is None
+
+
+def test_list_sessions_page_legacy_title_unprocessed_keys(mocker):
+    sleep = mocker.patch("genai_core.sessions.time.sleep")
+    mocker.patch(
+        "genai_core.sessions.table.query",
+        return_value={"Items": [{"SessionId": "1", "StartTime": "123"}]},
+    )
+    unprocessed = {
+        "UnprocessedKeys": {
+            "SessionsTableName": {"Keys": [{"SessionId": "1", "UserId": "userId"}]}
+        }
+    }
+    batch_get = mocker.patch(
+        "genai_core.sessions.dynamodb.batch_get_item", return_value=unprocessed
+    )
+
+    result = list_sessions_page("userId")
+
+    assert "Title" not in result["items"][0]
+    assert batch_get.call_count == 5
+    assert [call.args[0] for call in sleep.call_args_list] == [0.1, 0.2, 0.4, 0.8]
+
+
+def test_decode_next_token_other_user():
+    token = encode_next_token({"SessionId": "1", "UserId": "other"})
+    with pytest.raises(CommonError):
+        decode_next_token(token, "userId")
+    with pytest.raises(CommonError):
+        decode_next_token("invalid", "userId")
+
+
+def get_session_with_file(session_id):
+    return {
+        "SessionId": session_id,
+        "History": [
+            {
+                "data": {
+                    "content": "content",
+                    "additional_kwargs": {"images": [{"key": session_id + ".png"}]},
+                }
+            }
+        ],
+    }
+
+
+def get_batch(mocker, *responses):
+    mocker.patch(
+        "genai_core.sessions.dynamodb.batch_get_item", side_effect=list(responses)
+    )
+    batch_writer = mocker.patch("genai_core.sessions.table.batch_writer")
+    return batch_writer.return_value.__enter__.return_value
+
+
+def test_delete_user_sessions(mocker):
+    mocker.patch.dict("os.environ", {"CHATBOT_FILES_BUCKET_NAME": "bucket"})
+    mocker.patch(
+        "genai_core.sessions.list_sessions_by_user_id",
+        return_value=[{"SessionId": "1"}, {"SessionId": "2"}],
+    )
+    batch = get_batch(
+        mocker,
+        {
+            "Responses": {
+                "SessionsTableName": [
+                    get_session_with_file("1"),
+                    get_session_with_file("2"),
+                ]
+            }
+        },
+    )
+    delete_objects = mocker.patch(
+        "genai_core.sessions.s3_client.delete_objects",
+        return_value={"Errors": [{"Key": "private/userId/2.png"}]},
+    )
+
+    result = delete_user_sessions("userId")
+
+    assert result == [{"id": "1", "deleted": True}, {"id": "2", "deleted": False}]
+    delete_objects.assert_called_once_with(
+        Bucket="bucket",
+        Delete={
+            "Objects": [
+                {"Key": "private/userId/1.png"},
+                {"Key": "private/userId/2.png"},
+            ],
+            "Quiet": True,
+        },
+    )
+    batch.delete_item.assert_called_once_with(
+        Key={"SessionId": "1", "UserId": "userId"}
+    )
+
+
+def test_delete_user_sessions_unprocessed_keys(mocker):
+    sleep = mocker.patch("genai_core.sessions.time.sleep")
+    mocker.patch(
+        "genai_core.sessions.list_sessions_by_user_id",
+        return_value=[{"SessionId": "1"}, {"SessionId": "2"}],
+    )
+    unprocessed = {
+        "UnprocessedKeys": {
+            "SessionsTableName": {"Keys": [{"SessionId": "2", "UserId": "userId"}]}
+        }
+    }
+    batch = get_batch(
+        mocker,
+        {"Responses": {"SessionsTableName": [{"SessionId": "1"}]}, **unprocessed},
+        *[unprocessed] * 4,
+    )
+
+    result = delete_user_sessions("userId")
+
+    assert result == [{"id": "1", "deleted": True}, {"id": "2", "deleted": False}]
+    assert genai_core.sessions.dynamodb.batch_get_item.call_count == 5
+    assert [call.args[0] for call in sleep.call_args_list] == [0.1, 0.2, 0.4, 0.8]
+    batch.delete_item.assert_called_once_with(
+        Key={"SessionId": "1", "UserId": "userId"}
+    )
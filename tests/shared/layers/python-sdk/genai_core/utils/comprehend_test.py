@@ -0,0 +1,55 @@
+import genai_core.utils.comprehend
+from genai_core.utils.comprehend import get_query_language
+
+comprehend_response = {"Languages": [{"LanguageCode": "fr", "Score": 0.98}]}
+
+
+def test_single_language_skips_detection(mocker):
+    detect = mocker.patch.object(
+        genai_core.utils.comprehend.comprehend, "detect_dominant_language"
+    )
+
+    assert get_query_language("¿Qué es esto?", ["spanish"]) == ["spanish", []]
+    detect.assert_not_called()
+
+
+def test_detection_is_cached(mocker):
+    genai_core.utils.comprehend._detect_languages.cache_clear()
+    detect = mocker.patch.object(
+        genai_core.utils.comprehend.comprehend,
+        "detect_dominant_language",
+        return_value=comprehend_response,
+    )
+
+    languages = ["english", "french"]
+    expected = ["french", [{"code": "fr", "score": 0.98}]]
+    assert get_query_language("Quelle est la capitale ?", languages) == expected
+    assert get_query_language("  quelle est la CAPITALE ?", languages) == expected
+    detect.assert_called_once_with(Text="quelle est la capitale ?")
+
+
+def test_unsupported_language_falls_back(mocker):
+    genai_core.utils.comprehend._detect_languages.cache_clear()
+    mocker.patch.object(
+        genai_core.utils.comprehend.comprehend,
+        "detect_dominant_language",
+        return_value=comprehend_response,
+    )
+
+    assert get_query_language("Bonjour", ["german", "spanish"])[0] == "german"
+    assert get_query_language("Bonjour", ["spanish", "english"])[0] == "english"
+
+
+def test_local_detection(mocker):
+    genai_core.utils.comprehend._detect_languages.cache_clear()
+    mocker.patch.object(
+        genai_core.utils.comprehend, "QUERY_LANGUAGE_DETECTION", "local"
+    )
+    detect = mocker.patch.object(
+        genai_core.utils.comprehend.comprehend, "detect_dominant_language"
+    )
+
+    languages = ["english", "german"]
+    assert get_query_language("Wie ist das Wetter?", languages)[0] == "german"
+    assert get_query_language("What is the weather?", languages)[0] == "english"
+    detect.assert_not_called()
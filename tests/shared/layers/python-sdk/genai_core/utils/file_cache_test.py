@@ -0,0 +1,61 @@
+import io
+from botocore.exceptions import ClientError
+from genai_core.utils import file_cache
+from genai_core.utils.file_cache import FileCache
+
+
+def get_object_response(body, etag="etag"):
+    return {"Body": io.BytesIO(body), "ETag": etag}
+
+
+def test_get_uses_cache(mocker):
+    mock = mocker.patch(
+        "genai_core.utils.file_cache.s3.get_object",
+        return_value=get_object_response(b"content"),
+    )
+    cache = FileCache(1000)
+
+    assert cache.get("bucket", "key") == b"content"
+    assert cache.get("bucket", "key") == b"content"
+    mock.assert_called_once_with(Bucket="bucket", Key="key")
+
+
+def test_get_revalidates_with_etag(mocker):
+    mocker.patch("genai_core.utils.file_cache.FRESH_SECONDS", 0)
+    not_modified = ClientError({"Error": {"Code": "304"}}, "GetObject")
+    mock = mocker.patch(
+        "genai_core.utils.file_cache.s3.get_object",
+        side_effect=[get_object_response(b"content"), not_modified],
+    )
+    cache = FileCache(1000)
+
+    assert cache.get("bucket", "key") == b"content"
+    assert cache.get("bucket", "key") == b"content"
+    mock.assert_called_with(Bucket="bucket", Key="key", IfNoneMatch="etag")
+
+
+def test_put_evicts_least_recently_used(mocker):
+    mocker.patch("genai_core.utils.file_cache.MAX_FILE_BYTES", 10)
+    cache = FileCache(10)
+    cache.put(("bucket", "a"), "etag", b"12345")
+    cache.put(("bucket", "b"), "etag", b"12345")
+    cache.put(("bucket", "c"), "etag", b"12345")
+
+    assert list(cache.entries.keys()) == [("bucket", "b"), ("bucket", "c")]
+    assert cache.size == 10
+
+    # Too large to be cached
+    cache.put(("bucket", "d"), "etag", b"12345678901")
+    assert ("bucket", "d") not in cache.entries
+
+
+def test_prefetch_files(mocker):
+    mock = mocker.patch(
+        "genai_core.utils.file_cache.get_file_bytes",
+        side_effect=lambda bucket, key: key.encode(),
+    )
+
+    result = file_cache.prefetch_files("bucket", ["a", "b", "a"])
+
+    assert result == {"a": b"a", "b": b"b"}
+    assert mock.call_count == 2
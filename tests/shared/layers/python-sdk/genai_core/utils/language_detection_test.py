@@ -0,0 +1,18 @@
+from genai_core.utils.language_detection import detect_languages
+
+
+def test_detect_script():
+    assert detect_languages("Как дела?")[0] == ("ru", 1.0)
+    assert detect_languages("今天天气怎么样")[0][0] == "zh"
+    assert detect_languages("این چیست")[0][0] == "fa"
+
+
+def test_detect_latin_languages():
+    assert detect_languages("how does the billing work")[0][0] == "en"
+    assert detect_languages("comment fonctionne la facturation")[0][0] == "fr"
+    assert detect_languages("cómo funciona la facturación")[0][0] == "es"
+    assert detect_languages("wie funktioniert die Abrechnung")[0][0] == "de"
+
+
+def test_no_hint():
+    assert detect_languages("12345") == []
@@ -0,0 +1,48 @@
+import pytest
+import genai_core.utils.telemetry as telemetry
+
+
+@pytest.fixture
+def exporter():
+    exporter = telemetry.StubExporter()
+    telemetry.set_exporter(exporter)
+    yield exporter
+    telemetry.set_exporter(telemetry.EmfExporter())
+
+
+def test_telemetry_exports_spans(mocker, exporter):
+    mocker.patch("genai_core.utils.telemetry._get_tracer")
+
+    with telemetry.Telemetry(dimensions={"Model": "m"}, enabled=True) as request:
+        with telemetry.span("HistoryLoad"):
+            pass
+        with telemetry.span("HistoryLoad"):
+            pass
+        telemetry.add_metric("InputTokens", 10)
+        telemetry.add_metric("InputTokens", 5)
+        telemetry.mark("LastToken")
+        assert telemetry.get_active() is request
+
+    assert telemetry.get_active() is None
+    assert len(exporter.exports) == 1
+    export = exporter.exports[0]
+    assert export["dimensions"] == {"Model": "m"}
+    assert export["metrics"]["InputTokens"] == (15, telemetry.MetricUnit.Count)
+    assert set(export["metrics"]) == {"HistoryLoad", "InputTokens", "LastToken"}
+
+
+def test_telemetry_disabled(exporter):
+    with telemetry.Telemetry(enabled=False):
+        with telemetry.span("Embedding") as span:
+            pass
+
+    assert span.elapsed_ms is not None
+    assert exporter.exports == []
+
+
+def test_span_without_telemetry(exporter):
+    with telemetry.span("Embedding") as span:
+        telemetry.add_metric("InputTokens", 1)
+
+    assert span.elapsed_ms >= 0
+    assert exporter.exports == []
@@ -0,0 +1,27 @@
+import threading
+from genai_core.utils.thread_local import ThreadLocalResource
+
+
+class FakeResource:
+    def name(self):
+        return threading.current_thread().name
+
+
+def test_thread_local_resource():
+    created = []
+
+    def factory():
+        created.append(FakeResource())
+        return created[-1]
+
+    resource = ThreadLocalResource(factory)
+    assert resource.name() == threading.current_thread().name
+    assert resource.name() == threading.current_thread().name
+
+    names = []
+    thread = threading.Thread(target=lambda: names.append(resource.name()), name="t")
+    thread.start()
+    thread.join()
+
+    assert names == ["t"]
+    assert len(created) == 2
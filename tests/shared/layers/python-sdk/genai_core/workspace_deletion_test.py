@@ -0,0 +1,81 @@
+from botocore.exceptions import ClientError
+from genai_core.workspace_deletion import delete_documents, run_deletion_steps
+
+workspace = {"workspace_id": "id", "deletion_steps": {"files"}}
+
+
+def test_run_deletion_steps_skips_completed_steps(mocker):
+    dynamodb = mocker.patch("genai_core.workspace_deletion.dynamodb")
+    table = dynamodb.Table.return_value
+    files = mocker.Mock(return_value=True)
+    documents = mocker.Mock(return_value=True)
+
+    assert run_deletion_steps(workspace, [("files", files), ("docs", documents)])
+
+    files.assert_not_called()
+    documents.assert_called_once()
+    table.update_item.assert_called_once()
+    assert table.update_item.call_args.kwargs["ExpressionAttributeValues"] == {
+        ":step": {"docs"}
+    }
+    table.delete_item.assert_called_once_with(
+        Key={"workspace_id": "id", "object_type": "workspace"}
+    )
+
+
+def test_run_deletion_steps_interrupted(mocker):
+    dynamodb = mocker.patch("genai_core.workspace_deletion.dynamodb")
+    table = dynamodb.Table.return_value
+    documents = mocker.Mock(return_value=False)
+
+    assert not run_deletion_steps(workspace, [("docs", documents)])
+
+    table.update_item.assert_not_called()
+    table.delete_item.assert_not_called()
+
+
+def test_run_deletion_steps_already_deleted(mocker):
+    dynamodb = mocker.patch("genai_core.workspace_deletion.dynamodb")
+    table = dynamodb.Table.return_value
+    table.update_item.side_effect = ClientError(
+        {"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"
+    )
+    documents = mocker.Mock(return_value=True)
+
+    assert run_deletion_steps(workspace, [("docs", documents)])
+
+    assert (
+        table.update_item.call_args.kwargs["ConditionExpression"]
+        == "attribute_exists(workspace_id)"
+    )
+    table.delete_item.assert_not_called()
+
+
+def test_delete_documents_deletes_pages_as_read(mocker):
+    dynamodb = mocker.patch("genai_core.workspace_deletion.dynamodb")
+    table = dynamodb.Table.return_value
+    table.query.side_effect = [
+        {
+            "Items": [{"workspace_id": "id", "document_id": "1"}],
+            "LastEvaluatedKey": {"document_id": "1"},
+        },
+        {"Items": [{"workspace_id": "id", "document_id": "2"}]},
+    ]
+    batch = table.batch_writer.return_value.__enter__.return_value
+
+    assert delete_documents("id")
+
+    assert batch.delete_item.call_count == 2
+    assert table.query.call_args.kwargs["ExclusiveStartKey"] == {"document_id": "1"}
+
+
+def test_delete_documents_stops(mocker):
+    dynamodb = mocker.patch("genai_core.workspace_deletion.dynamodb")
+    table = dynamodb.Table.return_value
+    table.query.return_value = {
+        "Items": [{"workspace_id": "id", "document_id": "1"}],
+        "LastEvaluatedKey": {"document_id": "1"},
+    }
+
+    assert not delete_documents("id", should_stop=lambda: True)
+    table.query.assert_called_once()
@@ -0,0 +1,39 @@
+from genai_core.workspace_stats import (
+    aggregate_all_workspace_stats,
+    aggregate_workspace_stats,
+)
+
+
+def test_aggregate_workspace_stats(mocker):
+    table = mocker.patch("genai_core.workspace_stats.dynamodb").Table.return_value
+    table.query.side_effect = [
+        {
+            "Items": [{"vectors": 3, "size_in_bytes": 100}, {"vectors": 2}],
+            "LastEvaluatedKey": {"document_id": "2"},
+        },
+        {"Items": [{"vectors": 1, "size_in_bytes": 50}]},
+    ]
+
+    stats = aggregate_workspace_stats("id")
+
+    assert stats == {"documents": 3, "vectors": 6, "size_in_bytes": 150}
+    assert table.query.call_args.kwargs["ExclusiveStartKey"] == {"document_id": "2"}
+    values = table.update_item.call_args.kwargs["ExpressionAttributeValues"]
+    assert values[":documents"] == 3
+    assert values[":vectors"] == 6
+    assert values[":sizeInBytes"] == 150
+
+
+def test_aggregate_all_workspace_stats(mocker):
+    mocker.patch(
+        "genai_core.workspaces.list_workspaces",
+        return_value=[
+            {"workspace_id": "a", "engine": "aurora", "status": "ready"},
+            {"workspace_id": "b", "engine": "bedrock_kb", "status": "ready"},
+            {"workspace_id": "c", "engine": "opensearch", "status": "creating"},
+        ],
+    )
+    aggregate = mocker.patch("genai_core.workspace_stats.aggregate_workspace_stats")
+
+    assert aggregate_all_workspace_stats() == 1
+    aggregate.assert_called_once_with("a")
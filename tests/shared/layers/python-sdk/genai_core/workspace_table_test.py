@@ -0,0 +1,18 @@
+import threading
+from genai_core.workspaces import table
+
+
+def test_workspaces_table_per_thread():
+    # The upload handler creates documents from threads
+    clients = []
+    threads = [
+        threading.Thread(target=lambda: clients.append(table.meta.client))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert table.meta.client not in clients
+    assert clients[0] is not clients[1]